@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Summarize `verify_env.py` reports collected from many workstations.
+
+Usage:
+  python3 lessons/L00-vscode-env/code/fleet_summary.py reports/*.json
+  python3 lessons/L00-vscode-env/code/fleet_summary.py fleet.ndjson
+  cat reports/*.ndjson | python3 lessons/L00-vscode-env/code/fleet_summary.py -
+  python3 lessons/L00-vscode-env/code/fleet_summary.py fleet.ndjson --format json
+
+Inputs are `verify_env.py --format json` documents (one report per file) or
+`--format ndjson` streams (any number of reports per file, one check per
+line). Records are folded into per-check counters as they are read, so memory
+depends on the number of distinct checks and versions, not on the fleet size;
+only the first few host names are kept for each problem.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import sys
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import TextIO
+
+MAX_LISTED_HOSTS = 5
+PROBLEM_STATUSES = {"MISSING", "ERROR", "TIMEOUT"}
+
+
+@dataclass
+class CheckSummary:
+    label: str
+    kind: str
+    required: bool
+    statuses: Counter = field(default_factory=Counter)
+    versions: Counter = field(default_factory=Counter)
+    problem_hosts: list[str] = field(default_factory=list)
+    max_seconds: float = 0.0
+    slowest_host: str = ""
+
+    def add(self, host: str, record: dict) -> None:
+        status = record.get("status", "ERROR")
+        self.statuses[status] += 1
+        if status == "FOUND":
+            self.versions[record.get("version") or "(unknown version)"] += 1
+        elif status in PROBLEM_STATUSES and len(self.problem_hosts) < MAX_LISTED_HOSTS:
+            self.problem_hosts.append(host)
+        seconds = float(record.get("seconds") or 0.0)
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+            self.slowest_host = host
+
+    @property
+    def problems(self) -> int:
+        return sum(self.statuses[status] for status in PROBLEM_STATUSES)
+
+
+@dataclass
+class FleetSummary:
+    reports: int = 0
+    bad_records: int = 0
+    checks: dict[str, CheckSummary] = field(default_factory=dict)
+    last_report: tuple[str, str] | None = None
+
+    def add(self, record: dict) -> None:
+        if not isinstance(record, dict) or "label" not in record:
+            self.bad_records += 1
+            return
+        host = str(record.get("host", "?"))
+        # NDJSON lines of one report share host and start time.
+        report_key = (host, str(record.get("started", "")))
+        if report_key != self.last_report:
+            self.reports += 1
+            self.last_report = report_key
+        label = str(record["label"])
+        summary = self.checks.get(label)
+        if summary is None:
+            summary = CheckSummary(
+                label=label,
+                kind=str(record.get("kind", "")),
+                required=bool(record.get("required")),
+            )
+            self.checks[label] = summary
+        summary.add(host, record)
+
+
+def iter_records(stream: TextIO, name: str) -> Iterator[dict | None]:
+    """Yield check records from one input; None marks an unreadable record.
+
+    The format is decided once, from the first non-blank line: a JSON object
+    that is not a whole report means NDJSON, and so does a line that does not
+    parse, unless it is a bare `{` or `[` opening a pretty-printed
+    `--format json` report. NDJSON is read line by line, and each bad line is
+    reported and skipped on its own.
+    """
+    line_number = 0
+    first = ""
+    for first in stream:
+        line_number += 1
+        if first.strip():
+            break
+    if not first.strip():
+        return
+    try:
+        first_record = json.loads(first)
+    except ValueError:
+        first_record = None
+
+    document = (
+        isinstance(first_record, dict) and "results" in first_record
+    ) or (first_record is None and first.strip() in {"{", "["})
+    if not document:
+        lines = itertools.chain([first], stream)
+        for line_number, line in enumerate(lines, start=line_number):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                print(
+                    f"warning: {name}:{line_number}: not a JSON record",
+                    file=sys.stderr,
+                )
+                yield None
+        return
+
+    try:
+        report = first_record or json.loads(first + stream.read())
+        results = report["results"]
+    except (ValueError, KeyError, TypeError):
+        print(f"warning: {name} is not a verify_env.py report", file=sys.stderr)
+        yield None
+        return
+    for result in results:
+        if isinstance(result, dict):
+            host, started = report.get("host"), report.get("started")
+            result = {"host": host, "started": started, **result}
+        yield result
+
+
+def summarize(paths: list[str]) -> FleetSummary:
+    fleet = FleetSummary()
+    for path in paths:
+        if path == "-":
+            for record in iter_records(sys.stdin, "<stdin>"):
+                fleet.add(record)
+            continue
+        try:
+            with open(path, encoding="utf-8") as stream:
+                for record in iter_records(stream, path):
+                    fleet.add(record)
+        except OSError as exc:
+            print(f"warning: cannot read {path}: {exc}", file=sys.stderr)
+            fleet.bad_records += 1
+    return fleet
+
+
+def format_versions(versions: Counter) -> str:
+    return ", ".join(
+        f"{version} ({count})" for version, count in versions.most_common()
+    )
+
+
+def print_summary(fleet: FleetSummary) -> None:
+    print(f"Fleet summary: {fleet.reports} reports")
+    if fleet.bad_records:
+        print(f"Unreadable records skipped: {fleet.bad_records}")
+    print("=" * 112)
+    print(
+        f"{'Item':36} {'Required':8} {'Found':>5} {'Problem':>7} {'Skipped':>7} "
+        f"{'Max s':>7}  Versions"
+    )
+    print("-" * 112)
+    for summary in fleet.checks.values():
+        required = "yes" if summary.required else "no"
+        print(
+            f"{summary.label:36} {required:8} {summary.statuses['FOUND']:5} "
+            f"{summary.problems:7} {summary.statuses['SKIPPED']:7} "
+            f"{summary.max_seconds:7.2f}  {format_versions(summary.versions)}"
+        )
+    print("=" * 112)
+
+    problems = [summary for summary in fleet.checks.values() if summary.problems]
+    if not problems:
+        print("No missing tools across the fleet.")
+        return
+    print("Missing or failing across the fleet:")
+    problems.sort(key=lambda summary: (not summary.required, -summary.problems))
+    for summary in problems:
+        hosts = ", ".join(summary.problem_hosts)
+        if summary.problems > len(summary.problem_hosts):
+            hosts += f", +{summary.problems - len(summary.problem_hosts)} more"
+        required = "required" if summary.required else "recommended"
+        print(f"- {summary.label} ({required}): {summary.problems} hosts ({hosts})")
+
+
+def summary_json(fleet: FleetSummary) -> dict:
+    return {
+        "reports": fleet.reports,
+        "bad_records": fleet.bad_records,
+        "checks": [
+            {
+                "label": summary.label,
+                "kind": summary.kind,
+                "required": summary.required,
+                "statuses": dict(summary.statuses),
+                "versions": dict(summary.versions.most_common()),
+                "problem_hosts": summary.problem_hosts,
+                "max_seconds": summary.max_seconds,
+                "slowest_host": summary.slowest_host,
+            }
+            for summary in fleet.checks.values()
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Summarize verify_env.py JSON/NDJSON reports from many machines"
+    )
+    parser.add_argument(
+        "reports",
+        nargs="+",
+        help="Report files (`-` reads standard input).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("table", "json"),
+        default="table",
+        help="Output a readable table (default) or JSON.",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Return non-zero exit code when a required tool is missing on any host.",
+    )
+    args = parser.parse_args()
+
+    fleet = summarize(args.reports)
+    if args.format == "json":
+        print(json.dumps(summary_json(fleet), indent=2, sort_keys=True))
+    else:
+        print_summary(fleet)
+
+    if args.strict and any(
+        summary.required and summary.problems for summary in fleet.checks.values()
+    ):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,54 @@
+"""MicroPython device side of the L00 serial throughput benchmark.
+
+Upload as main.py, reset, then run the host harness on the same port:
+  mpremote connect <PORT> fs cp \\
+      lessons/L00-vscode-env/code/micropython/serial_bench_device.py :main.py
+  mpremote connect <PORT> reset
+  python3 lessons/L00-vscode-env/code/serial_bench.py <PORT>
+
+It answers two line commands from the host (see serial_bench.py):
+  PING <token> [padding]  -> echoes the line back as PONG ... (latency)
+  BENCH <size> <count>    -> sends <count> frames of exactly <size> bytes,
+                             then DONE <count> (throughput and loss)
+
+A frame is "#", the sequence number as 8 hex digits, a space, filler and a
+newline. One preallocated buffer is patched in place for every frame, so the
+send loop allocates nothing. Stop it with Ctrl+C.
+"""
+
+import sys
+
+HEX = b"0123456789abcdef"
+MIN_FRAME = 16
+MAX_FRAME = 4096
+
+out = sys.stdout.buffer if hasattr(sys.stdout, "buffer") else sys.stdout
+
+
+def send_frames(size, count):
+    size = max(MIN_FRAME, min(size, MAX_FRAME))
+    frame = bytearray(b"#00000000 " + b"x" * (size - 11) + b"\n")
+    view = memoryview(frame)
+    for seq in range(count):
+        value = seq
+        for index in range(8, 0, -1):
+            frame[index] = HEX[value & 15]
+            value >>= 4
+        out.write(view)
+    out.write(("DONE %d\n" % count).encode())
+
+
+def main():
+    print("L00 serial bench ready")
+    while True:
+        line = sys.stdin.readline()
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == "PING":
+            out.write(b"PONG" + line[4:].rstrip().encode() + b"\n")
+        elif parts[0] == "BENCH" and len(parts) == 3:
+            send_frames(int(parts[1]), int(parts[2]))
+
+
+main()
@@ -0,0 +1,87 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#include "pico/stdio_usb.h"
+#include "pico/stdlib.h"
+
+// Device side of the L00 serial throughput benchmark; the host harness is
+// lessons/L00-vscode-env/code/serial_bench.py. Line commands from the host:
+//   PING <token> [padding]  -> echo the line back as PONG ... (latency)
+//   BENCH <size> <count>    -> <count> frames of exactly <size> bytes, then
+//                              DONE <count> (throughput and loss)
+// A frame is "#", the sequence number as 8 hex digits, a space, filler and a
+// newline, patched in place in one static buffer.
+
+#define MIN_FRAME 16
+#define MAX_FRAME 4096
+#define MAX_COMMAND 4200
+
+static char frame[MAX_FRAME];
+static char command[MAX_COMMAND];
+
+static void read_command(void) {
+    size_t length = 0;
+    while (true) {
+        int c = getchar();
+        if (c == '\n' || c == '\r') {
+            if (length > 0) {
+                break;
+            }
+            continue;
+        }
+        if (length < sizeof(command) - 1) {
+            command[length++] = (char)c;
+        }
+    }
+    command[length] = '\0';
+}
+
+static void send_frames(int size, int count) {
+    static const char hex[] = "0123456789abcdef";
+    if (size < MIN_FRAME) {
+        size = MIN_FRAME;
+    } else if (size > MAX_FRAME) {
+        size = MAX_FRAME;
+    }
+    frame[0] = '#';
+    frame[9] = ' ';
+    memset(&frame[10], 'x', (size_t)size - 11);
+    frame[size - 1] = '\n';
+    for (int seq = 0; seq < count; ++seq) {
+        unsigned value = (unsigned)seq;
+        for (int index = 8; index > 0; --index) {
+            frame[index] = hex[value & 15u];
+            value >>= 4;
+        }
+        fwrite(frame, 1, (size_t)size, stdout);
+    }
+    printf("DONE %d\n", count);
+    fflush(stdout);
+}
+
+int main(void) {
+    stdio_init_all();
+    // Frames must arrive exactly as sent: no "\n" -> "\r\n" translation.
+    stdio_set_translate_crlf(&stdio_usb, false);
+
+    while (!stdio_usb_connected()) {
+        sleep_ms(100);
+    }
+    printf("L00 serial bench ready\n");
+
+    while (true) {
+        read_command();
+        if (strncmp(command, "PING", 4) == 0) {
+            printf("PONG%s\n", &command[4]);
+            fflush(stdout);
+        } else if (strncmp(command, "BENCH ", 6) == 0) {
+            char *end = NULL;
+            long size = strtol(&command[6], &end, 10);
+            long count = strtol(end, NULL, 10);
+            if (size > 0 && count > 0) {
+                send_frames((int)size, (int)count);
+            }
+        }
+    }
+}
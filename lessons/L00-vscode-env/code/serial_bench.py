@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""Measure what the USB CDC serial link to a board can sustain.
+
+Usage:
+  python3 lessons/L00-vscode-env/code/serial_bench.py /dev/ttyACM0
+  python3 lessons/L00-vscode-env/code/serial_bench.py COM5 --sizes 32,256 --count 5000
+  python3 lessons/L00-vscode-env/code/serial_bench.py --simulate
+  python3 lessons/L00-vscode-env/code/serial_bench.py --simulate --simulate-rate 1M
+
+The board must run one of the device sides:
+  - MicroPython: `micropython/serial_bench_device.py` uploaded as main.py
+  - Pico SDK: the `pico-sdk-serial-bench` firmware
+
+For every frame size the harness first sends `--pings` PING lines padded to
+that size and times each echo (round-trip latency), then asks for a burst of
+`--count` sequence-numbered frames (`BENCH <size> <count>`) and reports the
+sustained throughput from first to last frame, lost frames (sequence numbers
+never seen) and corrupt frames (wrong length or header).
+
+`--simulate` replaces the board with a fake device on a pseudo-terminal
+(Linux/macOS), so the harness itself can run in CI; `--simulate-rate` caps the
+fake device's output (e.g. `1M` bytes/s, roughly USB full speed in practice).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import select
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+
+from serial_capture import CHUNK_SIZE, PtyDevice, parse_size, serial
+
+DEFAULT_SIZES = (16, 64, 256, 1024)
+DEFAULT_COUNT = 2000
+DEFAULT_PINGS = 20
+DEFAULT_TIMEOUT = 10.0
+MIN_FRAME = 16
+MAX_FRAME = 4096
+HEADER_BYTES = 10  # "#" + 8 hex digits + " "
+
+
+@dataclass
+class SizeResult:
+    frame_bytes: int
+    frames: int
+    received: int
+    lost: int
+    corrupt: int
+    kib_per_s: float
+    frames_per_s: float
+    first_frame_ms: float
+    rtt_median_ms: float
+    rtt_max_ms: float
+
+
+class BenchLink:
+    """Line-oriented access to the port with large chunked reads."""
+
+    def __init__(self, port: serial.SerialBase) -> None:
+        self.port = port
+        self.partial = b""
+        # Lines already read but not consumed when a caller stopped early.
+        self.pending: deque[tuple[float, bytes]] = deque()
+
+    def send(self, line: bytes) -> None:
+        self.port.write(line + b"\n")
+        self.port.flush()
+
+    def lines(self, deadline: float) -> Iterator[tuple[float, bytes]]:
+        """Yield `(arrival time, line)` until `deadline` (perf_counter)."""
+        while True:
+            while self.pending:
+                yield self.pending.popleft()
+            if time.perf_counter() >= deadline:
+                return
+            waiting = self.port.in_waiting
+            data = self.port.read(min(max(waiting, 1), CHUNK_SIZE))
+            if not data:
+                continue
+            arrival = time.perf_counter()
+            lines = (self.partial + data).replace(b"\r\n", b"\n").split(b"\n")
+            self.partial = lines.pop()
+            self.pending.extend((arrival, line) for line in lines)
+
+    def drain(self) -> None:
+        self.port.reset_input_buffer()
+        self.partial = b""
+        self.pending.clear()
+
+
+def measure_pings(
+    link: BenchLink,
+    size: int,
+    count: int,
+    timeout: float,
+) -> list[float]:
+    """Round-trip seconds of `count` PING lines padded to `size` bytes."""
+    rtts: list[float] = []
+    for index in range(count):
+        token = b"PING %d " % index
+        padding = b"p" * max(size - len(token) - 1, 0)
+        expected = b"PONG" + (token + padding)[4:].rstrip()
+        sent = time.perf_counter()
+        link.send(token + padding)
+        for arrival, line in link.lines(sent + timeout):
+            if line == expected:
+                rtts.append(arrival - sent)
+                break
+    return rtts
+
+
+def measure_burst(
+    link: BenchLink,
+    size: int,
+    count: int,
+    timeout: float,
+) -> tuple[int, int, float, float]:
+    """Return (received, corrupt, first-frame s, first-to-last s)."""
+    seen = bytearray(count)
+    corrupt = 0
+    first = last = None
+    sent = time.perf_counter()
+    link.send(b"BENCH %d %d" % (size, count))
+    for arrival, line in link.lines(sent + timeout):
+        if line.startswith(b"DONE"):
+            break
+        if not line.startswith(b"#"):
+            continue
+        try:
+            seq = int(line[1:9], 16)
+        except ValueError:
+            corrupt += 1
+            continue
+        if len(line) + 1 != size or seq >= count or line[9:10] != b" ":
+            corrupt += 1
+            continue
+        seen[seq] = 1
+        if first is None:
+            first = arrival
+        last = arrival
+    received = sum(seen)
+    if first is None:
+        return received, corrupt, 0.0, 0.0
+    return received, corrupt, first - sent, last - first
+
+
+def run_size(
+    link: BenchLink,
+    size: int,
+    count: int,
+    pings: int,
+    timeout: float,
+) -> SizeResult:
+    link.drain()
+    rtts = measure_pings(link, size, pings, timeout)
+    received, corrupt, first_s, span_s = measure_burst(link, size, count, timeout)
+    # Sustained rate between first and last frame, so setup latency is excluded.
+    rate = (received - 1) * size / span_s if span_s > 0 and received > 1 else 0.0
+    return SizeResult(
+        frame_bytes=size,
+        frames=count,
+        received=received,
+        lost=count - received,
+        corrupt=corrupt,
+        kib_per_s=round(rate / 1024, 1),
+        frames_per_s=round(rate / size, 1),
+        first_frame_ms=round(first_s * 1000, 3),
+        rtt_median_ms=round(statistics.median(rtts) * 1000, 3) if rtts else 0.0,
+        rtt_max_ms=round(max(rtts) * 1000, 3) if rtts else 0.0,
+    )
+
+
+class SimulatedBenchDevice(PtyDevice):
+    """Pty stand-in that speaks the same protocol as the device scripts."""
+
+    def __init__(self, rate: float = 0.0) -> None:
+        super().__init__()
+        self.rate = rate
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self) -> None:
+        partial = b""
+        while not self.stopping.is_set():
+            readable, _, _ = select.select([self.master_fd], [], [], 0.1)
+            if not readable:
+                continue
+            try:
+                data = os.read(self.master_fd, 4096)
+            except OSError:
+                return
+            lines = (partial + data).split(b"\n")
+            partial = lines.pop()
+            for line in lines:
+                line = line.rstrip(b"\r")
+                parts = line.split()
+                if parts and parts[0] == b"PING":
+                    self.emit(b"PONG" + line[4:].rstrip() + b"\n")
+                elif len(parts) == 3 and parts[0] == b"BENCH":
+                    self.send_frames(int(parts[1]), int(parts[2]))
+
+    def send_frames(self, size: int, count: int) -> None:
+        size = max(MIN_FRAME, min(size, MAX_FRAME))
+        filler = b"x" * (size - HEADER_BYTES - 1) + b"\n"
+        # Small batches when rate-capped, so pacing is smooth.
+        batch = max(1, (4096 if self.rate > 0 else CHUNK_SIZE) // size)
+        started = time.perf_counter()
+        sent_bytes = 0
+        for first in range(0, count, batch):
+            chunk = b"".join(
+                b"#%08x %s" % (seq, filler)
+                for seq in range(first, min(first + batch, count))
+            )
+            self.emit(chunk)
+            sent_bytes += len(chunk)
+            if self.rate > 0:
+                delay = started + sent_bytes / self.rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        self.emit(b"DONE %d\n" % count)
+
+
+def parse_sizes(text: str) -> list[int]:
+    sizes = [int(item) for item in text.split(",") if item.strip()]
+    if not sizes or any(not MIN_FRAME <= size <= MAX_FRAME for size in sizes):
+        raise argparse.ArgumentTypeError(
+            f"sizes must be between {MIN_FRAME} and {MAX_FRAME} bytes"
+        )
+    return sizes
+
+
+def print_results(results: list[SizeResult]) -> None:
+    print(
+        f"{'Frame B':>7} {'Frames':>7} {'Lost':>6} {'Corrupt':>7} {'KiB/s':>9} "
+        f"{'Frames/s':>9} {'1st ms':>8} {'RTT med ms':>10} {'RTT max ms':>10}"
+    )
+    print("-" * 82)
+    for result in results:
+        print(
+            f"{result.frame_bytes:7} {result.frames:7} {result.lost:6} "
+            f"{result.corrupt:7} {result.kib_per_s:9.1f} {result.frames_per_s:9.1f} "
+            f"{result.first_frame_ms:8.2f} {result.rtt_median_ms:10.3f} "
+            f"{result.rtt_max_ms:10.3f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the board serial link")
+    parser.add_argument(
+        "port", nargs="?", help="Serial port, e.g. /dev/ttyACM0 or COM5"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=parse_sizes,
+        default=list(DEFAULT_SIZES),
+        help="Comma-separated frame sizes in bytes (default: 16,64,256,1024).",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=DEFAULT_COUNT,
+        help=f"Frames per burst (default: {DEFAULT_COUNT}).",
+    )
+    parser.add_argument(
+        "--pings",
+        type=int,
+        default=DEFAULT_PINGS,
+        help=f"Latency round trips per frame size (default: {DEFAULT_PINGS}).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Seconds to wait for a burst or echo (default: {DEFAULT_TIMEOUT:g}).",
+    )
+    parser.add_argument("--format", choices=("table", "json"), default="table")
+    parser.add_argument(
+        "--simulate",
+        action="store_true",
+        help="Benchmark a fake device on a pty instead of a board.",
+    )
+    parser.add_argument(
+        "--simulate-rate",
+        type=parse_size,
+        default=0,
+        help="Cap the fake device at this many bytes/s, e.g. 1M (default: no cap).",
+    )
+    parser.add_argument(
+        "--max-loss",
+        type=int,
+        default=None,
+        help="Exit non-zero when any size loses more frames than this.",
+    )
+    args = parser.parse_args()
+    if (args.port is None) == (not args.simulate):
+        parser.error("give either a serial port or --simulate")
+    if args.count < 1 or args.pings < 0:
+        parser.error("--count must be positive and --pings non-negative")
+
+    device = SimulatedBenchDevice(args.simulate_rate) if args.simulate else None
+    port_name = device.port_name if device is not None else args.port
+    try:
+        port = serial.Serial(port_name, 115200, timeout=0.05)
+    except serial.SerialException as exc:
+        print(f"Cannot open {port_name}: {exc}", file=sys.stderr)
+        return 1
+
+    link = BenchLink(port)
+    try:
+        results = [
+            run_size(link, size, args.count, args.pings, args.timeout)
+            for size in args.sizes
+        ]
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        port.close()
+        if device is not None:
+            device.close()
+
+    if args.format == "json":
+        print(json.dumps([asdict(result) for result in results], indent=2))
+    else:
+        print(f"Serial link benchmark: {port_name}")
+        print_results(results)
+    if args.max_loss is not None and any(
+        result.lost + result.corrupt > args.max_loss for result in results
+    ):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""Capture board serial output to rotating, timestamped log files.
+
+Usage:
+  python3 lessons/L00-vscode-env/code/serial_capture.py /dev/ttyACM0
+  python3 lessons/L00-vscode-env/code/serial_capture.py COM5 --out captures/run.log
+  python3 lessons/L00-vscode-env/code/serial_capture.py /dev/ttyACM0 --duration 60
+  python3 lessons/L00-vscode-env/code/serial_capture.py --simulate 20000 --duration 5
+
+`miniterm` is fine for one line per second, but falls behind once firmware
+streams sensor or DMA data. This tool reads the port on a background thread in
+large chunks (whatever the OS has buffered, up to `CHUNK_SIZE`), so Python
+work is per chunk, not per byte. Lines are split with `bytes.split`, prefixed
+with the arrival time of their chunk, and written in one call per chunk to a
+log file that rotates at `--max-bytes` (keeping `--backups` old files).
+
+A bounded queue sits between the reader and the writer. When the disk cannot
+keep up, whole chunks are dropped instead of stalling the reader (which would
+let the device-side buffer overflow unseen), and the dropped lines are counted.
+Throughput and drop counts are printed every `--stats-interval` seconds and
+as a final summary.
+
+`--simulate LINES_PER_S` needs no board: it opens a pseudo-terminal (pty,
+Linux/macOS only), plays a fake device on one end and captures the other
+through pyserial like a real USB CDC port (0 means as fast as possible).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import serial
+except ModuleNotFoundError as exc:
+    raise SystemExit(
+        "Missing dependency: pyserial. Install with: python3 -m pip install pyserial"
+    ) from exc
+
+try:
+    import pty
+    import tty
+except ModuleNotFoundError:
+    # Not available on Windows; only `--simulate` needs them.
+    pty = None
+    tty = None
+
+CHUNK_SIZE = 64 * 1024
+READ_TIMEOUT = 0.05
+QUEUE_CHUNKS = 256
+MAX_LINE_BYTES = 64 * 1024
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+
+
+@dataclass
+class CaptureStats:
+    bytes_read: int = 0
+    chunks: int = 0
+    lines: int = 0
+    dropped_chunks: int = 0
+    dropped_lines: int = 0
+
+    def summary(self, seconds: float) -> str:
+        rate = self.bytes_read / seconds if seconds > 0 else 0.0
+        return (
+            f"{self.bytes_read} bytes in {seconds:.1f}s ({rate / 1024:.1f} KiB/s), "
+            f"{self.lines} lines, {self.dropped_lines} dropped lines "
+            f"({self.dropped_chunks} chunks), avg chunk "
+            f"{self.bytes_read // max(self.chunks, 1)} bytes"
+        )
+
+
+class RotatingWriter:
+    """Append bytes to `path`, rotating to `path.1`..`path.N` past `max_bytes`."""
+
+    def __init__(self, path: Path, max_bytes: int, backups: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.handle = path.open("ab")
+        self.size = self.handle.tell()
+
+    def write(self, data: bytes) -> None:
+        if self.size and self.size + len(data) > self.max_bytes:
+            self.rotate()
+        self.handle.write(data)
+        self.size += len(data)
+
+    def rotate(self) -> None:
+        self.handle.close()
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                older = self.path.with_name(f"{self.path.name}.{index}")
+                if older.exists():
+                    older.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        self.handle = self.path.open("wb")
+        self.size = 0
+
+    def close(self) -> None:
+        self.handle.close()
+
+
+class SerialCapture:
+    """Read a serial port on a background thread; split and log lines on demand.
+
+    `port` is anything with pyserial's `read`, `in_waiting` and `timeout`.
+    The reader thread only reads and enqueues `(arrival time, chunk)`; the
+    caller runs `process()` to turn queued chunks into timestamped lines.
+    """
+
+    def __init__(
+        self,
+        port: serial.SerialBase,
+        writer: RotatingWriter,
+        *,
+        timestamps: bool = True,
+        queue_chunks: int = QUEUE_CHUNKS,
+    ) -> None:
+        self.port = port
+        self.writer = writer
+        self.timestamps = timestamps
+        self.chunks: queue.Queue[tuple[float, bytes]] = queue.Queue(queue_chunks)
+        self.stats = CaptureStats()
+        self.partial = b""
+        self.stopping = threading.Event()
+        self.reader = threading.Thread(target=self.read_loop, daemon=True)
+
+    def start(self) -> None:
+        self.reader.start()
+
+    def stop(self) -> None:
+        self.stopping.set()
+        self.reader.join()
+        self.process(timeout=0)
+        if self.partial:
+            # Unterminated last line: keep it rather than lose it.
+            self.write_lines(time.time(), [self.partial])
+            self.partial = b""
+
+    def read_loop(self) -> None:
+        port = self.port
+        port.timeout = READ_TIMEOUT
+        while not self.stopping.is_set():
+            try:
+                # Blocks for the first byte only; afterwards takes everything
+                # already buffered in one call.
+                data = port.read(min(max(port.in_waiting, 1), CHUNK_SIZE))
+            except serial.SerialException:
+                # Board reset or unplugged.
+                self.stopping.set()
+                break
+            if not data:
+                continue
+            self.stats.bytes_read += len(data)
+            self.stats.chunks += 1
+            try:
+                self.chunks.put_nowait((time.time(), data))
+            except queue.Full:
+                self.stats.dropped_chunks += 1
+                self.stats.dropped_lines += data.count(b"\n")
+
+    def process(self, timeout: float) -> None:
+        """Write out every queued chunk, waiting up to `timeout` for the first."""
+        try:
+            arrival, data = self.chunks.get(timeout=timeout or None, block=timeout > 0)
+        except queue.Empty:
+            return
+        while True:
+            lines = (self.partial + data).replace(b"\r\n", b"\n").split(b"\n")
+            self.partial = lines.pop()
+            if len(self.partial) > MAX_LINE_BYTES:
+                lines.append(self.partial)
+                self.partial = b""
+            if lines:
+                self.write_lines(arrival, lines)
+            try:
+                arrival, data = self.chunks.get_nowait()
+            except queue.Empty:
+                return
+
+    def write_lines(self, arrival: float, lines: list[bytes]) -> None:
+        self.stats.lines += len(lines)
+        if self.timestamps:
+            prefix = b"%.6f " % arrival
+            self.writer.write(prefix + (b"\n" + prefix).join(lines) + b"\n")
+        else:
+            self.writer.write(b"\n".join(lines) + b"\n")
+
+
+class PtyDevice:
+    """Fake board behind a pseudo-terminal, for running without hardware.
+
+    `port_name` is the pty path to open with pyserial. `emit(data)` writes raw
+    bytes as the device; `start_lines(rate)` streams numbered lines from a
+    thread (`rate` lines/s, 0 for as fast as possible).
+    """
+
+    def __init__(self) -> None:
+        if pty is None:
+            raise SystemExit("--simulate needs a pseudo-terminal (Linux/macOS only)")
+        self.master_fd, self.slave_fd = pty.openpty()
+        tty.setraw(self.slave_fd)
+        self.port_name = os.ttyname(self.slave_fd)
+        self.stopping = threading.Event()
+        self.thread: threading.Thread | None = None
+        self.lines_sent = 0
+
+    def emit(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            written = os.write(self.master_fd, view)
+            view = view[written:]
+
+    def start_lines(self, rate: float, payload_bytes: int = 48) -> None:
+        self.thread = threading.Thread(
+            target=self.line_loop, args=(rate, payload_bytes), daemon=True
+        )
+        self.thread.start()
+
+    def line_loop(self, rate: float, payload_bytes: int) -> None:
+        payload = b"x" * payload_bytes
+        batch = 1 if 0 < rate < 100 else 64
+        started = time.perf_counter()
+        while not self.stopping.is_set():
+            first = self.lines_sent
+            self.emit(
+                b"".join(
+                    b"sim %d %s\r\n" % (seq, payload)
+                    for seq in range(first, first + batch)
+                )
+            )
+            self.lines_sent += batch
+            if rate > 0:
+                delay = started + self.lines_sent / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def stop_lines(self) -> None:
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def close(self) -> None:
+        self.stop_lines()
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+
+def parse_size(text: str) -> int:
+    units = {"k": 1024, "m": 1024**2, "g": 1024**3}
+    text = text.strip().lower()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Capture serial output to log files")
+    parser.add_argument(
+        "port", nargs="?", help="Serial port, e.g. /dev/ttyACM0 or COM5"
+    )
+    parser.add_argument("--baud", type=int, default=115200, help="Ignored by USB CDC.")
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=Path("serial-capture.log"),
+        help="Log file path (default: serial-capture.log).",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=parse_size,
+        default=DEFAULT_MAX_BYTES,
+        help="Rotate the log past this size, e.g. 512k or 10M (default: 10M).",
+    )
+    parser.add_argument(
+        "--backups",
+        type=int,
+        default=DEFAULT_BACKUPS,
+        help=f"Rotated files to keep (default: {DEFAULT_BACKUPS}).",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=0.0,
+        help="Stop after this many seconds (default: until Ctrl+C).",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between throughput reports on stderr (0 disables them).",
+    )
+    parser.add_argument(
+        "--no-timestamps",
+        action="store_true",
+        help="Write lines exactly as received, without arrival times.",
+    )
+    parser.add_argument(
+        "--simulate",
+        type=float,
+        metavar="LINES_PER_S",
+        help="Capture from a fake device on a pty instead of a real port.",
+    )
+    args = parser.parse_args()
+    if (args.port is None) == (args.simulate is None):
+        parser.error("give either a serial port or --simulate")
+    if args.max_bytes <= 0 or args.backups < 0:
+        parser.error("--max-bytes must be positive and --backups non-negative")
+
+    device = None
+    port_name = args.port
+    if args.simulate is not None:
+        device = PtyDevice()
+        port_name = device.port_name
+
+    try:
+        port = serial.Serial(port_name, args.baud, timeout=READ_TIMEOUT)
+    except serial.SerialException as exc:
+        print(f"Cannot open {port_name}: {exc}", file=sys.stderr)
+        return 1
+
+    writer = RotatingWriter(args.out, args.max_bytes, args.backups)
+    capture = SerialCapture(port, writer, timestamps=not args.no_timestamps)
+    capture.start()
+    if device is not None:
+        device.start_lines(args.simulate)
+    print(f"Capturing {port_name} -> {args.out} (Ctrl+C to stop)", file=sys.stderr)
+
+    started = time.perf_counter()
+    last_report = started
+    last_bytes = 0
+    try:
+        while not capture.stopping.is_set():
+            capture.process(timeout=0.1)
+            now = time.perf_counter()
+            if args.duration and now - started >= args.duration:
+                break
+            if args.stats_interval and now - last_report >= args.stats_interval:
+                rate = (capture.stats.bytes_read - last_bytes) / (now - last_report)
+                print(
+                    f"[{now - started:7.1f}s] {rate / 1024:8.1f} KiB/s, "
+                    f"{capture.stats.lines} lines, "
+                    f"{capture.stats.dropped_lines} dropped",
+                    file=sys.stderr,
+                )
+                last_report, last_bytes = now, capture.stats.bytes_read
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if device is not None:
+            device.stop_lines()
+        capture.stop()
+        port.close()
+        writer.close()
+        if device is not None:
+            device.close()
+
+    print(capture.stats.summary(time.perf_counter() - started), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
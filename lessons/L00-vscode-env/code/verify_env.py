@@ -5,20 +5,65 @@ Usage:
   python3 lessons/L00-vscode-env/code/verify_env.py
   python3 lessons/L00-vscode-env/code/verify_env.py --strict
   python3 lessons/L00-vscode-env/code/verify_env.py --strict-all
+  python3 lessons/L00-vscode-env/code/verify_env.py --timeout 20
+  python3 lessons/L00-vscode-env/code/verify_env.py --no-cache
+  python3 lessons/L00-vscode-env/code/verify_env.py --format ndjson >> fleet.ndjson
+  python3 lessons/L00-vscode-env/code/verify_env.py --deep
+
+All probes run concurrently, so the check takes about as long as the slowest
+single probe. A tool that does not answer within `--timeout` seconds (for
+example a `picotool` waiting on USB) is reported as TIMEOUT instead of
+blocking the whole check.
+
+Tool versions, package versions and the VS Code extension list are cached in
+the user cache directory (e.g. `~/.cache/rp-pico-self-study/verify_env.json`).
+An entry is reused only while the probed binary (resolved path, size, mtime)
+or package module file is unchanged, so reinstalling or upgrading a tool
+refreshes it automatically. `--no-cache` ignores and leaves the cache alone.
+
+`--format json` prints one report document and `--format ndjson` one line per
+check (each tagged with the host name), both including how long every probe
+took. `fleet_summary.py` aggregates such reports from many machines.
+
+`--deep` also configures and compiles `pico-sdk-usb-hello` against
+`PICO_SDK_PATH` in a build dir under the user cache directory, catching missing
+SDK submodules (tinyusb) and toolchains that cannot actually compile. A passing
+trial build is remembered for the SDK commit and toolchain version, so it only
+reruns after one of them changes; the configure and compile times are shown.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import importlib.metadata
 import importlib.util
+import json
 import os
+import platform
 import shutil
 import subprocess
 import sys
-from dataclasses import dataclass
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
 from pathlib import Path
 
+DEFAULT_TIMEOUT = 10.0
+CACHE_APP_NAME = "rp-pico-self-study"
+CACHE_FILENAME = "verify_env.json"
+CACHE_VERSION = 1
+OUTPUT_FORMATS = ("table", "json", "ndjson")
+DEFAULT_DEEP_TIMEOUT = 600.0
+SDK_SAMPLE_DIR = Path(__file__).resolve().parent / "pico-sdk-usb-hello"
+SDK_TRIAL_BUILD_DIRNAME = "sdk-trial-build"
+SDK_SUBMODULE_MARKERS = {
+    "tinyusb": "lib/tinyusb/src/tusb.h",
+}
+
 
 @dataclass(frozen=True)
 class CommandCheck:
@@ -57,6 +102,8 @@ class CheckResult:
     required: bool
     status: str
     details: str
+    version: str = ""
+    seconds: float = 0.0
 
 
 COMMAND_CHECKS: list[CommandCheck] = [
@@ -95,8 +142,98 @@ VSCODE_EXTENSION_CHECKS: list[VscodeExtensionCheck] = [
 ]
 
 
-def tool_version(command: str) -> str:
-    """Return a short version line when available."""
+def user_cache_dir() -> Path:
+    """Return the per-user cache directory for this course's tools."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / CACHE_APP_NAME
+
+
+def file_identity(path: str | Path) -> list | None:
+    """Return `[resolved path, size, mtime_ns]`, or None when unreadable."""
+    try:
+        resolved = Path(path).resolve()
+        stat = resolved.stat()
+    except OSError:
+        return None
+    return [str(resolved), stat.st_size, stat.st_mtime_ns]
+
+
+class ProbeCache:
+    """Probe results from earlier runs, one slot per probe.
+
+    A slot holds the identity of what was probed (see `file_identity`) and
+    the result. Lookups only hit while the identity is unchanged; storing a
+    new identity replaces the slot, so the file never grows stale entries.
+    A cache without a path is disabled: every lookup misses and nothing is
+    written.
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.hits = 0
+        self.entries: dict[str, dict] = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        if path is None:
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == CACHE_VERSION:
+            self.entries = data.get("entries", {})
+
+    def lookup(self, slot: str, identity: object) -> object | None:
+        if self.path is None or identity is None:
+            return None
+        with self.lock:
+            entry = self.entries.get(slot)
+            if entry is None or entry.get("identity") != identity:
+                return None
+            self.hits += 1
+            return entry.get("value")
+
+    def store(self, slot: str, identity: object, value: object) -> None:
+        if self.path is None or identity is None:
+            return
+        with self.lock:
+            self.entries[slot] = {"identity": identity, "value": value}
+            self.dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(
+                json.dumps(
+                    {"version": CACHE_VERSION, "entries": self.entries},
+                    indent=2,
+                    sort_keys=True,
+                )
+                + "\n",
+                encoding="utf-8",
+            )
+            tmp_path.replace(self.path)
+        except OSError:
+            # A read-only home directory only costs the speed-up.
+            pass
+
+
+NO_CACHE = ProbeCache(None)
+
+
+def tool_version(command: str, timeout: float = DEFAULT_TIMEOUT) -> str:
+    """Return a short version line when available.
+
+    Raises `subprocess.TimeoutExpired` when the tool does not answer in time.
+    """
     version_args = {
         "python3": ["--version"],
         "arm-none-eabi-gcc": ["--version"],
@@ -114,6 +251,7 @@ def tool_version(command: str) -> str:
             capture_output=True,
             text=True,
             check=False,
+            timeout=timeout,
         )
     except OSError:
         return ""
@@ -122,7 +260,11 @@ def tool_version(command: str) -> str:
     return output[0].strip() if output else ""
 
 
-def check_command(check: CommandCheck) -> CheckResult:
+def check_command(
+    check: CommandCheck,
+    timeout: float = DEFAULT_TIMEOUT,
+    cache: ProbeCache = NO_CACHE,
+) -> CheckResult:
     path = shutil.which(check.command)
     if not path:
         return CheckResult(
@@ -133,7 +275,22 @@ def check_command(check: CommandCheck) -> CheckResult:
             details="install needed",
         )
 
-    version = tool_version(check.command)
+    slot = f"command:{check.command}"
+    identity = file_identity(path)
+    version = cache.lookup(slot, identity)
+    if version is None:
+        try:
+            version = tool_version(check.command, timeout)
+        except subprocess.TimeoutExpired:
+            return CheckResult(
+                label=check.label,
+                kind="command",
+                required=check.required,
+                status="TIMEOUT",
+                details=f"{path} | no version answer within {timeout:g}s",
+            )
+        if version:
+            cache.store(slot, identity, version)
     details = f"{path} | {version}" if version else path
     return CheckResult(
         label=check.label,
@@ -141,10 +298,11 @@ def check_command(check: CommandCheck) -> CheckResult:
         required=check.required,
         status="FOUND",
         details=details,
+        version=version,
     )
 
 
-def check_package(check: PackageCheck) -> CheckResult:
+def check_package(check: PackageCheck, cache: ProbeCache = NO_CACHE) -> CheckResult:
     spec = importlib.util.find_spec(check.import_name)
     if spec is None:
         return CheckResult(
@@ -155,10 +313,18 @@ def check_package(check: PackageCheck) -> CheckResult:
             details=f"install needed: python3 -m pip install {check.distribution}",
         )
 
-    try:
-        version = importlib.metadata.version(check.distribution)
-    except importlib.metadata.PackageNotFoundError:
-        version = ""
+    slot = f"package:{check.distribution}"
+    identity = None
+    if spec.origin and spec.has_location:
+        identity = [sys.executable, file_identity(spec.origin)]
+    version = cache.lookup(slot, identity)
+    if version is None:
+        try:
+            version = importlib.metadata.version(check.distribution)
+        except importlib.metadata.PackageNotFoundError:
+            version = ""
+        if version:
+            cache.store(slot, identity, version)
 
     details = f"{check.distribution} {version}" if version else check.distribution
     return CheckResult(
@@ -167,6 +333,7 @@ def check_package(check: PackageCheck) -> CheckResult:
         required=check.required,
         status="FOUND",
         details=details,
+        version=version,
     )
 
 
@@ -211,41 +378,63 @@ def check_env_path(check: EnvPathCheck) -> CheckResult:
     )
 
 
-def read_vscode_extensions() -> tuple[set[str] | None, str]:
+def vscode_extensions_dir() -> Path:
+    configured = os.environ.get("VSCODE_EXTENSIONS")
+    return Path(configured) if configured else Path.home() / ".vscode" / "extensions"
+
+
+def read_vscode_extensions(
+    timeout: float = DEFAULT_TIMEOUT,
+    cache: ProbeCache = NO_CACHE,
+) -> tuple[set[str] | None, str, str]:
+    """Return installed extension IDs, or None plus a status and reason."""
     code_path = shutil.which("code")
     if not code_path:
-        return None, "`code` CLI not found in PATH"
+        return None, "SKIPPED", "`code` CLI not found in PATH"
 
-    proc = subprocess.run(
-        ["code", "--list-extensions"],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+    # Installing or removing an extension adds or removes a directory here.
+    extensions_dir = vscode_extensions_dir()
+    identity = [file_identity(code_path), file_identity(extensions_dir)]
+    cached = cache.lookup("vscode-extensions", identity)
+    if cached is not None:
+        return set(cached), "FOUND", ""
+
+    try:
+        proc = subprocess.run(
+            ["code", "--list-extensions"],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return None, "TIMEOUT", f"`code --list-extensions` took over {timeout:g}s"
     if proc.returncode != 0:
         message = (proc.stderr or proc.stdout).strip().splitlines()
         detail = message[0] if message else "failed to list extensions"
-        return None, f"`code --list-extensions` failed: {detail}"
+        return None, "SKIPPED", f"`code --list-extensions` failed: {detail}"
 
     extensions = {
         line.strip().lower()
         for line in (proc.stdout or "").splitlines()
         if line.strip()
     }
-    return extensions, ""
+    cache.store("vscode-extensions", identity, sorted(extensions))
+    return extensions, "FOUND", ""
 
 
 def check_vscode_extension(
     check: VscodeExtensionCheck,
     installed_extensions: set[str] | None,
     skip_reason: str,
+    skip_status: str = "SKIPPED",
 ) -> CheckResult:
     if installed_extensions is None:
         return CheckResult(
             label=check.label,
             kind="vscode-ext",
             required=check.required,
-            status="SKIPPED",
+            status=skip_status,
             details=skip_reason,
         )
 
@@ -267,6 +456,261 @@ def check_vscode_extension(
     )
 
 
+def sdk_build_result(status: str, details: str) -> CheckResult:
+    return CheckResult(
+        label="Pico SDK trial build (--deep)",
+        kind="sdk-build",
+        required=False,
+        status=status,
+        details=details,
+    )
+
+
+def sdk_commit(sdk_root: Path, timeout: float) -> str:
+    """Identify the SDK checkout: HEAD plus submodule commits, if under git."""
+    try:
+        head = subprocess.run(
+            ["git", "-C", str(sdk_root), "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=timeout,
+        )
+        submodules = subprocess.run(
+            ["git", "-C", str(sdk_root), "submodule", "status"],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        head = submodules = None
+    if head is not None and head.returncode == 0:
+        return f"{head.stdout.strip()} {submodules.stdout.strip()}".strip()
+    # Release tarball: fall back to the version file's identity.
+    return json.dumps(file_identity(sdk_root / "pico_sdk_version.cmake"))
+
+
+def last_error_line(output: str) -> str:
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    for line in lines:
+        if "error" in line.lower():
+            return line
+    return lines[-1] if lines else "no output"
+
+
+def run_build_step(
+    name: str,
+    args: list[str],
+    log_path: Path,
+    timeout: float,
+) -> tuple[float, str | None]:
+    """Run one CMake step; return its seconds and an error summary or None.
+
+    Raises `subprocess.TimeoutExpired` when the step exceeds `timeout`.
+    """
+    started = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            args,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=timeout,
+        )
+    except OSError as exc:
+        return time.perf_counter() - started, f"{name} could not start: {exc}"
+    seconds = time.perf_counter() - started
+    log_path.write_text(proc.stdout + proc.stderr, encoding="utf-8")
+    if proc.returncode != 0:
+        summary = last_error_line(proc.stderr or proc.stdout)
+        return seconds, f"{name} failed: {summary} (log: {log_path})"
+    return seconds, None
+
+
+def check_sdk_build(
+    timeout: float = DEFAULT_DEEP_TIMEOUT,
+    cache: ProbeCache = NO_CACHE,
+) -> CheckResult:
+    """Configure and compile the L00 Pico SDK sample as a toolchain smoke test."""
+    value = os.environ.get("PICO_SDK_PATH", "").strip()
+    sdk_root = Path(value).expanduser() if value else None
+    if sdk_root is None or not (sdk_root / "external/pico_sdk_import.cmake").exists():
+        return sdk_build_result("SKIPPED", "PICO_SDK_PATH is not a usable pico-sdk")
+    for name, marker in SDK_SUBMODULE_MARKERS.items():
+        if not (sdk_root / marker).exists():
+            return sdk_build_result(
+                "MISSING",
+                f"{name} submodule missing: git -C {sdk_root} submodule update --init",
+            )
+    cmake = shutil.which("cmake")
+    if not cmake or not shutil.which("arm-none-eabi-gcc"):
+        return sdk_build_result("SKIPPED", "needs cmake and arm-none-eabi-gcc in PATH")
+
+    probe_timeout = min(timeout, DEFAULT_TIMEOUT)
+    try:
+        toolchain = tool_version("arm-none-eabi-gcc", probe_timeout)
+        cmake_version = tool_version("cmake", probe_timeout)
+    except subprocess.TimeoutExpired as exc:
+        return sdk_build_result(
+            "TIMEOUT", f"{exc.cmd[0]}: no version answer within {probe_timeout:g}s"
+        )
+    board = os.environ.get("PICO_BOARD", "pico")
+    generator = ["-G", "Ninja"] if shutil.which("ninja") else []
+    identity = [
+        str(sdk_root.resolve()),
+        sdk_commit(sdk_root, probe_timeout),
+        toolchain,
+        cmake_version,
+        board,
+        generator,
+        # Editing the sample itself should also trigger a new trial build.
+        [
+            file_identity(path)
+            for path in sorted(SDK_SAMPLE_DIR.iterdir())
+            if path.is_file()
+        ],
+    ]
+    cached = cache.lookup("sdk-build", identity)
+    if cached is not None:
+        return sdk_build_result("FOUND", f"{cached} (cached)")
+
+    key = hashlib.sha256(json.dumps(identity).encode("utf-8")).hexdigest()[:16]
+    builds_root = user_cache_dir() / SDK_TRIAL_BUILD_DIRNAME
+    build_dir = builds_root / key
+    if builds_root.is_dir():
+        for old_build in builds_root.iterdir():
+            if old_build != build_dir:
+                # Trial builds for an older SDK or toolchain are never reused.
+                shutil.rmtree(old_build, ignore_errors=True)
+    build_dir.mkdir(parents=True, exist_ok=True)
+
+    configure_args = [
+        cmake,
+        "-S",
+        str(SDK_SAMPLE_DIR),
+        "-B",
+        str(build_dir),
+        *generator,
+        f"-DPICO_SDK_PATH={sdk_root}",
+        f"-DPICO_BOARD={board}",
+        # Offline check: do not download/build picotool for UF2 output.
+        "-DPICO_NO_PICOTOOL=1",
+    ]
+    build_args = [cmake, "--build", str(build_dir), "--parallel"]
+    started = time.perf_counter()
+    try:
+        configure_seconds, error = run_build_step(
+            "configure", configure_args, build_dir / "configure.log", timeout
+        )
+        if error:
+            return sdk_build_result("ERROR", error)
+        remaining = max(timeout - (time.perf_counter() - started), 1.0)
+        compile_seconds, error = run_build_step(
+            "compile", build_args, build_dir / "compile.log", remaining
+        )
+        if error:
+            return sdk_build_result("ERROR", error)
+    except subprocess.TimeoutExpired:
+        return sdk_build_result(
+            "TIMEOUT", f"trial build took over {timeout:g}s (build dir: {build_dir})"
+        )
+
+    details = (
+        f"configure {configure_seconds:.1f}s, compile {compile_seconds:.1f}s | "
+        f"board {board} | {toolchain or 'arm-none-eabi-gcc'}"
+    )
+    cache.store("sdk-build", identity, details)
+    return sdk_build_result("FOUND", details)
+
+
+def timed(probe: Callable, *args: object) -> tuple[object, float]:
+    """Call `probe(*args)` and return its result and wall time in seconds."""
+    started = time.perf_counter()
+    result = probe(*args)
+    return result, round(time.perf_counter() - started, 4)
+
+
+def run_checks(
+    timeout: float = DEFAULT_TIMEOUT,
+    cache: ProbeCache = NO_CACHE,
+    deep_timeout: float | None = None,
+) -> list[CheckResult]:
+    """Run every probe concurrently; results keep the order of the check lists.
+
+    Each result carries the wall time of its own probe. Extension checks share
+    the single `code --list-extensions` call, so they all report its time.
+    The `--deep` SDK trial build runs alongside when `deep_timeout` is given.
+    """
+    # One worker per probe, counting the extension listing and the --deep
+    # trial build, so no probe waits for a free worker.
+    probe_count = (
+        len(COMMAND_CHECKS)
+        + len(PACKAGE_CHECKS)
+        + len(ENV_PATH_CHECKS)
+        + 1
+        + (deep_timeout is not None)
+    )
+    with ThreadPoolExecutor(max_workers=probe_count) as pool:
+        futures = [
+            *(
+                pool.submit(timed, check_command, check, timeout, cache)
+                for check in COMMAND_CHECKS
+            ),
+            *(
+                pool.submit(timed, check_package, check, cache)
+                for check in PACKAGE_CHECKS
+            ),
+            *(pool.submit(timed, check_env_path, check) for check in ENV_PATH_CHECKS),
+        ]
+        extensions_future = pool.submit(timed, read_vscode_extensions, timeout, cache)
+        sdk_build_future = None
+        if deep_timeout is not None:
+            sdk_build_future = pool.submit(timed, check_sdk_build, deep_timeout, cache)
+        results = [
+            replace(result, seconds=seconds)
+            for result, seconds in (future.result() for future in futures)
+        ]
+        listing, listing_seconds = extensions_future.result()
+
+    installed_extensions, skip_status, skip_reason = listing
+    for check in VSCODE_EXTENSION_CHECKS:
+        result = check_vscode_extension(
+            check, installed_extensions, skip_reason, skip_status
+        )
+        results.append(replace(result, seconds=listing_seconds))
+    if sdk_build_future is not None:
+        result, seconds = sdk_build_future.result()
+        results.append(replace(result, seconds=seconds))
+    return results
+
+
+def write_machine_report(
+    results: list[CheckResult],
+    output_format: str,
+    started: datetime,
+    seconds: float,
+) -> None:
+    """Print results as one JSON document or as one NDJSON line per check."""
+    host = platform.node()
+    started_text = started.isoformat(timespec="seconds")
+    if output_format == "ndjson":
+        for result in results:
+            record = {"host": host, "started": started_text, **asdict(result)}
+            print(json.dumps(record, sort_keys=True))
+        return
+
+    report = {
+        "host": host,
+        "started": started_text,
+        "seconds": round(seconds, 4),
+        "platform": platform.platform(),
+        "python": sys.executable,
+        "results": [asdict(result) for result in results],
+    }
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Check environment tools for L00")
     parser.add_argument(
@@ -279,23 +723,76 @@ def main() -> int:
         action="store_true",
         help="Return non-zero exit code when any required or recommended check is missing.",
     )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        metavar="SECONDS",
+        help=f"Per-probe time limit for tool commands (default: {DEFAULT_TIMEOUT:g}).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Probe every tool again and do not read or update the probe cache.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="table",
+        help="Output a readable table (default), a JSON report or NDJSON lines.",
+    )
+    parser.add_argument(
+        "--deep",
+        action="store_true",
+        help="Also configure and compile pico-sdk-usb-hello against PICO_SDK_PATH.",
+    )
+    parser.add_argument(
+        "--deep-timeout",
+        type=float,
+        default=DEFAULT_DEEP_TIMEOUT,
+        metavar="SECONDS",
+        help=(
+            "Time limit for the --deep trial build "
+            f"(default: {DEFAULT_DEEP_TIMEOUT:g})."
+        ),
+    )
     args = parser.parse_args()
+    if args.timeout <= 0 or args.deep_timeout <= 0:
+        parser.error("--timeout and --deep-timeout must be positive")
 
-    results: list[CheckResult] = []
-
-    for check in COMMAND_CHECKS:
-        results.append(check_command(check))
+    cache = ProbeCache(None if args.no_cache else user_cache_dir() / CACHE_FILENAME)
+    started = datetime.now(timezone.utc)
+    started_clock = time.perf_counter()
+    results = run_checks(args.timeout, cache, args.deep_timeout if args.deep else None)
+    elapsed = time.perf_counter() - started_clock
+    cache.save()
 
-    for check in PACKAGE_CHECKS:
-        results.append(check_package(check))
+    missing_required = [
+        result for result in results if result.required and result.status != "FOUND"
+    ]
+    missing_recommended = [
+        result
+        for result in results
+        if (not result.required) and result.status in {"MISSING", "ERROR", "TIMEOUT"}
+    ]
+    if args.format != "table":
+        write_machine_report(results, args.format, started, elapsed)
+    else:
+        print_table(results, cache, missing_required, missing_recommended)
 
-    for check in ENV_PATH_CHECKS:
-        results.append(check_env_path(check))
+    if args.strict and missing_required:
+        return 1
+    if args.strict_all and (missing_required or missing_recommended):
+        return 1
+    return 0
 
-    installed_extensions, skip_reason = read_vscode_extensions()
-    for check in VSCODE_EXTENSION_CHECKS:
-        results.append(check_vscode_extension(check, installed_extensions, skip_reason))
 
+def print_table(
+    results: list[CheckResult],
+    cache: ProbeCache,
+    missing_required: list[CheckResult],
+    missing_recommended: list[CheckResult],
+) -> None:
     required_total = sum(1 for result in results if result.required)
     found_required = sum(
         1 for result in results if result.required and result.status == "FOUND"
@@ -303,6 +800,8 @@ def main() -> int:
 
     print("L00 environment check")
     print(f"Python interpreter for package checks: {sys.executable}")
+    if cache.path is not None:
+        print(f"Probe cache: {cache.path} ({cache.hits} results reused)")
     print("=" * 112)
     print(f"{'Item':36} {'Type':12} {'Required':8} {'Status':8} Details")
     print("-" * 112)
@@ -314,14 +813,6 @@ def main() -> int:
             f"{result.status:8} {result.details}"
         )
 
-    missing_required = [
-        result for result in results if result.required and result.status != "FOUND"
-    ]
-    missing_recommended = [
-        result
-        for result in results
-        if (not result.required) and result.status in {"MISSING", "ERROR"}
-    ]
     skipped_checks = [result for result in results if result.status == "SKIPPED"]
 
     print("=" * 112)
@@ -344,12 +835,6 @@ def main() -> int:
         for result in skipped_checks:
             print(f"- {result.label}: {result.details}")
 
-    if args.strict and missing_required:
-        return 1
-    if args.strict_all and (missing_required or missing_recommended):
-        return 1
-    return 0
-
 
 if __name__ == "__main__":
     raise SystemExit(main())
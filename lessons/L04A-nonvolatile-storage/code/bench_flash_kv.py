@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Benchmark the flash KV store on simulated flash across key counts.
+
+Usage:
+  python3 lessons/L04A-nonvolatile-storage/code/bench_flash_kv.py
+  python3 lessons/L04A-nonvolatile-storage/code/bench_flash_kv.py --keys 16,2048 --sectors 64
+  python3 lessons/L04A-nonvolatile-storage/code/bench_flash_kv.py --idle-every 0
+  python3 lessons/L04A-nonvolatile-storage/code/bench_flash_kv.py --power-cuts 500
+
+For each key count the benchmark writes every key once, then performs
+`--updates` overwrites of random keys, reads every key back and finally
+"reboots" (opens a new store on the same flash) to time the boot scan. It
+reports put/get rates, erases (total and the busiest/least used sector, i.e.
+wear spread), compactions that had to run inside `put`, and write
+amplification: record bytes (log) and whole flash pages (flash) written per
+byte of key + value.
+
+`--idle-every N` calls `store.compact()` after every N operations, like an
+idle loop on the board would, so most compaction happens outside `put`.
+
+`--power-cuts N` adds a torture run on a 4-sector flash: N times, power is
+cut at a random program or erase, the store is reopened and every key is checked. A key being
+written at the cut may hold its old or its new value; anything else (lost or
+corrupted keys) is counted as a violation and makes the exit status 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+
+from flash_kv import FlashKV
+from sim_flash import PowerCut, SimFlash
+
+DEFAULT_KEYS = (16, 64, 256, 1024)
+DEFAULT_SECTORS = 16
+DEFAULT_UPDATES = 20000
+DEFAULT_VALUE_BYTES = 24
+DEFAULT_IDLE_EVERY = 8
+# Small flash for the power-cut run, so cuts often hit compaction and erases.
+CUT_SECTORS = 4
+
+
+@dataclass
+class KeyCountResult:
+    keys: int
+    puts_per_s: float
+    gets_per_s: float
+    boot_scan_ms: float
+    erases: int
+    max_sector_erases: int
+    min_sector_erases: int
+    compactions: int
+    foreground_compactions: int
+    log_amplification: float
+    write_amplification: float
+
+
+def make_value(rng: random.Random, size: int) -> bytes:
+    return rng.randbytes(size)
+
+
+def run_key_count(
+    keys: int,
+    sectors: int,
+    updates: int,
+    value_bytes: int,
+    idle_every: int,
+    seed: int,
+) -> KeyCountResult:
+    rng = random.Random(seed)
+    flash = SimFlash(sectors, seed=seed)
+    store = FlashKV(flash)
+    names = [b"key%05d" % index for index in range(keys)]
+    model = {}
+
+    started = time.perf_counter()
+    for operation in range(keys + updates):
+        name = names[operation] if operation < keys else rng.choice(names)
+        model[name] = make_value(rng, value_bytes)
+        store.put(name, model[name])
+        if idle_every and operation % idle_every == idle_every - 1:
+            store.compact()
+    put_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for name in names:
+        if store.get(name) != model[name]:
+            raise SystemExit(f"read back wrong value for {name!r}")
+    get_seconds = time.perf_counter() - started
+
+    metrics = store.snapshot()
+    rebooted = FlashKV(flash)
+    if {name: rebooted.get(name) for name in rebooted.keys()} != model:
+        raise SystemExit(f"contents differ after reboot ({keys} keys)")
+
+    return KeyCountResult(
+        keys=keys,
+        puts_per_s=round((keys + updates) / put_seconds),
+        gets_per_s=round(keys / get_seconds),
+        boot_scan_ms=round(rebooted.metrics.boot_scan_seconds * 1000, 3),
+        erases=metrics.erases,
+        max_sector_erases=max(flash.erase_counts),
+        min_sector_erases=min(flash.erase_counts),
+        compactions=metrics.compactions,
+        foreground_compactions=metrics.foreground_compactions,
+        log_amplification=round(metrics.log_amplification, 2),
+        write_amplification=round(metrics.write_amplification, 2),
+    )
+
+
+def reopen(flash: SimFlash, rng: random.Random) -> FlashKV:
+    """Reboot, sometimes cutting power again during the boot-time cleanup."""
+    while True:
+        if rng.random() < 0.2:
+            flash.cut_power_after(1)
+        try:
+            store = FlashKV(flash)
+        except PowerCut:
+            continue
+        flash.ops_until_cut = None
+        return store
+
+
+def power_cut_check(cycles: int, value_bytes: int, seed: int) -> int:
+    """Return the number of keys found lost or corrupted after power cuts."""
+    rng = random.Random(seed)
+    flash = SimFlash(CUT_SECTORS, seed=seed)
+    store = FlashKV(flash)
+    names = [b"cut%03d" % index for index in range(48)]
+    model: dict[bytes, bytes] = {}
+    violations = 0
+    for _ in range(cycles):
+        flash.cut_power_after(rng.randint(1, 60))
+        name = old = new = None
+        try:
+            while True:
+                name = rng.choice(names)
+                old = model.get(name)
+                if old is not None and rng.random() < 0.1:
+                    new = None
+                    store.delete(name)
+                else:
+                    new = make_value(rng, rng.randint(0, value_bytes * 2))
+                    store.put(name, new)
+                if new is None:
+                    model.pop(name, None)
+                else:
+                    model[name] = new
+                if rng.random() < 0.05:
+                    store.compact()
+        except PowerCut:
+            pass
+        store = reopen(flash, rng)
+        # The interrupted operation may or may not have happened.
+        found = store.get(name)
+        if found not in (old, new):
+            violations += 1
+        elif found is None:
+            model.pop(name, None)
+        else:
+            model[name] = found
+        for key in names:
+            if store.get(key) != model.get(key):
+                violations += 1
+                model[key] = store.get(key)
+                if model[key] is None:
+                    del model[key]
+    return violations
+
+
+def parse_counts(text: str) -> list[int]:
+    counts = [int(item) for item in text.split(",") if item.strip()]
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError("key counts must be positive integers")
+    return counts
+
+
+def print_results(results: list[KeyCountResult]) -> None:
+    print(
+        f"{'Keys':>6} {'Puts/s':>8} {'Gets/s':>8} {'Boot ms':>8} {'Erases':>7} "
+        f"{'Wear max/min':>12} {'Compact':>7} {'In put':>6} {'Log WA':>6} "
+        f"{'Flash WA':>8}"
+    )
+    print("-" * 86)
+    for result in results:
+        wear = f"{result.max_sector_erases}/{result.min_sector_erases}"
+        print(
+            f"{result.keys:6} {result.puts_per_s:8.0f} {result.gets_per_s:8.0f} "
+            f"{result.boot_scan_ms:8.2f} {result.erases:7} {wear:>12} "
+            f"{result.compactions:7} {result.foreground_compactions:6} "
+            f"{result.log_amplification:6.2f} {result.write_amplification:8.2f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the flash KV store")
+    parser.add_argument(
+        "--keys",
+        type=parse_counts,
+        default=list(DEFAULT_KEYS),
+        help="Comma-separated key counts (default: 16,64,256,1024).",
+    )
+    parser.add_argument(
+        "--sectors",
+        type=int,
+        default=DEFAULT_SECTORS,
+        help=f"Simulated flash size in 4 KB sectors (default: {DEFAULT_SECTORS}).",
+    )
+    parser.add_argument(
+        "--updates",
+        type=int,
+        default=DEFAULT_UPDATES,
+        help=f"Random overwrites after the initial load (default: {DEFAULT_UPDATES}).",
+    )
+    parser.add_argument(
+        "--value-bytes",
+        type=int,
+        default=DEFAULT_VALUE_BYTES,
+        help=f"Value size in bytes (default: {DEFAULT_VALUE_BYTES}).",
+    )
+    parser.add_argument(
+        "--idle-every",
+        type=int,
+        default=DEFAULT_IDLE_EVERY,
+        help="Call compact() after every N operations; 0 disables "
+        f"(default: {DEFAULT_IDLE_EVERY}).",
+    )
+    parser.add_argument(
+        "--power-cuts",
+        type=int,
+        default=0,
+        help="Also run this many power-cut/reboot cycles and verify all keys.",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--format", choices=("table", "json"), default="table")
+    args = parser.parse_args()
+    if args.sectors < 3 or args.updates < 0 or args.value_bytes < 0:
+        parser.error("--sectors must be at least 3; sizes must be non-negative")
+
+    results = [
+        run_key_count(
+            keys,
+            args.sectors,
+            args.updates,
+            args.value_bytes,
+            args.idle_every,
+            args.seed,
+        )
+        for keys in args.keys
+    ]
+    violations = 0
+    if args.power_cuts:
+        violations = power_cut_check(args.power_cuts, args.value_bytes, args.seed)
+
+    if args.format == "json":
+        report = {"results": [asdict(result) for result in results]}
+        if args.power_cuts:
+            report["power_cuts"] = {"cycles": args.power_cuts, "violations": violations}
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Flash KV benchmark: {args.sectors} sectors x 4 KB")
+        print_results(results)
+        if args.power_cuts:
+            print(f"power cuts: {args.power_cuts} cycles, {violations} violations")
+    if violations:
+        print("power-cut check failed: keys lost or corrupted", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,455 @@
+"""Append-only key-value store for NOR flash, with compaction and wear metrics.
+
+Usage:
+  from sim_flash import SimFlash
+  from flash_kv import FlashKV
+
+  flash = SimFlash(sectors=16)
+  store = FlashKV(flash)
+  store.put(b"cal.offset", b"\\x12\\x00")
+  store.get(b"cal.offset")
+  store = FlashKV(flash)          # "reboot": the index is rebuilt from flash
+
+Flash cannot rewrite a byte in place, so every `put` or `delete` appends a
+record to a log instead. The log lives in 4 KB sectors, each starting with a
+16-byte header (magic, sequence number, CRC, three flag bytes). A record is
+`tag | key length | value length | CRC32 | key | value`; the CRC covers the
+whole record, so a write torn by a power cut is recognised and ignored.
+
+Opening the store scans the flash once: sectors are replayed oldest first,
+later records override earlier ones, and the result is an in-RAM index from
+key to value address. `get` is then one dict lookup plus one flash read.
+
+One erased sector is always kept in reserve. When the log needs a new sector
+and only the reserve is left, the oldest sector is compacted: its live
+records are copied into the reserve (which becomes the new head), the copy is
+flagged complete, the old sector is flagged retired and erased. Taking the
+oldest sector spreads erases evenly and makes dropping delete markers safe.
+The flags make every step restartable: at boot an unfinished copy is simply
+erased (the original is still intact) and a retired sector is erased again.
+
+Compaction costs a sector erase (tens of milliseconds on real flash). Call
+`compact()` from an idle loop to do it before the head fills up
+("background"), so `put` rarely waits for it.
+
+Any object with `sectors`, `read(address, length)`, `program(address, data)`
+(whole 256-byte pages) and `erase(address)` (4 KB sectors) can be the flash:
+`sim_flash.SimFlash` on a PC, `RP2Flash` (below) on a MicroPython board.
+This module runs on both; copy only `flash_kv.py` to the board.
+"""
+
+import struct
+
+try:
+    from binascii import crc32
+except ImportError:
+    # MicroPython ports built without binascii.crc32: same CRC-32, by table.
+    CRC_TABLE = []
+    for _byte in range(256):
+        _crc = _byte
+        for _ in range(8):
+            _crc = (_crc >> 1) ^ 0xEDB88320 if _crc & 1 else _crc >> 1
+        CRC_TABLE.append(_crc)
+
+    def crc32(data, crc=0):
+        crc ^= 0xFFFFFFFF
+        for byte in data:
+            crc = CRC_TABLE[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+        return crc ^ 0xFFFFFFFF
+
+
+try:
+    from time import ticks_diff, ticks_us
+except ImportError:
+    from time import perf_counter_ns
+
+    def ticks_us():
+        return perf_counter_ns() // 1000
+
+    def ticks_diff(end, start):
+        return end - start
+
+
+try:
+    import rp2
+except ImportError:
+    # Not on an RP2040/RP2350 board; use sim_flash.SimFlash as the flash.
+    rp2 = None
+
+# RP2040/RP2350 QSPI flash geometry (same as sim_flash).
+SECTOR_SIZE = 4096
+PAGE_SIZE = 256
+SECTOR_MAGIC = b"KVS1"
+# magic, sequence, CRC, flags: compaction target, copy complete, retired, unused
+SECTOR_HEADER = "<4sII4B"
+SECTOR_HEADER_SIZE = struct.calcsize(SECTOR_HEADER)
+FLAG_TARGET = 12
+FLAG_COPIED = 13
+FLAG_RETIRED = 14
+FLAG_UNSET = 0xFF
+FLAG_SET = 0x00
+RECORD_HEADER = "<BBHI"  # tag, key length, value length, CRC
+RECORD_HEADER_SIZE = struct.calcsize(RECORD_HEADER)
+TAG_PUT = 0x50
+TAG_DELETE = 0x44
+TAG_ERASED = 0xFF
+RESERVE_SECTORS = 1
+MAX_KEY = 255
+MAX_RECORD = SECTOR_SIZE - SECTOR_HEADER_SIZE
+IDLE_SLACK = SECTOR_SIZE // 8
+ERASED_SECTOR = b"\xff" * SECTOR_SIZE
+
+
+class StoreFull(Exception):
+    """Live data no longer fits, even after compaction."""
+
+
+class KVMetrics:
+    def __init__(self):
+        self.keys = 0
+        self.live_bytes = 0
+        self.user_bytes = 0
+        self.log_bytes = 0
+        self.programmed_bytes = 0
+        self.erases = 0
+        self.compactions = 0
+        self.foreground_compactions = 0
+        self.torn_records = 0
+        self.boot_scan_seconds = 0.0
+        self.boot_bytes_scanned = 0
+
+    @property
+    def log_amplification(self):
+        """Record bytes appended (copies included) per byte of key + value."""
+        return self.log_bytes / self.user_bytes if self.user_bytes else 0.0
+
+    @property
+    def write_amplification(self):
+        """Flash bytes programmed (whole pages) per byte of key + value."""
+        return self.programmed_bytes / self.user_bytes if self.user_bytes else 0.0
+
+
+def record_size(key, value_length):
+    return RECORD_HEADER_SIZE + len(key) + value_length
+
+
+def record_crc(tag, key, value):
+    return crc32(value, crc32(key, crc32(bytes((tag,)))))
+
+
+def sector_of(value_address):
+    # From the key's last byte: an empty value may end exactly at the sector end.
+    return (value_address - 1) // SECTOR_SIZE
+
+
+def header_crc(sequence, target):
+    return crc32(SECTOR_MAGIC + struct.pack("<IB", sequence, target))
+
+
+class FlashKV:
+    def __init__(self, flash):
+        if flash.sectors < RESERVE_SECTORS + 2:
+            raise ValueError(
+                "the store needs at least %d sectors" % (RESERVE_SECTORS + 2)
+            )
+        self.flash = flash
+        # Usable space: everything but the reserve and one partly filled head.
+        self.capacity = (flash.sectors - RESERVE_SECTORS - 1) * MAX_RECORD
+        self.metrics = KVMetrics()
+        # key -> (value address, value length); the only copy of the log in RAM.
+        self.index = {}
+        self.sector_keys = {}  # sector -> keys whose live value is in it
+        self.live_bytes = 0
+        self.log = []  # active sectors, oldest first
+        self.free = []
+        self.head = None
+        self.head_offset = SECTOR_SIZE
+        self.next_sequence = 1
+        self.mount()
+
+    # Boot scan
+
+    def mount(self):
+        started = ticks_us()
+        active = []
+        garbage = []
+        contents = {}
+        for sector in range(self.flash.sectors):
+            data = self.flash.read(sector * SECTOR_SIZE, SECTOR_SIZE)
+            self.metrics.boot_bytes_scanned += SECTOR_SIZE
+            magic, sequence, crc, target, copied, retired, _ = struct.unpack_from(
+                SECTOR_HEADER, data
+            )
+            usable = (
+                magic == SECTOR_MAGIC
+                and crc == header_crc(sequence, target)
+                and retired == FLAG_UNSET
+                and (target == FLAG_UNSET or copied == FLAG_SET)
+            )
+            if usable:
+                active.append((sequence, sector))
+                contents[sector] = data
+            elif data == ERASED_SECTOR:
+                self.free.append(sector)
+            else:
+                # Retired, half-erased, torn header or unfinished compaction
+                # copy: nothing in it is needed.
+                garbage.append(sector)
+
+        active.sort()
+        for sequence, sector in active:
+            self.log.append(sector)
+            self.sector_keys[sector] = set()
+            end, torn = self.replay(sector, contents[sector])
+            self.next_sequence = sequence + 1
+            # A torn record may hide further garbage; never append after it.
+            self.head = None if torn else sector
+            self.head_offset = end
+        for sector in garbage:
+            self.erase(sector)
+            self.free.append(sector)
+        # Cut between finishing a copy and retiring its source: the source
+        # has nothing live left, so reclaim it to restore the reserve.
+        while (
+            len(self.free) < RESERVE_SECTORS
+            and self.log
+            and not self.sector_keys[self.log[0]]
+        ):
+            self.compact_oldest()
+        self.metrics.boot_scan_seconds = ticks_diff(ticks_us(), started) / 1000000
+
+    def replay(self, sector, data):
+        """Apply one sector's records; return (end offset, torn tail?)."""
+        base = sector * SECTOR_SIZE
+        offset = SECTOR_HEADER_SIZE
+        view = memoryview(data)
+        while offset + RECORD_HEADER_SIZE <= SECTOR_SIZE:
+            tag, key_length, value_length, crc = struct.unpack_from(
+                RECORD_HEADER, data, offset
+            )
+            if tag == TAG_ERASED:
+                return offset, False
+            key_start = offset + RECORD_HEADER_SIZE
+            value_start = key_start + key_length
+            end = value_start + value_length
+            if (
+                tag not in (TAG_PUT, TAG_DELETE)
+                or end > SECTOR_SIZE
+                or crc
+                != record_crc(tag, view[key_start:value_start], view[value_start:end])
+            ):
+                self.metrics.torn_records += 1
+                return offset, True
+            key = data[key_start:value_start]
+            if tag == TAG_PUT:
+                self.set_index(key, base + value_start, value_length)
+            else:
+                self.drop_index(key)
+            offset = end
+        return offset, False
+
+    # Public API
+
+    def get(self, key, default=None):
+        location = self.index.get(bytes(key))
+        if location is None:
+            return default
+        return self.flash.read(*location)
+
+    def put(self, key, value):
+        """Store `value`; return False when it was already stored (no write)."""
+        key, value = bytes(key), bytes(value)
+        if not 1 <= len(key) <= MAX_KEY:
+            raise ValueError("keys must be 1..%d bytes" % MAX_KEY)
+        size = record_size(key, len(value))
+        if size > MAX_RECORD:
+            raise ValueError("record too large for one sector (%d bytes)" % MAX_RECORD)
+        current = self.index.get(key)
+        if current is not None and self.flash.read(*current) == value:
+            # Rewriting an identical value would only cost wear.
+            return False
+        replaced = record_size(key, current[1]) if current is not None else 0
+        if self.live_bytes - replaced + size > self.capacity:
+            raise StoreFull("live data would exceed %d bytes" % self.capacity)
+        self.make_room(size)
+        address = self.write_record(TAG_PUT, key, value)
+        self.metrics.user_bytes += len(key) + len(value)
+        self.set_index(key, address + RECORD_HEADER_SIZE + len(key), len(value))
+        return True
+
+    def delete(self, key):
+        key = bytes(key)
+        if key not in self.index:
+            return False
+        self.make_room(record_size(key, 0))
+        self.write_record(TAG_DELETE, key, b"")
+        self.metrics.user_bytes += len(key)
+        self.drop_index(key)
+        return True
+
+    def compact(self, force=False):
+        """Do the next compaction now if it is due soon (or if forced).
+
+        It is due once only the reserve sector is free and the head has less
+        than `IDLE_SLACK` bytes left. Meant for idle time; returns True when a
+        sector was reclaimed.
+        """
+        if not force and (
+            len(self.free) > RESERVE_SECTORS or self.head_fits(IDLE_SLACK)
+        ):
+            return False
+        return self.compact_oldest()
+
+    def keys(self):
+        return list(self.index)
+
+    def __contains__(self, key):
+        return bytes(key) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def snapshot(self):
+        """Current metrics, including the live key count and bytes."""
+        self.metrics.keys = len(self.index)
+        self.metrics.live_bytes = self.live_bytes
+        return self.metrics
+
+    # Index bookkeeping
+
+    def set_index(self, key, value_address, value_length):
+        self.drop_index(key)
+        self.index[key] = (value_address, value_length)
+        self.live_bytes += record_size(key, value_length)
+        self.sector_keys[sector_of(value_address)].add(key)
+
+    def drop_index(self, key):
+        location = self.index.pop(key, None)
+        if location is not None:
+            self.live_bytes -= record_size(key, location[1])
+            self.sector_keys[sector_of(location[0])].discard(key)
+
+    # Log writing
+
+    def head_fits(self, size):
+        return self.head is not None and self.head_offset + size <= SECTOR_SIZE
+
+    def make_room(self, size):
+        """Make the head fit `size` bytes, compacting rather than using the reserve."""
+        attempts = 0
+        while not self.head_fits(size):
+            if len(self.free) > RESERVE_SECTORS:
+                self.open_sector(target=False)
+            elif attempts < self.flash.sectors and self.compact_oldest():
+                self.metrics.foreground_compactions += 1
+                attempts += 1
+            else:
+                raise StoreFull("flash is full of live data")
+
+    def write_record(self, tag, key, value):
+        """Append one record to the head (which must fit it); return its address."""
+        address = self.head * SECTOR_SIZE + self.head_offset
+        crc = record_crc(tag, key, value)
+        header = struct.pack(RECORD_HEADER, tag, len(key), len(value), crc)
+        self.program(address, header + key + value)
+        size = record_size(key, len(value))
+        self.head_offset += size
+        self.metrics.log_bytes += size
+        return address
+
+    def open_sector(self, target):
+        sector = self.free.pop(0)
+        flag = FLAG_SET if target else FLAG_UNSET
+        header = struct.pack(
+            SECTOR_HEADER,
+            SECTOR_MAGIC,
+            self.next_sequence,
+            header_crc(self.next_sequence, flag),
+            flag,
+            FLAG_UNSET,
+            FLAG_UNSET,
+            0xFF,
+        )
+        self.program(sector * SECTOR_SIZE, header)
+        self.next_sequence += 1
+        self.log.append(sector)
+        self.sector_keys[sector] = set()
+        self.head = sector
+        self.head_offset = SECTOR_HEADER_SIZE
+        return sector
+
+    def compact_oldest(self):
+        """Move the oldest sector's live records to a fresh sector and erase it."""
+        if not self.log:
+            return False
+        sector = self.log[0]
+        live = list(self.sector_keys[sector])
+        if live:
+            if not self.free:
+                return False
+            target = self.open_sector(target=True)
+            for key in live:
+                value = self.get(key)
+                address = self.write_record(TAG_PUT, key, value)
+                self.set_index(
+                    key, address + RECORD_HEADER_SIZE + len(key), len(value)
+                )
+            self.set_flag(target, FLAG_COPIED)
+        elif sector == self.head:
+            self.head = None
+        self.log.pop(0)
+        del self.sector_keys[sector]
+        # Retire before erasing: a half-erased sector must never be replayed.
+        self.set_flag(sector, FLAG_RETIRED)
+        self.erase(sector)
+        self.free.append(sector)
+        self.metrics.compactions += 1
+        return True
+
+    # Flash access
+
+    def set_flag(self, sector, flag):
+        self.program(sector * SECTOR_SIZE + flag, bytes((FLAG_SET,)))
+
+    def program(self, address, data):
+        """Program `data` at any address by padding it to whole pages with 0xFF."""
+        start = address - address % PAGE_SIZE
+        end = address + len(data)
+        end += -end % PAGE_SIZE
+        pages = bytearray(b"\xff") * (end - start)
+        pages[address - start : address - start + len(data)] = data
+        self.flash.program(start, pages)
+        self.metrics.programmed_bytes += len(pages)
+
+    def erase(self, sector):
+        self.flash.erase(sector * SECTOR_SIZE)
+        self.metrics.erases += 1
+
+
+class RP2Flash:
+    """Flash for FlashKV on an RP2040/RP2350 board, through `rp2.Flash`.
+
+    `start` and `length` (multiples of 4 KB, offsets into the flash area
+    `rp2.Flash` manages) must be a region the filesystem does not use: by
+    default the littlefs filesystem covers that whole area, so build or
+    configure the firmware with a smaller filesystem first.
+    """
+
+    def __init__(self, start, length):
+        if rp2 is None:
+            raise RuntimeError("RP2Flash needs an RP2040/RP2350 board")
+        if start % SECTOR_SIZE or length % SECTOR_SIZE:
+            raise ValueError("start and length must be multiples of 4096")
+        self.device = rp2.Flash(start=start, len=length)
+        self.sectors = length // SECTOR_SIZE
+
+    def read(self, address, length):
+        data = bytearray(length)
+        self.device.readblocks(address // SECTOR_SIZE, data, address % SECTOR_SIZE)
+        return bytes(data)
+
+    def program(self, address, data):
+        self.device.writeblocks(address // SECTOR_SIZE, data, address % SECTOR_SIZE)
+
+    def erase(self, address):
+        self.device.ioctl(6, address // SECTOR_SIZE)  # 6: erase block
@@ -0,0 +1,109 @@
+"""Simulated NOR flash for testing storage code on a PC.
+
+It behaves like the QSPI flash on RP2040/RP2350 boards as seen through the
+Pico SDK (`flash_range_erase` / `flash_range_program`):
+
+- Erased bytes read as 0xFF. Programming can only clear bits; getting a 1
+  back needs an erase of the whole 4 KB sector.
+- Programs are whole 256-byte pages at page-aligned addresses. 0xFF bytes in
+  the data leave the flash untouched, so a page can be programmed again to
+  fill in more of it, but a byte that is already programmed must not be
+  written with a different value (`FlashError`).
+- `cut_power_after(n)` makes the n-th following program or erase stop part of
+  the way through and raise `PowerCut`. An interrupted program writes only a
+  prefix of its data; an interrupted erase only clears its first pages. The
+  flash contents stay as they were at the cut, like after a real reboot.
+
+Counters (erases per sector, pages programmed, bytes read) let benchmarks
+report wear and write amplification.
+"""
+
+from __future__ import annotations
+
+import random
+
+SECTOR_SIZE = 4096
+PAGE_SIZE = 256
+ERASED = 0xFF
+
+# Maps erased bytes to 0x00 and all others to 0xFF: the "bytes being written" mask.
+WRITTEN_MASK = bytes([0xFF] * 255 + [0x00])
+
+
+class FlashError(Exception):
+    """An access real flash would reject or silently corrupt."""
+
+
+class PowerCut(Exception):
+    """Injected power loss; reopen the store to simulate the reboot."""
+
+
+class SimFlash:
+    def __init__(self, sectors: int, *, seed: int = 0) -> None:
+        if sectors < 1:
+            raise ValueError("flash needs at least one sector")
+        self.sectors = sectors
+        self.size = sectors * SECTOR_SIZE
+        self.data = bytearray(b"\xff") * self.size
+        self.erase_counts = [0] * sectors
+        self.page_programs = 0
+        self.bytes_read = 0
+        self.random = random.Random(seed)
+        self.ops_until_cut: int | None = None
+
+    def cut_power_after(self, operations: int) -> None:
+        """Interrupt the `operations`-th program or erase from now (1 = next)."""
+        if operations < 1:
+            raise ValueError("operations must be at least 1")
+        self.ops_until_cut = operations
+
+    def power_fails(self) -> bool:
+        if self.ops_until_cut is None:
+            return False
+        self.ops_until_cut -= 1
+        if self.ops_until_cut > 0:
+            return False
+        self.ops_until_cut = None
+        return True
+
+    def check_range(self, address: int, length: int) -> None:
+        if address < 0 or length < 0 or address + length > self.size:
+            raise FlashError(f"access {address:#x}+{length} is outside the flash")
+
+    def read(self, address: int, length: int) -> bytes:
+        self.check_range(address, length)
+        self.bytes_read += length
+        return bytes(self.data[address : address + length])
+
+    def program(self, address: int, data: bytes) -> None:
+        if address % PAGE_SIZE or len(data) % PAGE_SIZE:
+            raise FlashError("programs must be whole pages at page-aligned addresses")
+        self.check_range(address, len(data))
+        end = address + len(data)
+        old = int.from_bytes(self.data[address:end], "little")
+        new = int.from_bytes(data, "little")
+        mask = int.from_bytes(bytes(data).translate(WRITTEN_MASK), "little")
+        if old & mask != mask:
+            raise FlashError(f"program at {address:#x} overwrites programmed bytes")
+
+        length = len(data)
+        if self.power_fails():
+            length = self.random.randrange(length)
+            end = address + length
+        self.page_programs += -(-length // PAGE_SIZE)
+        self.data[address:end] = (old & new).to_bytes(len(data), "little")[:length]
+        if length < len(data):
+            raise PowerCut(f"power lost while programming {address:#x}")
+
+    def erase(self, address: int) -> None:
+        if address % SECTOR_SIZE:
+            raise FlashError("erase address must be sector-aligned")
+        self.check_range(address, SECTOR_SIZE)
+        sector = address // SECTOR_SIZE
+        self.erase_counts[sector] += 1
+        length = SECTOR_SIZE
+        if self.power_fails():
+            length = self.random.randrange(SECTOR_SIZE // PAGE_SIZE) * PAGE_SIZE
+        self.data[address : address + length] = b"\xff" * length
+        if length < SECTOR_SIZE:
+            raise PowerCut(f"power lost while erasing sector {sector}")
@@ -0,0 +1,257 @@
+"""Benchmark matrix_scan.py: achievable scan rate and key-to-event latency.
+
+Usage:
+  python3 lessons/L05B-button-matrix/code/bench_matrix_scan.py
+  python3 lessons/L05B-button-matrix/code/bench_matrix_scan.py --rows 6 --cols 16
+  python3 lessons/L05B-button-matrix/code/bench_matrix_scan.py --rollover 2 --format json
+
+On a board (runs with the defaults):
+  mpremote fs cp lessons/L05B-button-matrix/code/matrix_scan.py :
+  mpremote fs cp lessons/L05B-button-matrix/code/sim_matrix.py :
+  mpremote run lessons/L05B-button-matrix/code/bench_matrix_scan.py
+
+Scan rate: the engine scans a fixed reading with no keys down ("idle") and a
+reading that changes every row on every scan ("busy", the slowest path).
+1 / busy scan time is the fastest scan rate that can be sustained.
+
+Latency: a simulated typist presses and releases random keys (up to
+`--rollover` at once, each edge bouncing for up to `--max-bounce` scans) on a
+diode-less simulated matrix scanned every `--scan-us`. Latency is measured
+from the physical key change to its event, in scans, and reported in
+microseconds. The bound is (max bounce + debounce scans) scan periods. Presses
+held back by ghost blocking are reported separately, since their delay
+depends on when the other keys are released. A phantom event (a key reported
+that was never pressed) makes the exit status 1.
+"""
+
+import json
+import random
+
+try:
+    from time import ticks_diff, ticks_us
+except ImportError:
+    from time import perf_counter_ns
+
+    def ticks_us():
+        return perf_counter_ns() // 1000
+
+    def ticks_diff(end, start):
+        return end - start
+
+
+try:
+    import argparse
+except ImportError:
+    # MicroPython: run with the defaults.
+    argparse = None
+
+from matrix_scan import DEBOUNCE_SCANS, MatrixScanner
+from sim_matrix import SimMatrix
+
+DEFAULTS = {
+    "rows": 8,
+    "cols": 8,
+    "scan_us": 1000,
+    "max_bounce": 5,
+    "rollover": 3,
+    "scans": 20000,
+    "seed": 1,
+}
+MIN_HOLD_SCANS = 30
+MAX_HOLD_SCANS = 150
+PRESS_CHANCE = 0.05
+
+
+def time_scans(rows, cols, readings, scans):
+    """Average microseconds per scan while cycling through `readings`."""
+    current = [readings[0]]
+
+    def read_row(row):
+        return current[0][row]
+
+    scanner = MatrixScanner(rows, cols, read_row, queue_size=256)
+    started = ticks_us()
+    for index in range(scans):
+        current[0] = readings[index % len(readings)]
+        scanner.scan()
+        while scanner.pop() is not None:
+            pass
+    return ticks_diff(ticks_us(), started) / scans
+
+
+def measure_scan_time(rows, cols, scans):
+    idle = time_scans(rows, cols, [[0] * rows], scans)
+    # Alternating all-down / all-up keeps every counter busy and flips every
+    # key each DEBOUNCE_SCANS scans: the most work a scan can do.
+    full = (1 << cols) - 1
+    flip = [[full] * rows] * DEBOUNCE_SCANS + [[0] * rows] * DEBOUNCE_SCANS
+    busy = time_scans(rows, cols, flip, scans)
+    return idle, busy
+
+
+def measure_latency(rows, cols, max_bounce, rollover, scans, seed):
+    matrix = SimMatrix(rows, cols, seed=seed)
+    scanner = MatrixScanner(rows, cols, matrix.read_row)
+    random.seed(seed)
+    held = {}  # key -> scan number of its physical release
+    pending_press = {}  # key -> (scan of physical press, ghost scans so far)
+    pending_release = {}  # key -> scan of physical release
+    result = {
+        "presses": 0,
+        "worst_scans": 0,
+        "worst_ghost_blocked_scans": 0,
+        "ghost_blocked_presses": 0,
+        "missed_presses": 0,
+        "phantom_events": 0,
+    }
+
+    for now in range(scans):
+        for key in [key for key, until in held.items() if until <= now]:
+            del held[key]
+            matrix.release(key // cols, key % cols, random.randint(0, max_bounce))
+            if key in pending_press:
+                # Released before it was ever reported (blocked by ghosting).
+                del pending_press[key]
+                result["missed_presses"] += 1
+            else:
+                pending_release[key] = now
+        if len(held) < rollover and random.random() < PRESS_CHANCE:
+            key = random.randint(0, rows * cols - 1)
+            if key not in held and key not in pending_release:
+                held[key] = now + random.randint(MIN_HOLD_SCANS, MAX_HOLD_SCANS)
+                matrix.press(key // cols, key % cols, random.randint(0, max_bounce))
+                pending_press[key] = (now, scanner.ghost_scans)
+                result["presses"] += 1
+
+        scanner.scan()
+        matrix.advance()
+        while True:
+            event = scanner.pop()
+            if event is None:
+                break
+            key, pressed, scan = event
+            if pressed and key in pending_press:
+                pressed_at, ghosts_before = pending_press.pop(key)
+                latency = scan - pressed_at + 1
+                if scanner.ghost_scans != ghosts_before:
+                    result["ghost_blocked_presses"] += 1
+                    result["worst_ghost_blocked_scans"] = max(
+                        result["worst_ghost_blocked_scans"], latency
+                    )
+                else:
+                    result["worst_scans"] = max(result["worst_scans"], latency)
+            elif not pressed and key in pending_release:
+                latency = scan - pending_release.pop(key) + 1
+                result["worst_scans"] = max(result["worst_scans"], latency)
+            else:
+                result["phantom_events"] += 1
+
+    result["ghost_scans"] = scanner.ghost_scans
+    result["dropped_events"] = scanner.dropped_events
+    return result
+
+
+def run(rows, cols, scan_us, max_bounce, rollover, scans, seed):
+    idle_us, busy_us = measure_scan_time(rows, cols, min(scans, 5000))
+    latency = measure_latency(rows, cols, max_bounce, rollover, scans, seed)
+    report = {
+        "rows": rows,
+        "cols": cols,
+        "scan_us": scan_us,
+        "debounce_scans": DEBOUNCE_SCANS,
+        "max_bounce_scans": max_bounce,
+        "idle_scan_us": round(idle_us, 2),
+        "busy_scan_us": round(busy_us, 2),
+        "max_scans_per_s": round(1000000 / busy_us) if busy_us else 0,
+        "worst_latency_us": latency["worst_scans"] * scan_us,
+        "latency_bound_us": (max_bounce + DEBOUNCE_SCANS) * scan_us,
+        "worst_ghost_blocked_latency_us": latency["worst_ghost_blocked_scans"]
+        * scan_us,
+    }
+    for name in (
+        "presses",
+        "ghost_blocked_presses",
+        "missed_presses",
+        "phantom_events",
+        "ghost_scans",
+        "dropped_events",
+    ):
+        report[name] = latency[name]
+    return report
+
+
+def print_report(report):
+    print(
+        "Matrix %dx%d, debounce %d scans, bounce up to %d scans, scan every %d us"
+        % (
+            report["rows"],
+            report["cols"],
+            report["debounce_scans"],
+            report["max_bounce_scans"],
+            report["scan_us"],
+        )
+    )
+    print(
+        "scan time: idle %.2f us, busy %.2f us -> up to %d scans/s"
+        % (report["idle_scan_us"], report["busy_scan_us"], report["max_scans_per_s"])
+    )
+    if report["busy_scan_us"] > report["scan_us"]:
+        print("warning: a busy scan takes longer than the scan period")
+    print(
+        "key-to-event latency: worst %d us (bound %d us), ghost-blocked worst %d us"
+        % (
+            report["worst_latency_us"],
+            report["latency_bound_us"],
+            report["worst_ghost_blocked_latency_us"],
+        )
+    )
+    print(
+        "presses %d, ghost-blocked %d, missed %d, phantom events %d, "
+        "ghost scans %d, dropped events %d"
+        % (
+            report["presses"],
+            report["ghost_blocked_presses"],
+            report["missed_presses"],
+            report["phantom_events"],
+            report["ghost_scans"],
+            report["dropped_events"],
+        )
+    )
+
+
+def parse_args():
+    settings = dict(DEFAULTS)
+    settings["format"] = "table"
+    if argparse is None:
+        return settings
+    parser = argparse.ArgumentParser(description="Benchmark the matrix scan engine")
+    for name, default in DEFAULTS.items():
+        parser.add_argument(
+            "--" + name.replace("_", "-"),
+            type=int,
+            default=default,
+            help="(default: %d)" % default,
+        )
+    parser.add_argument("--format", choices=("table", "json"), default="table")
+    args = parser.parse_args()
+    if min(args.rows, args.cols, args.scan_us, args.scans) < 1:
+        parser.error("--rows, --cols, --scan-us and --scans must be positive")
+    if args.cols > 32 or args.max_bounce < 0 or args.rollover < 1:
+        parser.error("--cols is at most 32, --max-bounce >= 0, --rollover >= 1")
+    settings.update(vars(args))
+    return settings
+
+
+def main():
+    settings = parse_args()
+    output = settings.pop("format")
+    report = run(**settings)
+    if output == "json":
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 1 if report["phantom_events"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
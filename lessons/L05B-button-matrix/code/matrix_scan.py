@@ -0,0 +1,181 @@
+"""Button matrix scan engine with bitmask debouncing, for MicroPython and CPython.
+
+Each row of the matrix is one integer: bit c is column c. Scanning reads
+every row, then debounces all keys of a row at once with a "vertical
+counter": two integers per row hold a 2-bit counter for every key, so one
+scan is a handful of bitwise operations per row instead of a loop over keys.
+A key has to read differently from its debounced state on 4 scans in a row
+before it changes (scan every 1 ms for a 4 ms debounce).
+
+Without a diode per key, pressing three corners of a rectangle makes the
+fourth corner read as pressed too ("ghosting"). The engine detects a
+rectangle in the raw reading and blocks new presses in the rows involved
+until it clears; releases still go through. That is the rollover limit of a
+diode-less matrix: any 2 keys always work, 3 or more only if they do not
+share rows and columns.
+
+Key changes go into a fixed-size event queue (no allocation while
+scanning); read them with `pop()`. Key number = row * cols + col.
+
+`PinMatrix` drives a real matrix on a board (rows as outputs, columns as
+inputs with pull-ups); `sim_matrix.SimMatrix` replaces it on a PC.
+"""
+
+from array import array
+
+try:
+    import machine
+except ImportError:
+    # Not on a board; use sim_matrix.SimMatrix for read_row.
+    machine = None
+
+DEBOUNCE_SCANS = 4
+EVENT_PRESS = 0x8000
+# RP2040/RP2350 SIO GPIO_IN register: all input levels in one read.
+SIO_GPIO_IN = 0xD0000004
+
+
+class MatrixScanner:
+    """Debounce a matrix read through `read_row(row) -> column bitmask`."""
+
+    def __init__(self, rows, cols, read_row, queue_size=64):
+        if rows * cols > EVENT_PRESS:
+            raise ValueError("matrix too large for the event encoding")
+        self.rows = rows
+        self.cols = cols
+        self.read_row = read_row
+        self.raw = [0] * rows
+        self.state = [0] * rows  # debounced: bit set = key down
+        self.count0 = [0] * rows  # low bits of the per-key counters
+        self.count1 = [0] * rows  # high bits of the per-key counters
+        self.events = array("H", [0] * queue_size)
+        self.event_scans = array("I", [0] * queue_size)
+        self.event_head = 0
+        self.event_count = 0
+        self.scans = 0
+        self.ghost_scans = 0
+        self.dropped_events = 0
+
+    def scan(self):
+        """Read and debounce every row once; return the number of new events."""
+        raw = self.raw
+        read_row = self.read_row
+        for row in range(self.rows):
+            raw[row] = read_row(row)
+        blocked = self.ghost_rows()
+        if blocked:
+            self.ghost_scans += 1
+
+        state = self.state
+        count0 = self.count0
+        count1 = self.count1
+        new_events = 0
+        for row in range(self.rows):
+            sample = raw[row]
+            if blocked >> row & 1:
+                # Ambiguous reading: allow releases, hold back presses.
+                sample &= state[row]
+            delta = sample ^ state[row]
+            c0 = count0[row]
+            c1 = count1[row]
+            if not (delta | c0 | c1):
+                continue
+            # Keys whose counter is at 3 and still differ flip this scan.
+            toggle = delta & c0 & c1
+            # Count up where the sample differs, reset to 0 where it agrees.
+            count1[row] = (c1 ^ c0) & delta
+            count0[row] = ~c0 & delta
+            if toggle:
+                state[row] ^= toggle
+                new_events += self.queue_changes(row, toggle, state[row])
+        self.scans += 1
+        return new_events
+
+    def ghost_rows(self):
+        """Bitmask of rows that share two or more pressed columns."""
+        raw = self.raw
+        rows = self.rows
+        blocked = 0
+        for first in range(rows):
+            bits = raw[first]
+            if not bits & (bits - 1):
+                continue  # fewer than two keys in this row
+            for second in range(first + 1, rows):
+                common = bits & raw[second]
+                if common & (common - 1):
+                    blocked |= (1 << first) | (1 << second)
+        return blocked
+
+    def queue_changes(self, row, toggle, down):
+        size = len(self.events)
+        added = 0
+        key = row * self.cols
+        while toggle:
+            if toggle & 1:
+                if self.event_count == size:
+                    self.dropped_events += 1
+                else:
+                    slot = (self.event_head + self.event_count) % size
+                    self.events[slot] = key | (EVENT_PRESS if down & 1 else 0)
+                    self.event_scans[slot] = self.scans
+                    self.event_count += 1
+                    added += 1
+            toggle >>= 1
+            down >>= 1
+            key += 1
+        return added
+
+    def pop(self):
+        """Return the oldest event as (key, pressed, scan number), or None."""
+        if not self.event_count:
+            return None
+        slot = self.event_head
+        event = self.events[slot]
+        self.event_head = (slot + 1) % len(self.events)
+        self.event_count -= 1
+        return event & ~EVENT_PRESS, bool(event & EVENT_PRESS), self.event_scans[slot]
+
+    def pressed(self):
+        """Debounced key numbers that are down right now."""
+        keys = []
+        for row in range(self.rows):
+            bits = self.state[row]
+            col = 0
+            while bits:
+                if bits & 1:
+                    keys.append(row * self.cols + col)
+                bits >>= 1
+                col += 1
+        return keys
+
+
+class PinMatrix:
+    """Read a real matrix: rows driven low one at a time, columns pulled up.
+
+    With `column_base` set (the columns are consecutive GPIOs starting there),
+    a row is read with one SIO register access instead of one call per pin.
+    """
+
+    def __init__(self, row_pins, col_pins, column_base=None):
+        if machine is None:
+            raise RuntimeError("PinMatrix needs a MicroPython board")
+        self.rows = [machine.Pin(pin, machine.Pin.OUT, value=1) for pin in row_pins]
+        self.cols = [
+            machine.Pin(pin, machine.Pin.IN, machine.Pin.PULL_UP) for pin in col_pins
+        ]
+        self.column_base = column_base
+        self.column_mask = (1 << len(col_pins)) - 1
+
+    def read_row(self, row):
+        pin = self.rows[row]
+        pin.value(0)
+        if self.column_base is not None:
+            levels = machine.mem32[SIO_GPIO_IN] >> self.column_base
+            bits = ~levels & self.column_mask
+        else:
+            bits = 0
+            for col, col_pin in enumerate(self.cols):
+                if not col_pin.value():
+                    bits |= 1 << col
+        pin.value(1)
+        return bits
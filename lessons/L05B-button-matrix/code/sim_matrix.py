@@ -0,0 +1,86 @@
+"""Simulated key matrix with contact bounce and ghosting, for matrix_scan.py.
+
+Usage:
+  from sim_matrix import SimMatrix
+  from matrix_scan import MatrixScanner
+
+  matrix = SimMatrix(8, 8)
+  scanner = MatrixScanner(8, 8, matrix.read_row)
+  matrix.press(1, 2, bounce=3)
+  for _ in range(10):
+      scanner.scan()
+      matrix.advance()
+
+`press`/`release` change a key's contact; for `bounce` scans afterwards the
+key reads randomly open or closed. Without diodes (the default), current
+also flows backwards through other pressed keys, so a row reads every column
+connected to it through a chain of pressed keys, as on real hardware.
+Runs on CPython and MicroPython.
+"""
+
+import random
+
+
+class SimMatrix:
+    def __init__(self, rows, cols, diodes=False, seed=1):
+        self.rows = rows
+        self.cols = cols
+        self.diodes = diodes
+        self.contacts = [0] * rows  # settled contact state per row
+        self.bouncing = [0] * rows  # keys still bouncing per row
+        self.bounce_left = {}  # (row, col) -> scans of bounce left
+        random.seed(seed)
+
+    def press(self, row, col, bounce=0):
+        self.set_contact(row, col, True, bounce)
+
+    def release(self, row, col, bounce=0):
+        self.set_contact(row, col, False, bounce)
+
+    def set_contact(self, row, col, closed, bounce):
+        bit = 1 << col
+        if closed:
+            self.contacts[row] |= bit
+        else:
+            self.contacts[row] &= ~bit
+        if bounce > 0:
+            self.bouncing[row] |= bit
+            self.bounce_left[(row, col)] = bounce
+
+    def advance(self):
+        """One scan period has passed: bouncing keys settle over time."""
+        if not self.bounce_left:
+            return
+        for position in list(self.bounce_left):
+            left = self.bounce_left[position] - 1
+            if left:
+                self.bounce_left[position] = left
+            else:
+                del self.bounce_left[position]
+                self.bouncing[position[0]] &= ~(1 << position[1])
+
+    def closed_row(self, row):
+        bits = self.contacts[row]
+        noisy = self.bouncing[row]
+        if noisy:
+            bits = (bits & ~noisy) | (random.getrandbits(self.cols) & noisy)
+        return bits
+
+    def read_row(self, row):
+        bits = self.closed_row(row)
+        if self.diodes:
+            return bits
+        # Follow paths row -> key -> column -> key -> other row -> key -> column.
+        reached = 1 << row
+        grew = True
+        while grew:
+            grew = False
+            for other in range(self.rows):
+                if reached >> other & 1:
+                    continue
+                other_bits = self.closed_row(other)
+                if other_bits & bits:
+                    reached |= 1 << other
+                    bits |= other_bits
+                    grew = True
+        return bits
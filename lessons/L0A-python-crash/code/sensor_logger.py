@@ -1,4 +1,12 @@
-"""L0A mini practice: fake sensor logger with range checks."""
+"""L0A mini practice: fake sensor logger with range checks.
+
+Readings are handled one at a time, as they would arrive from a real sensor:
+each one is checked and folded into streaming statistics, and none are kept.
+"""
+
+from streaming_stats import MovingAverage, RunningStats
+
+MOVING_WINDOW = 3
 
 
 def classify_temperature(celsius):
@@ -10,15 +18,29 @@ def classify_temperature(celsius):
     return "ok"
 
 
-def average(values):
-    """Return average of a non-empty list."""
-    return sum(values) / len(values)
+def read_sensor():
+    """Yield fake temperature readings (replace with a real sensor read)."""
+    for celsius in (22.1, 23.4, 24.0, 25.6, 26.2):
+        yield celsius
 
 
-readings_c = [22.1, 23.4, 24.0, 25.6, 26.2]
+stats = RunningStats()
+recent = MovingAverage(MOVING_WINDOW)
 
-for index, reading in enumerate(readings_c, start=1):
+for reading in read_sensor():
+    stats.add(reading)
+    smoothed = recent.add(reading)
     status = classify_temperature(reading)
-    print(f"reading {index}: {reading:.1f} C -> {status}")
-
-print(f"summary: count={len(readings_c)}, avg={average(readings_c):.2f} C")
\ No newline at end of file
+    print(
+        f"reading {stats.count}: {reading:.1f} C -> {status} "
+        f"(avg of last {recent.filled}: {smoothed:.2f} C)"
+    )
+
+if stats.count:
+    print(
+        f"summary: count={stats.count}, avg={stats.mean:.2f} C, "
+        f"min={stats.minimum:.1f} C, max={stats.maximum:.1f} C, "
+        f"stdev={stats.stdev():.2f} C"
+    )
+else:
+    print("summary: no readings")
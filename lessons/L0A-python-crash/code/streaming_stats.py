@@ -0,0 +1,98 @@
+"""Streaming statistics in constant memory, for CPython and MicroPython.
+
+A logger that runs for days cannot keep every reading in a list: the Pico has
+264 KB of RAM. These helpers update their summary one sample at a time and
+never store the whole history.
+
+- RunningStats: count, mean, variance/stdev (Welford's method), min and max.
+- MovingAverage: average of the last N samples, kept in a preallocated
+  array('f') ring buffer.
+
+Only `math` and `array` are used, so the same file runs on a board; copy it
+next to your script with: mpremote fs cp streaming_stats.py :
+"""
+
+import math
+from array import array
+
+
+class RunningStats:
+    """Summary of every sample seen so far, updated in O(1) time and memory.
+
+    Welford's method updates the mean and the sum of squared differences
+    together, which stays accurate even after millions of samples (summing
+    squares directly loses precision).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._sq_diff_sum = 0.0
+
+    def add(self, value):
+        """Include one sample."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._sq_diff_sum += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def variance(self):
+        """Sample variance (0.0 until there are two samples)."""
+        if self.count < 2:
+            return 0.0
+        return self._sq_diff_sum / (self.count - 1)
+
+    def stdev(self):
+        """Sample standard deviation."""
+        return math.sqrt(self.variance())
+
+
+class MovingAverage:
+    """Average of the most recent `window` samples.
+
+    Samples live in a ring buffer allocated once, so adding a sample never
+    allocates. A running total makes each update O(1). Because the buffer
+    stores 32-bit floats, the total is rebuilt from the buffer once per
+    `window` samples so rounding errors cannot pile up.
+    """
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.filled = 0
+        self._ring = array("f", [0.0] * window)
+        self._next = 0
+        self._total = 0.0
+        self._until_resum = window
+
+    def add(self, value):
+        """Include one sample and return the new moving average."""
+        ring = self._ring
+        index = self._next
+        if self.filled == self.window:
+            self._total -= ring[index]
+        else:
+            self.filled += 1
+        ring[index] = value
+        # Add the stored (rounded) value so the total matches the buffer.
+        self._total += ring[index]
+        self._next = index + 1 if index + 1 < self.window else 0
+
+        self._until_resum -= 1
+        if self._until_resum == 0:
+            self._until_resum = self.window
+            self._total = sum(ring)
+        return self.value()
+
+    def value(self):
+        """Current moving average (0.0 before the first sample)."""
+        if self.filled == 0:
+            return 0.0
+        return self._total / self.filled
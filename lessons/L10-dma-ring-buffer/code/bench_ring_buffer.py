@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Measure ring buffer throughput on the host, against a list-based logger.
+
+Usage:
+  python3 lessons/L10-dma-ring-buffer/code/bench_ring_buffer.py
+  python3 lessons/L10-dma-ring-buffer/code/bench_ring_buffer.py --typecode B \\
+      --chunk 4096
+  python3 lessons/L10-dma-ring-buffer/code/bench_ring_buffer.py --format json
+
+Every mode moves the same samples from a producer to a consumer that writes
+each block to a sink (the null device), alternating one produced chunk with
+one consumer pass:
+
+- views: producer fills `write_view()` in place (as DMA would; two views
+  when the chunk wraps), consumer hands `read_view()` straight to the sink.
+  No Python-level copies.
+- copy: `write(chunk)` and `readinto(block)`, one copy in and one copy out.
+- list: appending samples one by one to a list and slicing blocks off the
+  front, the way `sensor_logger.py`-style loggers usually start.
+- views, slow consumer: like views, but the consumer only runs every
+  `--slow-every` chunks, so the buffer fills up; shows the overrun and
+  high-water counters at work. Its rate counts delivered items only, so it
+  is not comparable with the other rows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from array import array
+from dataclasses import asdict, dataclass
+
+from ring_buffer import RingBuffer
+
+DEFAULT_MEGABYTES = 16
+DEFAULT_CAPACITY = 1024
+DEFAULT_CHUNK = 256
+DEFAULT_SLOW_EVERY = 8
+
+
+@dataclass
+class ModeResult:
+    mode: str
+    mib_per_s: float
+    million_items_per_s: float
+    delivered_items: int
+    overrun_items: int
+    high_water: int
+
+
+def make_chunk(typecode: str, items: int) -> array:
+    limit = 256 if typecode == "B" else 4096  # bytes, or 12-bit ADC samples
+    return array(typecode, (index % limit for index in range(items)))
+
+
+def run_views(
+    ring: RingBuffer, chunk: array, chunks: int, sink, consume_every: int = 1
+) -> int:
+    source = memoryview(chunk)
+    delivered = 0
+    for index in range(chunks):
+        written = 0
+        while written < len(source):
+            view = ring.write_view(len(source) - written)
+            if not len(view):
+                ring.note_overrun(len(source) - written)
+                break
+            view[:] = source[written : written + len(view)]
+            ring.commit(len(view))
+            written += len(view)
+        if index % consume_every == consume_every - 1:
+            while True:
+                view = ring.read_view()
+                if not len(view):
+                    break
+                sink.write(view)
+                ring.consume(len(view))
+                delivered += len(view)
+    return delivered
+
+
+def run_copy(ring: RingBuffer, chunk: array, chunks: int, sink) -> int:
+    block = array(chunk.typecode, bytes(len(chunk) * chunk.itemsize))
+    delivered = 0
+    for _ in range(chunks):
+        ring.write(chunk)
+        copied = ring.readinto(block)
+        sink.write(memoryview(block)[:copied])
+        delivered += copied
+    return delivered
+
+
+def run_list(chunk: array, chunks: int, sink) -> int:
+    samples: list[int] = []
+    delivered = 0
+    for _ in range(chunks):
+        for sample in chunk:
+            samples.append(sample)
+        block = array(chunk.typecode, samples[: len(chunk)])
+        del samples[: len(chunk)]
+        sink.write(block)
+        delivered += len(block)
+    return delivered
+
+
+def measure(mode: str, args: argparse.Namespace, sink) -> ModeResult:
+    chunk = make_chunk(args.typecode, args.chunk)
+    chunk_bytes = len(chunk) * chunk.itemsize
+    chunks = max(1, args.megabytes * 1024 * 1024 // chunk_bytes)
+    ring = RingBuffer(array(args.typecode, bytes(args.capacity * chunk.itemsize)))
+
+    started = time.perf_counter()
+    if mode == "views":
+        delivered = run_views(ring, chunk, chunks, sink)
+    elif mode == "copy":
+        delivered = run_copy(ring, chunk, chunks, sink)
+    elif mode == "list":
+        delivered = run_list(chunk, chunks, sink)
+    else:
+        delivered = run_views(ring, chunk, chunks, sink, args.slow_every)
+    seconds = time.perf_counter() - started
+
+    return ModeResult(
+        mode=mode,
+        mib_per_s=round(delivered * chunk.itemsize / seconds / 1024**2, 1),
+        million_items_per_s=round(delivered / seconds / 1e6, 2),
+        delivered_items=delivered,
+        overrun_items=ring.overrun_items,
+        high_water=ring.high_water,
+    )
+
+
+def print_results(results: list[ModeResult], args: argparse.Namespace) -> None:
+    print(
+        f"Ring buffer: {args.capacity} items of type {args.typecode!r}, "
+        f"chunks of {args.chunk} items, {args.megabytes} MiB per mode"
+    )
+    print(
+        f"{'Mode':<22} {'MiB/s':>8} {'Mitems/s':>9} {'Delivered':>11} "
+        f"{'Overrun':>9} {'High water':>10}"
+    )
+    print("-" * 74)
+    for result in results:
+        print(
+            f"{result.mode:<22} {result.mib_per_s:8.1f} "
+            f"{result.million_items_per_s:9.2f} {result.delivered_items:11} "
+            f"{result.overrun_items:9} {result.high_water:10}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ring buffer")
+    parser.add_argument(
+        "--megabytes",
+        type=int,
+        default=DEFAULT_MEGABYTES,
+        help=f"Data moved per mode, in MiB (default: {DEFAULT_MEGABYTES}).",
+    )
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        default=DEFAULT_CAPACITY,
+        help=f"Ring capacity in items (default: {DEFAULT_CAPACITY}).",
+    )
+    parser.add_argument(
+        "--chunk",
+        type=int,
+        default=DEFAULT_CHUNK,
+        help=f"Items per produced chunk (default: {DEFAULT_CHUNK}).",
+    )
+    parser.add_argument(
+        "--typecode",
+        choices=("B", "H"),
+        default="H",
+        help="Item type: B bytes or H 16-bit samples (default: H).",
+    )
+    parser.add_argument(
+        "--slow-every",
+        type=int,
+        default=DEFAULT_SLOW_EVERY,
+        help="Slow consumer runs once per this many chunks "
+        f"(default: {DEFAULT_SLOW_EVERY}).",
+    )
+    parser.add_argument("--format", choices=("table", "json"), default="table")
+    args = parser.parse_args()
+    if min(args.megabytes, args.capacity, args.chunk, args.slow_every) < 1:
+        parser.error("sizes and --slow-every must be positive")
+
+    with open(os.devnull, "wb", buffering=0) as sink:
+        results = [
+            measure(mode, args, sink)
+            for mode in ("views", "copy", "list", "views, slow consumer")
+        ]
+
+    if args.format == "json":
+        print(json.dumps([asdict(result) for result in results], indent=2))
+    else:
+        print_results(results, args)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+"""Preallocated ring buffer with zero-copy views, for MicroPython and CPython.
+
+Continuous sampling (DMA from the ADC, a PIO FIFO, a UART) produces data
+faster than Python can append it to a list. This buffer is allocated once;
+producers and consumers get `memoryview` slices straight into it, so data is
+written and processed in place instead of being copied around.
+
+Producer (DMA completion handler, timer callback, reader thread):
+    view = ring.write_view()      # contiguous free space, may be empty
+    ... fill view[:n] (DMA target, readinto, slice assignment) ...
+    ring.commit(n)
+
+Consumer (main loop):
+    view = ring.read_view()       # contiguous stored items
+    ... process view ...
+    ring.consume(len(view))
+
+The buffer can be a `bytearray` or an `array` (e.g. array("H") for 12-bit
+ADC samples); sizes are in items. Views stop at the end of the buffer, so a
+wrapped region takes two calls. `write()` and `readinto()` are copying
+helpers that handle the wrap.
+
+One producer and one consumer may run in different contexts (interrupt and
+main loop, or two threads): each index is only written by its own side, so
+no lock is needed. Indices run over 0 .. 2 * capacity - 1 so a full buffer
+differs from an empty one and they never grow into big integers. Data that
+does not fit is dropped and counted (`overrun_items`); `high_water` records
+the fullest the buffer has been, which tells you how much headroom is left.
+
+Taking a view allocates a small memoryview object, so do it in soft
+interrupt handlers or `micropython.schedule` callbacks; `commit` and
+`consume` allocate nothing and are fine in hard interrupt handlers.
+"""
+
+
+class RingBuffer:
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+        self.capacity = len(self.view)
+        if self.capacity < 1:
+            raise ValueError("the buffer must hold at least one item")
+        self.read_index = 0  # consumer side only
+        self.write_index = 0  # producer side only
+        self.overrun_items = 0
+        self.overruns = 0
+        self.high_water = 0
+
+    def __len__(self):
+        """Items stored and not yet consumed."""
+        used = self.write_index - self.read_index
+        return used + 2 * self.capacity if used < 0 else used
+
+    def free(self):
+        return self.capacity - len(self)
+
+    # Producer side
+
+    def write_view(self, max_items=0):
+        """Memoryview of the contiguous free space (at most `max_items`)."""
+        start = self.write_index % self.capacity
+        count = min(self.free(), self.capacity - start)
+        if max_items and count > max_items:
+            count = max_items
+        return self.view[start : start + count]
+
+    def commit(self, items):
+        """Publish `items` written into the last write view."""
+        index = self.write_index + items
+        if index >= 2 * self.capacity:
+            index -= 2 * self.capacity
+        self.write_index = index
+        used = len(self)
+        if used > self.high_water:
+            self.high_water = used
+
+    def note_overrun(self, items):
+        """Record `items` the producer had to drop because the buffer was full."""
+        self.overrun_items += items
+        self.overruns += 1
+
+    def write(self, data):
+        """Copy as much of `data` as fits; return the number of items written."""
+        source = memoryview(data)
+        written = 0
+        while written < len(source):
+            view = self.write_view(len(source) - written)
+            if not len(view):
+                self.note_overrun(len(source) - written)
+                break
+            view[:] = source[written : written + len(view)]
+            self.commit(len(view))
+            written += len(view)
+        return written
+
+    # Consumer side
+
+    def read_view(self, max_items=0):
+        """Memoryview of the contiguous stored items (at most `max_items`)."""
+        start = self.read_index % self.capacity
+        count = min(len(self), self.capacity - start)
+        if max_items and count > max_items:
+            count = max_items
+        return self.view[start : start + count]
+
+    def consume(self, items):
+        """Release `items` from the front after processing them."""
+        index = self.read_index + items
+        if index >= 2 * self.capacity:
+            index -= 2 * self.capacity
+        self.read_index = index
+
+    def readinto(self, target):
+        """Copy stored items into `target`; return the number copied."""
+        target = memoryview(target)
+        copied = 0
+        while copied < len(target):
+            view = self.read_view(len(target) - copied)
+            if not len(view):
+                break
+            target[copied : copied + len(view)] = view
+            self.consume(len(view))
+            copied += len(view)
+        return copied
+
+    def reset_stats(self):
+        self.overrun_items = 0
+        self.overruns = 0
+        self.high_water = len(self)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Stress and benchmark the SPSC queue against a Lock-protected deque.
+
+Usage:
+  python3 lessons/L11-dual-core-queues/code/bench_spsc_queue.py
+  python3 lessons/L11-dual-core-queues/code/bench_spsc_queue.py --batch 64
+  python3 lessons/L11-dual-core-queues/code/bench_spsc_queue.py --items 2000000 \\
+      --switch-interval 0.000001
+
+Every mode runs a producer thread and a consumer thread that move the
+sequence 0, 1, 2, ... through a queue of `--capacity` items:
+
+- spsc / spsc batch: `SPSCQueue.push`/`pop`, or `push_many`/`pop_many` with
+  `--batch` items per call.
+- deque+Lock / deque+Lock batch: a `collections.deque` bounded to the same
+  capacity, every access under one `threading.Lock` (the batch variant moves
+  `--batch` items per lock acquisition).
+
+The consumer checks that it receives exactly the sequence that was sent, so
+every run is also a stress test: any lost, repeated or reordered item is an
+order error and makes the exit status 1. A smaller `--switch-interval`
+makes CPython switch threads more often, which is what shakes out races.
+
+When a side finds the queue full (or empty) it counts a hit and yields with
+`time.sleep(0)`. For the deque, "lock waits" counts acquisitions that found
+the lock already held. Latency is push to pop, stamped per item in both
+cases (the SPSC queue does it itself with `timestamps=True`). Under the GIL
+only one thread runs at a time, so latency here mostly measures how long a
+thread keeps running before switching; on two cores the consumer sees an
+item within a few microseconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from dataclasses import asdict, dataclass
+
+from spsc_queue import SPSCQueue, ticks_diff, ticks_us
+
+DEFAULT_ITEMS = 200_000
+DEFAULT_CAPACITY = 1024
+DEFAULT_BATCH = 32
+DEFAULT_TIMEOUT = 60.0
+MODES = ("spsc", "spsc batch", "deque+Lock", "deque+Lock batch")
+
+
+@dataclass
+class ModeResult:
+    mode: str
+    thousand_items_per_s: float
+    latency_mean_us: float
+    latency_max_us: int
+    full_hits: int
+    empty_hits: int
+    lock_waits: int
+    order_errors: int
+    timed_out: bool
+
+
+class LockedDeque:
+    """The usual alternative: a bounded deque with one lock around it."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.items: deque[int] = deque()
+        self.stamps: deque[int] = deque()
+        self.lock = threading.Lock()
+        self.full_hits = 0
+        self.empty_hits = 0
+        self.lock_waits = 0
+        self.latency_count = 0
+        self.latency_total_us = 0
+        self.latency_max_us = 0
+
+    def acquire(self) -> None:
+        if not self.lock.acquire(False):
+            self.lock_waits += 1
+            self.lock.acquire()
+
+    def push_many(self, values: range) -> int:
+        self.acquire()
+        try:
+            count = min(len(values), self.capacity - len(self.items))
+            if count < len(values):
+                self.full_hits += 1
+            now = ticks_us()
+            for value in values[:count]:
+                self.items.append(value)
+                self.stamps.append(now)
+            return count
+        finally:
+            self.lock.release()
+
+    def pop_many(self, target: array) -> int:
+        self.acquire()
+        try:
+            count = min(len(target), len(self.items))
+            if not count:
+                self.empty_hits += 1
+                return 0
+            now = ticks_us()
+            for index in range(count):
+                target[index] = self.items.popleft()
+                latency = ticks_diff(now, self.stamps.popleft())
+                self.latency_total_us += latency
+                if latency > self.latency_max_us:
+                    self.latency_max_us = latency
+            self.latency_count += count
+            return count
+        finally:
+            self.lock.release()
+
+
+def produce_spsc(queue: SPSCQueue, items: int, batch: int, stop: threading.Event):
+    sent = 0
+    if batch == 1:
+        while sent < items and not stop.is_set():
+            if queue.push(sent):
+                sent += 1
+            else:
+                time.sleep(0)
+        return
+    chunk = array("i", [0] * batch)
+    while sent < items and not stop.is_set():
+        size = min(batch, items - sent)
+        for index in range(size):
+            chunk[index] = sent + index
+        pushed = queue.push_many(memoryview(chunk)[:size])
+        sent += pushed
+        if pushed < size:
+            time.sleep(0)
+
+
+def produce_deque(queue: LockedDeque, items: int, batch: int, stop: threading.Event):
+    sent = 0
+    while sent < items and not stop.is_set():
+        size = min(batch, items - sent)
+        pushed = queue.push_many(range(sent, sent + size))
+        sent += pushed
+        if pushed < size:
+            time.sleep(0)
+
+
+def consume(queue, items: int, batch: int, deadline: float, single: bool) -> dict:
+    """Receive `items` values; count order errors. Runs in the main thread."""
+    block = array("i", [0] * batch)
+    expected = 0
+    order_errors = 0
+    timed_out = False
+    while expected < items:
+        if single:
+            value = queue.pop()
+            received = 0 if value is None else 1
+            block[0] = 0 if value is None else value
+        else:
+            received = queue.pop_many(block)
+        if not received:
+            if time.perf_counter() > deadline:
+                timed_out = True
+                break
+            time.sleep(0)
+            continue
+        for index in range(received):
+            if block[index] != expected:
+                order_errors += 1
+                expected = block[index]
+            expected += 1
+    return {"order_errors": order_errors, "timed_out": timed_out}
+
+
+def measure(mode: str, args: argparse.Namespace) -> ModeResult:
+    batch = args.batch if mode.endswith("batch") else 1
+    stop = threading.Event()
+    if mode.startswith("spsc"):
+        queue = SPSCQueue(args.capacity, timestamps=True)
+        producer = threading.Thread(
+            target=produce_spsc, args=(queue, args.items, batch, stop)
+        )
+    else:
+        queue = LockedDeque(args.capacity)
+        producer = threading.Thread(
+            target=produce_deque, args=(queue, args.items, batch, stop)
+        )
+
+    started = time.perf_counter()
+    producer.start()
+    outcome = consume(
+        queue, args.items, batch, started + args.timeout, mode == "spsc"
+    )
+    stop.set()
+    producer.join()
+    seconds = time.perf_counter() - started
+
+    mean = queue.latency_total_us / queue.latency_count if queue.latency_count else 0
+    return ModeResult(
+        mode=mode,
+        thousand_items_per_s=round(args.items / seconds / 1000, 1),
+        latency_mean_us=round(mean, 1),
+        latency_max_us=queue.latency_max_us,
+        full_hits=queue.full_hits,
+        empty_hits=queue.empty_hits,
+        lock_waits=getattr(queue, "lock_waits", 0),
+        **outcome,
+    )
+
+
+def print_results(results: list[ModeResult], args: argparse.Namespace) -> None:
+    print(
+        f"{args.items} items, capacity {args.capacity}, batch {args.batch}, "
+        f"switch interval {sys.getswitchinterval() * 1e6:g} us"
+    )
+    print(
+        f"{'Mode':<18} {'kitems/s':>9} {'Lat mean':>9} {'Lat max':>9} "
+        f"{'Full':>7} {'Empty':>7} {'Lock wt':>7} {'Errors':>6}"
+    )
+    print("-" * 80)
+    for result in results:
+        errors = "TIMEOUT" if result.timed_out else str(result.order_errors)
+        print(
+            f"{result.mode:<18} {result.thousand_items_per_s:9.1f} "
+            f"{result.latency_mean_us:7.1f}us {result.latency_max_us:7}us "
+            f"{result.full_hits:7} {result.empty_hits:7} {result.lock_waits:7} "
+            f"{errors:>6}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Stress and benchmark the SPSC queue against a locked deque"
+    )
+    parser.add_argument(
+        "--items",
+        type=int,
+        default=DEFAULT_ITEMS,
+        help=f"Items moved per mode (default: {DEFAULT_ITEMS}).",
+    )
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        default=DEFAULT_CAPACITY,
+        help=f"Queue capacity in items (default: {DEFAULT_CAPACITY}).",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=DEFAULT_BATCH,
+        help=f"Items per call in the batch modes (default: {DEFAULT_BATCH}).",
+    )
+    parser.add_argument(
+        "--switch-interval",
+        type=float,
+        default=0.0,
+        help="Thread switch interval in seconds (default: leave CPython's).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Give up on a mode after this many seconds "
+        f"(default: {DEFAULT_TIMEOUT:g}).",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        action="append",
+        help="Run only this mode (repeatable; default: all).",
+    )
+    parser.add_argument("--format", choices=("table", "json"), default="table")
+    args = parser.parse_args()
+    if min(args.items, args.capacity, args.batch) < 1:
+        parser.error("--items, --capacity and --batch must be positive")
+    if args.items >= 2**31:
+        parser.error("--items must fit in a 32-bit signed item")
+    if args.switch_interval > 0:
+        sys.setswitchinterval(args.switch_interval)
+
+    results = [measure(mode, args) for mode in args.mode or MODES]
+    if args.format == "json":
+        print(json.dumps([asdict(result) for result in results], indent=2))
+    else:
+        print_results(results, args)
+    failed = any(result.order_errors or result.timed_out for result in results)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,193 @@
+"""Lock-free single-producer/single-consumer queue, for MicroPython and CPython.
+
+Hands items from one core to the other (`_thread` on an RP2040/RP2350) or
+from one thread to another on a PC, without a lock on the hot path. Items
+live in an `array` allocated once (array("i") by default, so an item is an
+integer: a sample, a command code, an index into a table of buffers).
+
+The producer only moves `tail`, the consumer only moves `head`. The producer
+stores the item first and publishes it by updating `tail` last; the consumer
+reads it and then frees the slot by updating `head`. Each index is a single
+integer write, so the other side sees either the old or the new value and
+never half an update. Indices run over 0 .. 2 * capacity - 1 so a full queue
+differs from an empty one and they never grow into big integers.
+
+This only holds for exactly one producer and one consumer. For more, give
+each pair its own queue.
+
+    queue = SPSCQueue(256)
+    queue.push(42)                # producer: False when full
+    queue.pop()                   # consumer: None when empty
+    queue.push_many(chunk)        # batches: one publish per call
+    queue.pop_many(block)
+
+Counters are written by their own side only: `pushed`/`full_hits` by the
+producer, `popped`/`empty_hits` and the latency counters by the consumer.
+A hit is a call that found the queue full (or empty), which is how the two
+sides "contend" without a lock. With `timestamps=True` every item is stamped
+when pushed and the consumer tracks push-to-pop latency in microseconds.
+"""
+
+from array import array
+
+try:
+    from time import ticks_diff, ticks_us
+except ImportError:
+    from time import perf_counter_ns
+
+    # Same 30-bit wrap as MicroPython, so stamps fit the array("I") slots.
+    TICKS_PERIOD = 1 << 30
+
+    def ticks_us():
+        return perf_counter_ns() // 1000 % TICKS_PERIOD
+
+    def ticks_diff(end, start):
+        half = TICKS_PERIOD // 2
+        return (end - start + half) % TICKS_PERIOD - half
+
+
+class SPSCQueue:
+    def __init__(self, capacity, typecode="i", timestamps=False):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.slots = array(typecode, [0] * capacity)
+        self.view = memoryview(self.slots)
+        self.stamps = array("I", [0] * capacity) if timestamps else None
+        self.head = 0  # consumer side only
+        self.tail = 0  # producer side only
+        # Producer side
+        self.pushed = 0
+        self.full_hits = 0
+        # Consumer side
+        self.popped = 0
+        self.empty_hits = 0
+        self.latency_count = 0
+        self.latency_total_us = 0
+        self.latency_max_us = 0
+
+    def __len__(self):
+        used = self.tail - self.head
+        return used + 2 * self.capacity if used < 0 else used
+
+    def _advance(self, index, items):
+        index += items
+        if index >= 2 * self.capacity:
+            index -= 2 * self.capacity
+        return index
+
+    def _slot(self, index):
+        return index - self.capacity if index >= self.capacity else index
+
+    # Producer side
+
+    def push(self, item):
+        """Append one item; return False (and count a full hit) if full."""
+        tail = self.tail
+        used = tail - self.head
+        if used < 0:
+            used += 2 * self.capacity
+        if used == self.capacity:
+            self.full_hits += 1
+            return False
+        slot = self._slot(tail)
+        self.slots[slot] = item
+        if self.stamps is not None:
+            self.stamps[slot] = ticks_us()
+        self.tail = self._advance(tail, 1)  # publish last
+        self.pushed += 1
+        return True
+
+    def push_many(self, items):
+        """Append as many of `items` (an array of the same type) as fit.
+
+        Returns the number appended; all of them are published at once.
+        """
+        tail = self.tail
+        count = min(len(items), self.capacity - len(self))
+        if count < len(items):
+            self.full_hits += 1
+        if not count:
+            return 0
+        slot = self._slot(tail)
+        first = min(count, self.capacity - slot)
+        source = memoryview(items)
+        self.view[slot : slot + first] = source[:first]
+        if first < count:
+            self.view[: count - first] = source[first:count]
+        if self.stamps is not None:
+            self._stamp(slot, count)
+        self.tail = self._advance(tail, count)  # publish last
+        self.pushed += count
+        return count
+
+    def _stamp(self, slot, count):
+        stamps = self.stamps
+        now = ticks_us()
+        for _ in range(count):
+            stamps[slot] = now
+            slot += 1
+            if slot == self.capacity:
+                slot = 0
+
+    # Consumer side
+
+    def pop(self):
+        """Remove and return the oldest item; None (and an empty hit) if empty."""
+        head = self.head
+        if head == self.tail:
+            self.empty_hits += 1
+            return None
+        slot = self._slot(head)
+        item = self.slots[slot]
+        if self.stamps is not None:
+            latency = ticks_diff(ticks_us(), self.stamps[slot])
+            self._record_latency(latency, latency)
+        self.head = self._advance(head, 1)  # free the slot last
+        self.popped += 1
+        return item
+
+    def pop_many(self, target):
+        """Move up to len(target) items into `target`; return how many."""
+        head = self.head
+        used = self.tail - head
+        if used < 0:
+            used += 2 * self.capacity
+        count = min(len(target), used)
+        if not count:
+            self.empty_hits += 1
+            return 0
+        slot = self._slot(head)
+        first = min(count, self.capacity - slot)
+        destination = memoryview(target)
+        destination[:first] = self.view[slot : slot + first]
+        if first < count:
+            destination[first:count] = self.view[: count - first]
+        if self.stamps is not None:
+            # Items were pushed in order: the first is the oldest, the last the
+            # newest; their mean stands in for the whole batch.
+            now = ticks_us()
+            last = self._slot(self._advance(head, count - 1))
+            oldest = ticks_diff(now, self.stamps[slot])
+            newest = ticks_diff(now, self.stamps[last])
+            self._record_latency(oldest, (oldest + newest) * count // 2, count)
+        self.head = self._advance(head, count)  # free the slots last
+        self.popped += count
+        return count
+
+    def _record_latency(self, worst_us, total_us, items=1):
+        self.latency_count += items
+        self.latency_total_us += total_us
+        if worst_us > self.latency_max_us:
+            self.latency_max_us = worst_us
+
+    def latency_mean_us(self):
+        if not self.latency_count:
+            return 0
+        return self.latency_total_us / self.latency_count
+
+    def reset_stats(self):
+        """Clear all counters; call while neither side is running."""
+        self.pushed = self.full_hits = 0
+        self.popped = self.empty_hits = 0
+        self.latency_count = self.latency_total_us = self.latency_max_us = 0
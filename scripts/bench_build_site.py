@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""Benchmark `scripts/build_site.py` against a synthetic lesson corpus.
+
+Usage:
+  python3 scripts/bench_build_site.py
+  python3 scripts/bench_build_site.py --lessons 300 --code-files 40 --jobs 0
+  python3 scripts/bench_build_site.py --save-baseline
+  python3 scripts/bench_build_site.py --compare
+
+A throwaway tree (`lessons/` + a copy of `scripts/build_site.py` and its
+templates) is generated in a temp dir, so the real `site/` and build cache are
+never touched. Each scenario runs the generator as a subprocess and reports
+wall time, lessons/s, source MB/s and the build process's peak RSS (where the
+platform reports it; not on Windows). `--save-baseline` stores the results
+(default `.build-cache/bench-baseline.json`); `--compare` prints the change
+against that file and fails when a scenario got slower than `--max-regression`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    # Windows: no getrusage, so peak RSS is not reported.
+    resource = None
+
+
+ROOT = Path(__file__).resolve().parent.parent
+BUILD_SCRIPT = ROOT / "scripts" / "build_site.py"
+TEMPLATES_DIR = ROOT / "scripts" / "templates"
+DEFAULT_BASELINE = ROOT / ".build-cache" / "bench-baseline.json"
+WORDS = (
+    "pico board flash serial gpio timer pwm uart sensor buffer sample "
+    "voltage pull-up debounce interrupt toolchain cmake firmware core "
+    "register clock latency throughput queue matrix storage"
+).split()
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    lessons: int
+    list_depth: int
+    fences: int
+    code_files: int
+    code_file_kb: int
+    seed: int
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    scenario: str
+    seconds: float
+    lessons_per_s: float
+    mb_per_s: float
+    peak_rss_kb: int | None
+
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def nested_list(rng: random.Random, depth: int) -> list[str]:
+    """Two-space nested lists, the authoring style the normalizer expands."""
+    lines: list[str] = []
+    for level in range(depth):
+        indent = "  " * level
+        marker = "1. " if level % 2 else "- "
+        for _ in range(2):
+            lines.append(f"{indent}{marker}{sentence(rng, 6)}")
+    return lines
+
+
+def indented_fence(rng: random.Random) -> list[str]:
+    """A list step with a list-indented fenced code block."""
+    lines = [f"1. {sentence(rng, 5)}", "", "   ```bash"]
+    lines.extend(f"   {rng.choice(WORDS)} --{rng.choice(WORDS)}" for _ in range(4))
+    lines.extend(["   ```", ""])
+    return lines
+
+
+def lesson_markdown(rng: random.Random, title: str, spec: CorpusSpec) -> str:
+    lines = [f"# {title}", "", "## Navigation", ""]
+    lines.extend(
+        [
+            "- [Lesson assessment](assessment.md)",
+            "- [Notes](notes.md#summary)",
+            "- [Code](code/README.md)",
+            "",
+        ]
+    )
+    for section in range(4):
+        lines.extend([f"## Section {section + 1}", "", sentence(rng, 30), ""])
+        lines.extend(nested_list(rng, spec.list_depth))
+        lines.append("")
+        for _ in range(spec.fences):
+            lines.extend(indented_fence(rng))
+        lines.extend(["```python", "print('tick')", "```", ""])
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(root: Path, spec: CorpusSpec) -> int:
+    """Write `spec.lessons` synthetic lessons under `root/lessons`.
+
+    Returns the total number of source bytes written.
+    """
+    rng = random.Random(spec.seed)
+    total = 0
+    for index in range(spec.lessons):
+        lesson_dir = root / "lessons" / f"L{index:03d}-synthetic"
+        code_dir = lesson_dir / "code"
+        code_dir.mkdir(parents=True, exist_ok=True)
+        title = f"L{index:03d} Synthetic lesson {index}"
+        docs = {
+            "overview.md": lesson_markdown(rng, title, spec),
+            "assessment.md": lesson_markdown(rng, f"{title} Assessment", spec),
+            "notes.md": lesson_markdown(rng, f"{title} Notes", spec),
+        }
+        for name, text in docs.items():
+            data = text.encode("utf-8")
+            (lesson_dir / name).write_bytes(data)
+            total += len(data)
+        (code_dir / "README.md").write_text("# Code\n", encoding="utf-8")
+        for file_index in range(spec.code_files):
+            data = rng.randbytes(spec.code_file_kb * 1024)
+            (code_dir / f"sample_{file_index:03d}.bin").write_bytes(data)
+            total += len(data)
+    return total
+
+
+def peak_rss_kb(usage) -> int:
+    """`ru_maxrss` in KiB (macOS reports bytes, Linux KiB)."""
+    if sys.platform == "darwin":
+        return usage.ru_maxrss // 1024
+    return usage.ru_maxrss
+
+
+def run_build(tree: Path, args: list[str]) -> tuple[float, int | None]:
+    """Run the generator in `tree`; return (seconds, peak RSS in KiB or None)."""
+    command = [sys.executable, str(tree / "scripts" / "build_site.py"), *args]
+    started = time.perf_counter()
+    proc = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        peak_rss = peak_rss_kb(usage)
+    else:
+        proc.wait()
+        peak_rss = None
+        if resource is not None:
+            peak_rss = peak_rss_kb(resource.getrusage(resource.RUSAGE_CHILDREN))
+    seconds = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise SystemExit(f"Build failed ({proc.returncode}): {' '.join(command)}")
+    return seconds, peak_rss
+
+
+def bench_markdown(tree: Path, repeat: int) -> float:
+    """Time preprocessing + conversion of every generated Markdown file."""
+    spec = importlib.util.spec_from_file_location(
+        "bench_build_site_module", tree / "scripts" / "build_site.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses look the module up while the class body is processed.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    texts = [
+        path.read_text(encoding="utf-8") for path in tree.glob("lessons/*/*.md")
+    ]
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            module.md_to_html(module.strip_leading_h1(text), rewrite_doc_links=True)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run_benchmarks(spec: CorpusSpec, jobs: int, repeat: int) -> list[BenchResult]:
+    with tempfile.TemporaryDirectory(prefix="bench-site-") as tmp:
+        tree = Path(tmp)
+        (tree / "scripts").mkdir()
+        shutil.copy2(BUILD_SCRIPT, tree / "scripts" / "build_site.py")
+        shutil.copytree(TEMPLATES_DIR, tree / "scripts" / "templates")
+        source_bytes = generate_corpus(tree, spec)
+        source_mb = source_bytes / (1024 * 1024)
+        edited = tree / "lessons" / "L000-synthetic" / "overview.md"
+
+        scenarios = {
+            "full serial": ["--full", "--jobs", "1"],
+            f"full --jobs {jobs}": ["--full", "--jobs", str(jobs)],
+            "incremental no-op": [],
+            "incremental 1 edit": [],
+        }
+        results: list[BenchResult] = []
+        for name, build_args in scenarios.items():
+            samples: list[tuple[float, int | None]] = []
+            for _ in range(repeat):
+                if name == "incremental 1 edit":
+                    with edited.open("a", encoding="utf-8") as handle:
+                        handle.write(f"\nEdited at {time.time_ns()}.\n")
+                samples.append(run_build(tree, build_args))
+            seconds = statistics.median(sample[0] for sample in samples)
+            rss_samples = [sample[1] for sample in samples]
+            peak_rss = None if None in rss_samples else max(rss_samples)
+            built = 1 if name == "incremental 1 edit" else spec.lessons
+            results.append(
+                BenchResult(
+                    scenario=name,
+                    seconds=seconds,
+                    lessons_per_s=built / seconds,
+                    mb_per_s=(source_mb * built / spec.lessons) / seconds,
+                    peak_rss_kb=peak_rss,
+                )
+            )
+
+        seconds = bench_markdown(tree, repeat)
+        markdown_mb = sum(
+            path.stat().st_size for path in tree.glob("lessons/*/*.md")
+        ) / (1024 * 1024)
+        results.append(
+            BenchResult(
+                scenario="md_to_html only",
+                seconds=seconds,
+                lessons_per_s=spec.lessons / seconds,
+                mb_per_s=markdown_mb / seconds,
+                peak_rss_kb=(
+                    peak_rss_kb(resource.getrusage(resource.RUSAGE_SELF))
+                    if resource is not None
+                    else None
+                ),
+            )
+        )
+    return results
+
+
+def print_results(
+    results: list[BenchResult],
+    baseline: dict[str, dict] | None,
+) -> list[tuple[str, float]]:
+    """Print the result table; return each scenario's change vs the baseline."""
+    print("=" * 88)
+    print(
+        f"{'Scenario':24} {'Seconds':>9} {'Lessons/s':>10} {'MB/s':>9} "
+        f"{'Peak RSS MB':>12} {'vs baseline':>12}"
+    )
+    print("-" * 88)
+    slower: list[tuple[str, float]] = []
+    for result in results:
+        delta = ""
+        previous = (baseline or {}).get(result.scenario)
+        if previous:
+            change = result.seconds / previous["seconds"] - 1
+            delta = f"{change:+.1%}"
+            slower.append((result.scenario, change))
+        peak_rss = "n/a"
+        if result.peak_rss_kb is not None:
+            peak_rss = f"{result.peak_rss_kb / 1024:.1f}"
+        print(
+            f"{result.scenario:24} {result.seconds:9.3f} {result.lessons_per_s:10.1f} "
+            f"{result.mb_per_s:9.2f} {peak_rss:>12} {delta:>12}"
+        )
+    print("=" * 88)
+    return slower
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the static site build")
+    parser.add_argument("--lessons", type=int, default=100, help="Lessons to generate.")
+    parser.add_argument(
+        "--list-depth",
+        type=int,
+        default=6,
+        help="Nesting depth of the two-space lists in each section.",
+    )
+    parser.add_argument(
+        "--fences",
+        type=int,
+        default=4,
+        help="List-indented fenced code blocks per section.",
+    )
+    parser.add_argument(
+        "--code-files",
+        type=int,
+        default=20,
+        help="Files in each lesson's code/ directory.",
+    )
+    parser.add_argument(
+        "--code-file-kb",
+        type=int,
+        default=64,
+        help="Size of each code/ file in KiB.",
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Corpus random seed.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Worker processes for the parallel scenario (0 = one per CPU).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario.")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help=f"Baseline file (default: {DEFAULT_BASELINE.relative_to(ROOT)}).",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the new baseline.",
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Compare against the baseline and fail on regressions.",
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown per scenario for --compare (default: 0.2 = 20%%).",
+    )
+    args = parser.parse_args()
+
+    spec = CorpusSpec(
+        lessons=args.lessons,
+        list_depth=args.list_depth,
+        fences=args.fences,
+        code_files=args.code_files,
+        code_file_kb=args.code_file_kb,
+        seed=args.seed,
+    )
+    print(f"Synthetic corpus: {asdict(spec)}")
+    results = run_benchmarks(spec, args.jobs, args.repeat)
+
+    baseline: dict[str, dict] | None = None
+    if args.compare:
+        try:
+            saved = json.loads(args.baseline.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            raise SystemExit(f"Cannot read baseline {args.baseline}: {exc}") from exc
+        if saved.get("corpus") != asdict(spec):
+            print("Warning: baseline was recorded with a different corpus spec.")
+        baseline = {row["scenario"]: row for row in saved.get("results", [])}
+
+    changes = print_results(results, baseline)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "corpus": asdict(spec),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": [asdict(result) for result in results],
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"Saved baseline: {args.baseline}")
+
+    regressions = [
+        (scenario, change)
+        for scenario, change in changes
+        if change > args.max_regression
+    ]
+    if regressions:
+        print("Regressions over the allowed slowdown:")
+        for scenario, change in regressions:
+            print(f"- {scenario}: {change:+.1%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,31 +3,178 @@
 
 Usage:
   python3 scripts/build_site.py
+  python3 scripts/build_site.py --full
+  python3 scripts/build_site.py --jobs 4
+  python3 scripts/build_site.py --watch
+  python3 scripts/build_site.py --serve --port 8000
+  python3 scripts/build_site.py --full --profile --profile-trace build-trace.json
+  python3 scripts/build_site.py --check-links
+
+By default only lessons whose sources changed since the last build are
+re-rendered (tracked in `.build-cache/site-manifest.json`). Use `--full` for a
+clean rebuild of `site/`. `--jobs N` renders lessons in N worker processes
+(`--jobs 0` uses one per CPU); the output is identical to a serial build.
+
+`--watch` keeps running and, whenever `lessons/` changes (via the optional
+`watchdog` package, else by polling), re-renders just the changed lessons, the
+neighbours whose navigation changed, the syllabus and the search index. These
+rebuilds write straight into `site/`, which the watcher owns, with no staging
+copy or swap, so they take time in proportion to the edit, not the site.
+`--serve` also serves `site/` on localhost and reloads open pages after each
+rebuild; the live-reload snippet is injected by the server only, never written
+into `site/`.
+
+`--profile` prints per-phase and per-lesson wall/CPU time and bytes written;
+`--profile-trace PATH` also saves a Chrome trace-event JSON file (open it in
+`chrome://tracing` or https://ui.perfetto.dev).
+
+The stylesheet is published as `style.<content-hash>.css` so it can be cached
+forever, and every text file in `site/` gets a `.gz` sibling (plus `.br` when
+the optional `brotli` package is installed) for hosts that serve
+pre-compressed files. `--no-compress` skips the compressed siblings and
+removes the ones earlier builds left, so no stale copy is ever served.
+
+A prebuilt search index (`site/search/docs.json` plus one shard per token's
+first character) covers every section of the overview, assessment and notes
+pages; the search box in the page header loads only the shards it needs.
+
+`--check-links` validates every relative `href`/`src` and `#fragment` in the
+generated HTML after the build and exits non-zero when any target is missing.
+
+Builds never modify `site/` in place: the previous site is hardlinked into a
+staging directory under `.build-cache/`, the build writes there, and at the end
+`site/` is renamed aside and the result renamed into its place. A build
+interrupted before that swap leaves `site/` untouched; one interrupted between
+the two renames leaves no `site/` until the next build, which first moves the
+last good site back. Pages are streamed to disk fragment by fragment, so the
+templated page is never built as one string. Each Markdown document is still
+converted as a whole (Python-Markdown has no streaming mode), and a lesson's
+overview, assessment and notes HTML stay in memory until its pages and search
+sections are done: peak memory grows with the largest lesson, not the site.
+
+Page markup lives in `scripts/templates/page.html`, compiled once per process.
+Lesson pages get Overview/Assessment/Notes/Code tabs and prev/next links, all
+derived once per build from the discovered lessons; `code.html` lists the
+lesson's published code files.
 """
 
 from __future__ import annotations
 
+import argparse
 import fnmatch
+import gzip
+import hashlib
+import html
+import json
+import os
+import posixpath
 import re
 import shutil
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cache, partial
+from html.parser import HTMLParser
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import quote, unquote, urlsplit
 
 try:
     import markdown
+    from markdown.extensions.toc import unique as unique_toc_id
 except ModuleNotFoundError as exc:
     raise SystemExit(
         "Missing dependency: markdown. Install with: python3 -m pip install markdown"
     ) from exc
 
+try:
+    import brotli
+except ModuleNotFoundError:
+    # Optional: without brotli only `.gz` siblings are written.
+    brotli = None
+
+try:
+    import fcntl
+except ModuleNotFoundError:
+    # Not available on Windows; reflinks are then skipped.
+    fcntl = None
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ModuleNotFoundError:
+    # Optional: `--watch` falls back to polling without watchdog.
+    FileSystemEventHandler = object
+    Observer = None
+
 
 ROOT = Path(__file__).resolve().parent.parent
 LESSONS_DIR = ROOT / "lessons"
 SITE_DIR = ROOT / "site"
-SITE_LESSONS_DIR = SITE_DIR / "lessons"
+BUILD_CACHE_DIR = ROOT / ".build-cache"
+MANIFEST_PATH = BUILD_CACHE_DIR / "site-manifest.json"
+SEARCH_CACHE_DIR = BUILD_CACHE_DIR / "search"
+TEMPLATE_PATH = Path(__file__).resolve().parent / "templates" / "page.html"
+STAGING_DIR = BUILD_CACHE_DIR / "site-staging"
+PREVIOUS_SITE_DIR = BUILD_CACHE_DIR / "site-previous"
+MANIFEST_VERSION = 1
 LESSON_DIR_RE = re.compile(r"^L[0-9A-Z]+-.+")
 SKIP_SOURCE_DIR_GLOBS = ("build", "build-*", "__pycache__", ".pytest_cache")
 SKIP_SOURCE_FILE_GLOBS = ("*.pyc",)
 PUBLISHED_MD_HTML_BASENAMES = {"overview.md", "assessment.md", "notes.md"}
+MARKDOWN_EXTENSIONS = ("fenced_code", "tables", "toc", "sane_lists")
+HEADING_ID_RE = re.compile(r'(<h[1-6] id=")([^"]*)(")')
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+SEARCH_TOKEN_RE = re.compile(r"\w+")
+SEARCH_PAGES = ("overview.html", "assessment.html", "notes.html")
+LINK_ATTRS = {"href", "src"}
+HTML_TAG_RE = re.compile(r"<([A-Za-z][A-Za-z0-9-]*)(\s[^<>]*)?>")
+HTML_ATTR_RE = re.compile(r'([A-Za-z][A-Za-z0-9_:-]*)="([^"]*)"')
+TEMPLATE_BLOCK_RE = re.compile(
+    r"^\{% block (\w+) %\}\n(.*?)^\{% endblock %\}\n", re.MULTILINE | re.DOTALL
+)
+TEMPLATE_FIELD_RE = re.compile(r"\{\{ (\w+) \}\}")
+TEMPLATE_COMMENT_RE = re.compile(r"\{#.*?#\}\n?", re.DOTALL)
+LESSON_SECTION_TABS = (
+    ("overview.html", "Overview"),
+    ("assessment.html", "Assessment"),
+    ("notes.html", "Notes"),
+    ("code.html", "Code"),
+)
+FENCE_MARKER = "```"
+LIST_ITEM_RE = re.compile(r"^( +)([-*+] |\d+\. )")
+INDENTED_FENCE_OPEN_RE = re.compile(r"^( +)```([A-Za-z0-9_-]*)\s*$")
+MARKDOWN_LINK_RE = re.compile(r"\]\(([^)]+)\)")
+LESSON_SOURCE_NAMES = ("overview.md", "assessment.md", "notes.md", "code")
+PUBLISH_MODES = ("copy", "reflink", "link")
+COMPRESSED_SUFFIXES = (".gz", ".br")
+COMPRESSIBLE_SUFFIXES = {
+    ".html",
+    ".css",
+    ".js",
+    ".json",
+    ".svg",
+    ".md",
+    ".txt",
+    ".py",
+    ".c",
+    ".h",
+    ".cpp",
+    ".cmake",
+}
+# Linux ioctl number for cloning a file's extents (btrfs, XFS, ...).
+FICLONE = 0x40049409
+WATCH_POLL_INTERVAL = 0.2
+WATCH_DEBOUNCE = 0.05
+WATCH_EVENT_TYPES = {"created", "deleted", "modified", "moved", "closed"}
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SNIPPET = (
+    "<script>new EventSource(\"%s\").onmessage = () => location.reload();</script>\n"
+    % LIVE_RELOAD_PATH
+)
 
 CSS = """
 :root {
@@ -82,10 +229,227 @@ code {
   font-family: "Consolas", "SFMono-Regular", monospace;
 }
 ul, ol { padding-left: 1.35rem; }
+.lesson-tabs {
+  margin-top: 0.75rem;
+  padding-top: 0.6rem;
+  border-top: 1px solid var(--border);
+}
+.lesson-tabs a.active {
+  color: var(--text);
+  border-bottom: 2px solid var(--accent);
+}
+.lesson-pager {
+  display: flex;
+  gap: 1rem;
+  margin-top: 0.5rem;
+}
+.lesson-pager a { margin-right: 0; font-weight: 400; }
+.lesson-pager a[rel="next"] { margin-left: auto; }
 a { color: var(--accent); }
 .muted { color: var(--muted); }
+.search { position: relative; margin-top: 0.75rem; }
+.search input {
+  width: 100%;
+  padding: 0.45rem 0.6rem;
+  border: 1px solid var(--border);
+  border-radius: 8px;
+  font: inherit;
+}
+.search ul {
+  list-style: none;
+  margin: 0.35rem 0 0;
+  padding: 0;
+}
+.search li { padding: 0.2rem 0; }
 """
 
+SEARCH_JS = """
+(() => {
+  const input = document.getElementById("site-search");
+  const list = document.getElementById("site-search-results");
+  if (!input || !list) return;
+  const root = input.dataset.root;
+  const shards = new Map();
+  let docs = null;
+  const load = (name) =>
+    fetch(root + "search/" + name).then((r) => (r.ok ? r.json() : {}));
+  const shardKey = (term) => (/^[a-z0-9]/.test(term) ? term[0] : "_");
+
+  async function search(query) {
+    const terms = (query.toLowerCase().match(/[\\p{L}\\p{N}_]+/gu) || []).filter(
+      (term, i, all) => term.length > 1 || i === all.length - 1
+    );
+    if (!terms.length) return [];
+    docs = docs || (await load("docs.json"));
+    let hits = null;
+    for (const [i, term] of terms.entries()) {
+      const key = shardKey(term);
+      if (!shards.has(key)) shards.set(key, load(key + ".json"));
+      const shard = await shards.get(key);
+      // The last term matches as a prefix so results appear while typing.
+      const prefix = i === terms.length - 1;
+      const ids = new Set();
+      for (const [token, postings] of Object.entries(shard)) {
+        if (token === term || (prefix && token.startsWith(term))) {
+          postings.forEach((id) => ids.add(id));
+        }
+      }
+      hits = hits === null ? ids : new Set([...hits].filter((id) => ids.has(id)));
+    }
+    return [...hits].sort((a, b) => a - b).slice(0, 20).map((id) => docs[id]);
+  }
+
+  let latest = 0;
+  input.addEventListener("input", async () => {
+    const ticket = ++latest;
+    const hits = await search(input.value);
+    if (ticket !== latest) return;
+    list.replaceChildren(
+      ...hits.map(([url, title, heading]) => {
+        const item = document.createElement("li");
+        const link = document.createElement("a");
+        link.href = root + url;
+        link.textContent = heading ? title + " \\u203a " + heading : title;
+        item.append(link);
+        return item;
+      })
+    );
+  });
+})();
+"""
+STYLE_FILENAME = (
+    f"style.{hashlib.sha256(CSS.strip().encode('utf-8')).hexdigest()[:12]}.css"
+)
+SEARCH_JS_FILENAME = (
+    f"search.{hashlib.sha256(SEARCH_JS.strip().encode('utf-8')).hexdigest()[:12]}.js"
+)
+
+
+@dataclass
+class ProfileEvent:
+    name: str
+    lesson: str
+    pid: int
+    start_ns: int
+    wall_ns: int = 0
+    cpu_ns: int = 0
+    bytes_written: int = 0
+
+
+# Only set while `--profile` is active; worker processes collect their own.
+_profile_events: list[ProfileEvent] | None = None
+_profile_stack: list[ProfileEvent] = []
+
+
+def start_profiling() -> None:
+    global _profile_events
+    _profile_events = []
+
+
+def stop_profiling() -> list[ProfileEvent]:
+    global _profile_events
+    events = _profile_events or []
+    _profile_events = None
+    return events
+
+
+@contextmanager
+def profile_phase(name: str, lesson: str = "") -> Iterator[None]:
+    """Time a build phase; a no-op unless profiling is active."""
+    if _profile_events is None:
+        yield
+        return
+    if not lesson and _profile_stack:
+        lesson = _profile_stack[-1].lesson
+    event = ProfileEvent(name, lesson, os.getpid(), time.perf_counter_ns())
+    cpu_start = time.process_time_ns()
+    _profile_stack.append(event)
+    try:
+        yield
+    finally:
+        _profile_stack.pop()
+        event.wall_ns = time.perf_counter_ns() - event.start_ns
+        event.cpu_ns = time.process_time_ns() - cpu_start
+        _profile_events.append(event)
+
+
+def profile_bytes(count: int) -> None:
+    if _profile_events is not None and _profile_stack:
+        _profile_stack[-1].bytes_written += count
+
+
+def print_profile(events: list[ProfileEvent]) -> None:
+    """Print phase and lesson totals, slowest first."""
+    total = next((event for event in events if event.name == "build"), None)
+    phases: dict[str, list[int]] = {}
+    lessons: dict[str, list[int]] = {}
+    for event in events:
+        if event.name == "lesson":
+            lessons[event.lesson] = [event.wall_ns, event.cpu_ns, 0]
+    for event in events:
+        if event.name in {"build", "lesson"}:
+            continue
+        row = phases.setdefault(event.name, [0, 0, 0, 0])
+        row[0] += 1
+        row[1] += event.wall_ns
+        row[2] += event.cpu_ns
+        row[3] += event.bytes_written
+        if event.lesson in lessons:
+            lessons[event.lesson][2] += event.bytes_written
+
+    print("=" * 64)
+    if total is not None:
+        print(
+            f"Build profile: {total.wall_ns / 1e6:.1f} ms wall, "
+            f"{total.cpu_ns / 1e6:.1f} ms CPU in the main process"
+        )
+    print(f"{'Phase':20} {'Calls':>6} {'Wall ms':>10} {'CPU ms':>10} {'Bytes':>12}")
+    print("-" * 64)
+    for name, (calls, wall_ns, cpu_ns, written) in sorted(
+        phases.items(), key=lambda item: item[1][1], reverse=True
+    ):
+        print(
+            f"{name:20} {calls:6} {wall_ns / 1e6:10.1f} "
+            f"{cpu_ns / 1e6:10.1f} {written:12}"
+        )
+    if lessons:
+        print("-" * 64)
+        print(f"{'Lesson':27} {'Wall ms':>10} {'CPU ms':>10} {'Bytes':>12}")
+        print("-" * 64)
+        for name, (wall_ns, cpu_ns, written) in sorted(
+            lessons.items(), key=lambda item: item[1][0], reverse=True
+        ):
+            print(f"{name:27} {wall_ns / 1e6:10.1f} {cpu_ns / 1e6:10.1f} {written:12}")
+    print("=" * 64)
+
+
+def write_profile_trace(events: list[ProfileEvent], path: Path) -> None:
+    """Save events in Chrome trace-event format (complete "X" events)."""
+    origin_ns = min((event.start_ns for event in events), default=0)
+    trace_events = []
+    for event in sorted(events, key=lambda event: event.start_ns):
+        trace_events.append(
+            {
+                "name": event.name,
+                "cat": "lesson" if event.name == "lesson" else "phase",
+                "ph": "X",
+                "ts": (event.start_ns - origin_ns) / 1000,
+                "dur": event.wall_ns / 1000,
+                "pid": event.pid,
+                "tid": event.pid,
+                "args": {
+                    "lesson": event.lesson,
+                    "cpu_ms": event.cpu_ns / 1e6,
+                    "bytes_written": event.bytes_written,
+                },
+            }
+        )
+    path.write_text(
+        json.dumps({"traceEvents": trace_events, "displayTimeUnit": "ms"}, indent=1)
+        + "\n",
+        encoding="utf-8",
+    )
+
 
 def read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8")
@@ -108,153 +472,288 @@ def strip_leading_h1(markdown_text: str) -> str:
     return "\n".join(lines).lstrip("\n")
 
 
-def normalize_nested_list_indentation(markdown_text: str) -> str:
-    """Adapt 2-space nested list authoring to Python-Markdown's parser behavior.
+def rewrite_published_markdown_link(match: re.Match[str]) -> str:
+    """Point a lesson-doc markdown link to its generated HTML page."""
+    target = match.group(1).strip()
+    if not target:
+        return match.group(0)
+    if target.startswith(("#", "mailto:", "http://", "https://")):
+        return match.group(0)
+
+    path_part = target
+    fragment = ""
+    query = ""
+    if "#" in path_part:
+        path_part, frag_value = path_part.split("#", 1)
+        fragment = f"#{frag_value}"
+    if "?" in path_part:
+        path_part, query_value = path_part.split("?", 1)
+        query = f"?{query_value}"
+
+    if Path(path_part).name not in PUBLISHED_MD_HTML_BASENAMES:
+        return match.group(0)
 
-    Authoring rules in AGENTS.md use two-space nested lists. Python-Markdown
-    often needs deeper indentation to keep nested items under their parent list.
+    html_path = path_part[:-3] + ".html"
+    return f"]({html_path}{query}{fragment})"
+
+
+def preprocess_markdown(markdown_text: str, *, rewrite_doc_links: bool = False) -> str:
+    """Adapt lesson Markdown to Python-Markdown in a single pass over the lines.
+
+    - Two-space nested lists (the authoring rule in AGENTS.md) get their
+      indentation doubled; Python-Markdown often needs deeper indentation to
+      keep nested items under their parent list.
+    - List-indented fenced code blocks become nested indented code blocks,
+      because Python-Markdown does not reliably parse fenced code in lists.
+    - With `rewrite_doc_links`, links to lesson docs point to generated HTML.
+      Links are matched within one line: a link whose target is split across
+      lines keeps its `.md` target (the old whole-text regex rewrote it), so
+      keep link targets on one line.
     """
     out: list[str] = []
     in_fence = False
-    list_item_re = re.compile(r"^( +)([-*+] |\d+\. )")
+    code_fence_indent: str | None = None
+    code_indent = ""
+    lines = markdown_text.splitlines()
+    if lines and not lines[-1]:
+        # A trailing blank line has no Markdown meaning; drop it for stable output.
+        lines.pop()
 
-    for line in markdown_text.splitlines():
-        if line.startswith("```"):
+    for line in lines:
+        if line.startswith(FENCE_MARKER):
             in_fence = not in_fence
-            out.append(line)
-            continue
-
-        if not in_fence:
-            match = list_item_re.match(line)
+        elif not in_fence:
+            match = LIST_ITEM_RE.match(line)
             if match:
                 leading_spaces = len(match.group(1))
                 if leading_spaces >= 2:
                     line = (" " * (leading_spaces * 2)) + line[leading_spaces:]
 
+        if code_fence_indent is not None:
+            if line.startswith(code_fence_indent + FENCE_MARKER):
+                rest = line[len(code_fence_indent) + len(FENCE_MARKER) :]
+                if not rest or rest.isspace():
+                    code_fence_indent = None
+                    out.append("")
+                    continue
+            if line.startswith(code_fence_indent):
+                line = line[len(code_fence_indent) :]
+            line = code_indent + line
+        else:
+            open_match = INDENTED_FENCE_OPEN_RE.match(line)
+            if open_match:
+                code_fence_indent = open_match.group(1)
+                # Indent enough to stay attached to the owning list item.
+                code_indent = " " * (len(code_fence_indent) + 5)
+                if out and out[-1] != "":
+                    out.append("")
+                continue
+
+        if rewrite_doc_links and "](" in line:
+            line = MARKDOWN_LINK_RE.sub(rewrite_published_markdown_link, line)
         out.append(line)
 
+    if code_fence_indent is not None:
+        # An unclosed fence still ends its code block at the end of the text.
+        out.append("")
+
     return "\n".join(out)
 
 
-def normalize_indented_fenced_code_blocks(markdown_text: str) -> str:
-    """Render list-indented fenced code blocks as nested indented code blocks.
+def merge_lesson_html(overview_html: str, assessment_html: str) -> list[str]:
+    """Compose the combined lesson page from separately rendered sections.
 
-    Python-Markdown does not reliably parse fenced code blocks nested in lists.
-    This preserves readability for lesson steps with embedded commands.
+    Returns the page body as fragments so it can be streamed without joining.
+
+    Heading ids in the assessment fragment are renamed the way the `toc`
+    extension would have numbered them in one merged document, so anchors on
+    the combined page stay unique.
     """
-    lines = markdown_text.splitlines()
-    out: list[str] = []
-    idx = 0
-    opening_re = re.compile(r"^( +)```([A-Za-z0-9_-]*)\s*$")
-
-    while idx < len(lines):
-        line = lines[idx]
-        open_match = opening_re.match(line)
-        if not open_match:
-            out.append(line)
-            idx += 1
-            continue
+    used_ids = {match[1] for match in HEADING_ID_RE.findall(overview_html)}
+    assessment_id = unique_toc_id("assessment", used_ids)
 
-        fence_indent = open_match.group(1)
-        close_re = re.compile(rf"^{re.escape(fence_indent)}```\s*$")
+    def rename_id(match: re.Match[str]) -> str:
+        new_id = unique_toc_id(match.group(2), used_ids)
+        return f"{match.group(1)}{new_id}{match.group(3)}"
 
-        idx += 1
-        code_lines: list[str] = []
-        while idx < len(lines) and not close_re.match(lines[idx]):
-            code_line = lines[idx]
-            if code_line.startswith(fence_indent):
-                code_line = code_line[len(fence_indent) :]
-            code_lines.append(code_line)
-            idx += 1
-
-        if idx < len(lines):
-            idx += 1
-
-        # Indent enough to stay attached to the owning list item.
-        code_indent = " " * (len(fence_indent) + 5)
-        if out and out[-1] != "":
-            out.append("")
-        for code_line in code_lines:
-            out.append(code_indent + code_line)
-        out.append("")
+    renamed_assessment_html = HEADING_ID_RE.sub(rename_id, assessment_html)
+    return [
+        overview_html,
+        f'\n<h2 id="{assessment_id}">Assessment</h2>\n',
+        renamed_assessment_html,
+    ]
+
+
+_markdown_converter: markdown.Markdown | None = None
 
-    return "\n".join(out)
 
+def markdown_converter() -> markdown.Markdown:
+    """Return this process's Markdown instance, reset for the next document."""
+    global _markdown_converter
+    if _markdown_converter is None:
+        _markdown_converter = markdown.Markdown(
+            extensions=list(MARKDOWN_EXTENSIONS),
+            output_format="html5",
+        )
+    return _markdown_converter.reset()
 
-def merge_lesson_markdown(overview: str, assessment: str) -> str:
-    overview_body = strip_leading_h1(overview).strip()
-    assessment_body = strip_leading_h1(assessment).strip()
-    return f"{overview_body}\n\n## Assessment\n\n{assessment_body}\n"
 
+def md_to_html(markdown_text: str, *, rewrite_doc_links: bool = False) -> str:
+    with profile_phase("normalize"):
+        normalized_md = preprocess_markdown(
+            markdown_text,
+            rewrite_doc_links=rewrite_doc_links,
+        )
+    with profile_phase("convert"):
+        return markdown_converter().convert(normalized_md)
 
-def rewrite_published_markdown_links(markdown_text: str) -> str:
-    """Point lesson-doc markdown links to generated HTML pages."""
 
-    link_re = re.compile(r"\]\(([^)]+)\)")
+def write_output(path: Path, text: str) -> None:
+    write_chunks(path, [text])
 
-    def replace_link(match: re.Match[str]) -> str:
-        target = match.group(1).strip()
-        if not target:
-            return match.group(0)
-        if target.startswith(("#", "mailto:", "http://", "https://")):
-            return match.group(0)
 
-        path_part = target
-        fragment = ""
-        query = ""
-        if "#" in path_part:
-            path_part, frag_value = path_part.split("#", 1)
-            fragment = f"#{frag_value}"
-        if "?" in path_part:
-            path_part, query_value = path_part.split("?", 1)
-            query = f"?{query_value}"
+def write_chunks(path: Path, chunks: Iterable[str]) -> None:
+    """Stream text chunks to `path` as a new file.
 
-        if Path(path_part).name not in PUBLISHED_MD_HTML_BASENAMES:
-            return match.group(0)
+    The old file is unlinked first because staged outputs may be hardlinks
+    into the live site, which must not change until the final swap. Its
+    compressed siblings go too: they describe the old content.
+    """
+    path.unlink(missing_ok=True)
+    for suffix in COMPRESSED_SUFFIXES:
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+    written = 0
+    with path.open("wb") as handle:
+        for chunk in chunks:
+            data = chunk.encode("utf-8")
+            handle.write(data)
+            written += len(data)
+    profile_bytes(written)
 
-        html_path = path_part[:-3] + ".html"
-        return f"]({html_path}{query}{fragment})"
 
-    return link_re.sub(replace_link, markdown_text)
+@dataclass(frozen=True)
+class Template:
+    """A template block compiled into alternating literal text and field names."""
 
+    parts: tuple[str, ...]
 
-def md_to_html(markdown_text: str, *, rewrite_doc_links: bool = False) -> str:
-    normalized_md = normalize_nested_list_indentation(markdown_text)
-    normalized_md = normalize_indented_fenced_code_blocks(normalized_md)
-    if rewrite_doc_links:
-        normalized_md = rewrite_published_markdown_links(normalized_md)
-    return markdown.markdown(
-        normalized_md,
-        extensions=["fenced_code", "tables", "toc", "sane_lists"],
-        output_format="html5",
+    @classmethod
+    def compile(cls, text: str) -> Template:
+        return cls(tuple(TEMPLATE_FIELD_RE.split(text)))
+
+    def render(self, **values: str) -> str:
+        parts = list(self.parts)
+        parts[1::2] = [values[name] for name in self.parts[1::2]]
+        return "".join(parts)
+
+    def split(self, name: str) -> tuple[Template, Template]:
+        """Split around field `name`, e.g. to stream a page body in between."""
+        index = self.parts.index(name, 1)
+        return Template(self.parts[:index]), Template(self.parts[index + 1 :])
+
+
+@cache
+def load_templates() -> dict[str, Template]:
+    """Read and compile `templates/page.html`; done once per process."""
+    text = TEMPLATE_PATH.read_text(encoding="utf-8")
+    text = TEMPLATE_COMMENT_RE.sub("", text)
+    templates = {
+        name: Template.compile(body) for name, body in TEMPLATE_BLOCK_RE.findall(text)
+    }
+    templates["page_head"], templates["page_tail"] = templates["page"].split("body")
+    return templates
+
+
+@dataclass(frozen=True)
+class LessonNav:
+    """Neighbouring lessons and available section pages of one lesson."""
+
+    prev: tuple[str, str] | None
+    next: tuple[str, str] | None
+    sections: tuple[str, ...]
+
+    def as_json(self) -> list:
+        """Return the manifest form, which equals its own JSON round trip."""
+        return [
+            list(self.prev) if self.prev else None,
+            list(self.next) if self.next else None,
+            list(self.sections),
+        ]
+
+
+def lesson_navigation(
+    lessons: list[tuple[Path, str, dict[str, str]]],
+) -> dict[str, LessonNav]:
+    """Compute prev/next links and section tabs from `(dir, title, sources)`."""
+    navs: dict[str, LessonNav] = {}
+    for index, (lesson_dir, _, sources) in enumerate(lessons):
+        sections = ["overview.html", "assessment.html"]
+        if "notes.md" in sources:
+            sections.append("notes.html")
+        if any(name.startswith("code/") for name in sources):
+            sections.append("code.html")
+        before = lessons[index - 1] if index > 0 else None
+        after = lessons[index + 1] if index + 1 < len(lessons) else None
+        navs[lesson_dir.name] = LessonNav(
+            prev=(before[0].name, before[1]) if before else None,
+            next=(after[0].name, after[1]) if after else None,
+            sections=tuple(sections),
+        )
+    return navs
+
+
+def lesson_nav_html(nav: LessonNav, active: str) -> str:
+    templates = load_templates()
+    tabs = "".join(
+        templates["active_tab" if page == active else "tab"].render(
+            href=page, label=label
+        )
+        for page, label in LESSON_SECTION_TABS
+        if page in nav.sections
     )
+    pager = ""
+    if nav.prev is not None:
+        pager += templates["prev_lesson"].render(slug=nav.prev[0], title=nav.prev[1])
+    if nav.next is not None:
+        pager += templates["next_lesson"].render(slug=nav.next[0], title=nav.next[1])
+    return templates["lesson_nav"].render(tabs=tabs, pager=pager)
 
 
-def render_page(title: str, body_html: str, asset_prefix: str = "") -> str:
-    return f"""<!doctype html>
-<html lang="en">
-<head>
-  <meta charset="utf-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1">
-  <title>{title}</title>
-  <link rel="stylesheet" href="{asset_prefix}style.css">
-</head>
-<body>
-  <div class="wrap">
-    <header>
-      <h1>{title}</h1>
-      <nav>
-        <a href="{asset_prefix}index.html">Home</a>
-        <a href="{asset_prefix}syllabus.html">Syllabus</a>
-      </nav>
-    </header>
-    <article>
-      {body_html}
-    </article>
-  </div>
-</body>
-</html>
-"""
+def code_page_html(code_paths: list[str]) -> str:
+    code_file = load_templates()["code_file"]
+    files = "".join(
+        code_file.render(href=quote(path), path=html.escape(path))
+        for path in code_paths
+    )
+    return load_templates()["code_page"].render(files=files)
+
+
+def write_page(
+    path: Path,
+    title: str,
+    body_chunks: Iterable[str],
+    asset_prefix: str = "",
+    lesson_nav: str = "",
+) -> None:
+    head, tail = page_shell(title, asset_prefix, lesson_nav)
+    write_chunks(path, [head, *body_chunks, tail])
+
+
+def page_shell(
+    title: str,
+    asset_prefix: str = "",
+    lesson_nav: str = "",
+) -> tuple[str, str]:
+    """Return the page template text before and after the article body."""
+    templates = load_templates()
+    head = templates["page_head"].render(
+        title=title,
+        asset_prefix=asset_prefix,
+        style=STYLE_FILENAME,
+        search_js=SEARCH_JS_FILENAME,
+        lesson_nav=lesson_nav,
+    )
+    return head, templates["page_tail"].render()
 
 
 def discover_lessons() -> list[Path]:
@@ -268,32 +767,86 @@ def discover_lessons() -> list[Path]:
     return sorted(lesson_dirs, key=lambda path: path.name)
 
 
-def copy_lesson_sources(lesson_dir: Path, lesson_site_dir: Path) -> None:
-    def ignore_names(path: str, names: list[str]) -> set[str]:
-        ignored: set[str] = set()
-        path_obj = Path(path)
-        for name in names:
-            child = path_obj / name
-            if child.is_dir():
-                if any(fnmatch.fnmatch(name, glob) for glob in SKIP_SOURCE_DIR_GLOBS):
-                    ignored.add(name)
-            else:
-                if any(fnmatch.fnmatch(name, glob) for glob in SKIP_SOURCE_FILE_GLOBS):
-                    ignored.add(name)
-        return ignored
-
-    for name in ("overview.md", "assessment.md", "notes.md", "code"):
-        src = lesson_dir / name
-        if not src.exists():
+def reflink_file(src: Path, dst: Path) -> bool:
+    """Clone `src` into `dst` copy-on-write; return False when unsupported."""
+    if fcntl is None:
+        return False
+    try:
+        with src.open("rb") as src_handle, dst.open("wb") as dst_handle:
+            fcntl.ioctl(dst_handle.fileno(), FICLONE, src_handle.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def publish_file(src: Path, dst: Path, publish_mode: str) -> None:
+    if publish_mode in {"reflink", "link"} and reflink_file(src, dst):
+        return
+    if publish_mode == "link":
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            # Different filesystem or no hardlink support: copy instead.
+            pass
+    shutil.copy2(src, dst)
+    profile_bytes(dst.stat().st_size)
+
+
+def is_published_copy(src: Path, dst: Path) -> bool:
+    try:
+        src_stat = src.stat()
+        dst_stat = dst.stat()
+    except OSError:
+        return False
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        return True
+    return (
+        src_stat.st_size == dst_stat.st_size
+        and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+        and file_digest(src) == file_digest(dst)
+    )
+
+
+def copy_lesson_sources(
+    lesson_dir: Path,
+    lesson_site_dir: Path,
+    publish_mode: str = "reflink",
+) -> set[Path]:
+    """Publish lesson sources into the site, skipping files already in place.
+
+    `publish_mode` is `copy`, `reflink` (copy-on-write clone when the
+    filesystem supports it) or `link` (reflink, else hardlink). Both fall back
+    to a plain copy, e.g. across devices. Returns the published paths.
+    """
+    published: set[Path] = set()
+    for src in iter_lesson_source_files(lesson_dir):
+        dst = lesson_site_dir / src.relative_to(lesson_dir)
+        published.add(dst)
+        if is_published_copy(src, dst):
             continue
-        dst = lesson_site_dir / name
-        if src.is_dir():
-            shutil.copytree(src, dst, ignore=ignore_names)
-        else:
-            shutil.copy2(src, dst)
+        if dst.exists() or dst.is_symlink():
+            dst.unlink()
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        publish_file(src, dst, publish_mode)
+    return published
 
 
-def write_site_files(lessons: list[tuple[str, str]]) -> None:
+def prune_lesson_outputs(lesson_site_dir: Path, keep: set[Path]) -> None:
+    """Remove files and empty directories left over from an earlier build."""
+    for dirpath, dirnames, filenames in os.walk(lesson_site_dir, topdown=False):
+        current = Path(dirpath)
+        for name in filenames:
+            path = current / name
+            if path not in keep:
+                path.unlink()
+        if current != lesson_site_dir and not any(current.iterdir()):
+            current.rmdir()
+
+
+def write_site_files(lessons: list[tuple[str, str]], site_dir: Path = SITE_DIR) -> None:
     lesson_links = "".join(
         f'<li><a href="lessons/{slug}/">{title}</a></li>\n'
         for slug, title in lessons
@@ -307,83 +860,1017 @@ def write_site_files(lessons: list[tuple[str, str]]) -> None:
         "<p>The following lessons were generated from <code>lessons/</code>:</p>\n"
         f"<ul>\n{lesson_links}</ul>\n"
     )
-    (SITE_DIR / "style.css").write_text(CSS.strip() + "\n", encoding="utf-8")
-    (SITE_DIR / "index.html").write_text(
-        render_page("RP Pico Self-Study", index_body),
-        encoding="utf-8",
-    )
-    (SITE_DIR / "syllabus.html").write_text(
-        render_page("Syllabus", syllabus_body),
+    for old_asset in [*site_dir.glob("style.*"), *site_dir.glob("search.*")]:
+        if not old_asset.name.startswith((STYLE_FILENAME, SEARCH_JS_FILENAME)):
+            old_asset.unlink()
+    write_output(site_dir / STYLE_FILENAME, CSS.strip() + "\n")
+    write_output(site_dir / SEARCH_JS_FILENAME, SEARCH_JS.strip() + "\n")
+    write_page(site_dir / "index.html", "RP Pico Self-Study", [index_body])
+    write_page(site_dir / "syllabus.html", "Syllabus", [syllabus_body])
+
+
+def is_skipped_source(name: str, is_dir: bool) -> bool:
+    globs = SKIP_SOURCE_DIR_GLOBS if is_dir else SKIP_SOURCE_FILE_GLOBS
+    return any(fnmatch.fnmatch(name, glob) for glob in globs)
+
+
+def iter_lesson_source_files(lesson_dir: Path) -> list[Path]:
+    """List published source files of a lesson, honoring the skip globs."""
+    files: list[Path] = []
+    for name in LESSON_SOURCE_NAMES:
+        src = lesson_dir / name
+        if src.is_file():
+            files.append(src)
+        elif src.is_dir():
+            for dirpath, dirnames, filenames in os.walk(src, followlinks=True):
+                dirnames[:] = sorted(
+                    name for name in dirnames if not is_skipped_source(name, True)
+                )
+                files.extend(
+                    Path(dirpath) / name
+                    for name in sorted(filenames)
+                    if not is_skipped_source(name, False)
+                )
+    return files
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def lesson_source_hashes(lesson_dir: Path) -> dict[str, str]:
+    return {
+        path.relative_to(lesson_dir).as_posix(): file_digest(path)
+        for path in iter_lesson_source_files(lesson_dir)
+    }
+
+
+def build_fingerprint() -> str:
+    """Hash everything besides lesson sources that shapes the generated pages."""
+    digest = hashlib.sha256()
+    digest.update(CSS.encode("utf-8"))
+    digest.update(TEMPLATE_PATH.read_bytes())
+    digest.update(Path(__file__).read_bytes())
+    digest.update(markdown.__version__.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_manifest() -> dict:
+    try:
+        manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def save_manifest(manifest: dict) -> None:
+    BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = MANIFEST_PATH.with_suffix(".tmp")
+    tmp_path.write_text(
+        json.dumps(manifest, indent=2, sort_keys=True) + "\n",
         encoding="utf-8",
     )
+    tmp_path.replace(MANIFEST_PATH)
 
 
-def main() -> int:
-    lessons = discover_lessons()
-    if SITE_DIR.exists():
-        shutil.rmtree(SITE_DIR)
-    SITE_LESSONS_DIR.mkdir(parents=True, exist_ok=True)
+class SearchSectionParser(HTMLParser):
+    """Split rendered page HTML into (anchor, heading, text) sections."""
 
-    lesson_rows: list[tuple[str, str]] = []
-    for lesson_dir in lessons:
-        overview_path = lesson_dir / "overview.md"
-        assessment_path = lesson_dir / "assessment.md"
-        if not overview_path.exists() or not assessment_path.exists():
-            # Keep build going for partial repositories.
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.sections: list[list] = [["", "", []]]
+        self.heading_tag: str | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in HEADING_TAGS:
+            self.heading_tag = tag
+            self.sections.append([dict(attrs).get("id") or "", "", []])
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == self.heading_tag:
+            self.heading_tag = None
+
+    def handle_data(self, data: str) -> None:
+        section = self.sections[-1]
+        if self.heading_tag is not None:
+            section[1] += data
+        section[2].append(data)
+
+
+def search_tokens(text: str) -> list[str]:
+    return sorted(
+        {token for token in SEARCH_TOKEN_RE.findall(text.lower()) if len(token) > 1}
+    )
+
+
+def extract_search_sections(url: str, title: str, body_html: str) -> list[list]:
+    """Return `[url#anchor, page title, heading, tokens]` for each page section."""
+    parser = SearchSectionParser()
+    parser.feed(body_html)
+    parser.close()
+    sections = []
+    for anchor, heading, text in parser.sections:
+        tokens = search_tokens(" ".join(text))
+        if not tokens:
             continue
+        target = f"{url}#{anchor}" if anchor else url
+        sections.append([target, title, heading.strip(), tokens])
+    return sections
+
+
+def search_cache_path(lesson_name: str) -> Path:
+    return SEARCH_CACHE_DIR / f"{lesson_name}.json"
+
+
+def search_shard_key(token: str) -> str:
+    first = token[0]
+    return first if first.isascii() and first.isalnum() else "_"
+
+
+def write_search_index(lesson_names: list[str], site_dir: Path = SITE_DIR) -> None:
+    """Merge per-lesson search sections into the sharded site-wide index."""
+    docs: list[list[str]] = []
+    shards: dict[str, dict[str, list[int]]] = {}
+    for lesson_name in lesson_names:
+        cache_text = search_cache_path(lesson_name).read_text(encoding="utf-8")
+        sections = json.loads(cache_text)
+        for target, title, heading, tokens in sections:
+            doc_id = len(docs)
+            docs.append([target, title, heading])
+            for token in tokens:
+                shard = shards.setdefault(search_shard_key(token), {})
+                shard.setdefault(token, []).append(doc_id)
 
+    search_dir = site_dir / "search"
+    search_dir.mkdir(parents=True, exist_ok=True)
+    expected = {"docs.json"} | {f"{key}.json" for key in shards}
+    for path in search_dir.iterdir():
+        if path.name.removesuffix(".gz").removesuffix(".br") not in expected:
+            path.unlink()
+    write_output(search_dir / "docs.json", compact_json(docs))
+    for key, shard in shards.items():
+        write_output(search_dir / f"{key}.json", compact_json(shard))
+
+
+def compact_json(value: object) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def lesson_title_of(lesson_dir: Path) -> str | None:
+    """Return the lesson title, or None when the lesson is not publishable."""
+    overview_path = lesson_dir / "overview.md"
+    if not overview_path.exists() or not (lesson_dir / "assessment.md").exists():
+        # Keep build going for partial repositories.
+        return None
+    return first_heading(read_text(overview_path), lesson_dir.name)
+
+
+def build_lesson(
+    lesson_dir: Path,
+    nav: LessonNav | None,
+    publish_mode: str = "reflink",
+    site_dir: Path = SITE_DIR,
+) -> str | None:
+    """Render one lesson into `site/lessons/<lesson>/` and return its title.
+
+    The section HTML strings are kept for the whole call: the combined page
+    and the search extraction reuse them instead of converting again.
+    """
+    overview_path = lesson_dir / "overview.md"
+    assessment_path = lesson_dir / "assessment.md"
+    if nav is None or not overview_path.exists() or not assessment_path.exists():
+        # Keep build going for partial repositories.
+        return None
+
+    with profile_phase("read"):
         overview_text = read_text(overview_path)
         assessment_text = read_text(assessment_path)
-        overview_body = strip_leading_h1(overview_text)
-        assessment_body = strip_leading_h1(assessment_text)
-        merged_md = merge_lesson_markdown(overview_text, assessment_text)
-        lesson_title = first_heading(overview_text, lesson_dir.name)
-        lesson_html = md_to_html(merged_md, rewrite_doc_links=True)
-        overview_html = md_to_html(overview_body, rewrite_doc_links=True)
-        assessment_html = md_to_html(assessment_body, rewrite_doc_links=True)
-
-        lesson_site_dir = SITE_LESSONS_DIR / lesson_dir.name
-        lesson_site_dir.mkdir(parents=True, exist_ok=True)
-        copy_lesson_sources(lesson_dir, lesson_site_dir)
-
-        out_path = lesson_site_dir / "index.html"
-        out_path.write_text(
-            render_page(lesson_title, lesson_html, asset_prefix="../../"),
-            encoding="utf-8",
-        )
+        notes_path = lesson_dir / "notes.md"
+        notes_text = read_text(notes_path) if notes_path.exists() else None
+    overview_body = strip_leading_h1(overview_text)
+    assessment_body = strip_leading_h1(assessment_text)
+    lesson_title = first_heading(overview_text, lesson_dir.name)
+    overview_html = md_to_html(overview_body, rewrite_doc_links=True)
+    assessment_html = md_to_html(assessment_body, rewrite_doc_links=True)
+    with profile_phase("compose"):
+        lesson_fragments = merge_lesson_html(overview_html, assessment_html)
 
-        overview_out_path = lesson_site_dir / "overview.html"
-        overview_out_path.write_text(
-            render_page(f"{lesson_title} — Overview", overview_html, asset_prefix="../../"),
-            encoding="utf-8",
+    lesson_site_dir = site_dir / "lessons" / lesson_dir.name
+    lesson_site_dir.mkdir(parents=True, exist_ok=True)
+    with profile_phase("publish sources"):
+        outputs = copy_lesson_sources(lesson_dir, lesson_site_dir, publish_mode)
+
+    pages = [
+        ("index.html", lesson_title, lesson_fragments),
+        ("overview.html", f"{lesson_title} — Overview", [overview_html]),
+        ("assessment.html", f"{lesson_title} — Assessment", [assessment_html]),
+    ]
+    if notes_text is not None:
+        notes_body = strip_leading_h1(notes_text)
+        notes_title = first_heading(notes_text, f"{lesson_title} Notes")
+        notes_html = md_to_html(notes_body, rewrite_doc_links=True)
+        pages.append(("notes.html", notes_title, [notes_html]))
+    if "code.html" in nav.sections:
+        code_paths = sorted(
+            path.relative_to(lesson_site_dir).as_posix()
+            for path in outputs
+            if path.relative_to(lesson_site_dir).parts[0] == "code"
         )
+        code_html = code_page_html(code_paths)
+        pages.append(("code.html", f"{lesson_title} — Code", [code_html]))
 
-        assessment_out_path = lesson_site_dir / "assessment.html"
-        assessment_out_path.write_text(
-            render_page(
-                f"{lesson_title} — Assessment",
-                assessment_html,
+    with profile_phase("write pages"):
+        for name, title, body_chunks in pages:
+            out_path = lesson_site_dir / name
+            outputs.add(out_path)
+            write_page(
+                out_path,
+                title,
+                body_chunks,
                 asset_prefix="../../",
-            ),
+                lesson_nav=lesson_nav_html(nav, active=name),
+            )
+
+    with profile_phase("search sections"):
+        search_sections = [
+            section
+            for name, title, (body_html, *_) in pages
+            if name in SEARCH_PAGES
+            for section in extract_search_sections(
+                f"lessons/{lesson_dir.name}/{name}", title, body_html
+            )
+        ]
+        SEARCH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        search_cache_path(lesson_dir.name).write_text(
+            compact_json(search_sections) + "\n",
             encoding="utf-8",
         )
 
-        notes_path = lesson_dir / "notes.md"
-        if notes_path.exists():
-            notes_text = read_text(notes_path)
-            notes_body = strip_leading_h1(notes_text)
-            notes_title = first_heading(notes_text, f"{lesson_title} Notes")
-            notes_html = md_to_html(notes_body, rewrite_doc_links=True)
-            notes_out_path = lesson_site_dir / "notes.html"
-            notes_out_path.write_text(
-                render_page(notes_title, notes_html, asset_prefix="../../"),
-                encoding="utf-8",
-            )
+    # Drop outputs of files removed from the lesson since the last build.
+    with profile_phase("prune"):
+        prune_lesson_outputs(lesson_site_dir, outputs)
+    return lesson_title
+
+
+def prune_stale_lessons(keep: set[str], site_dir: Path = SITE_DIR) -> None:
+    lessons_dir = site_dir / "lessons"
+    if not lessons_dir.exists():
+        return
+    for path in lessons_dir.iterdir():
+        if path.name in keep:
+            continue
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+
+
+def build_lessons(
+    lesson_dirs: list[Path],
+    navs: dict[str, LessonNav],
+    jobs: int,
+    publish_mode: str = "reflink",
+    site_dir: Path = SITE_DIR,
+) -> list[str | None]:
+    """Render lessons serially or in a process pool, keeping input order."""
+    lesson_navs = [navs.get(lesson_dir.name) for lesson_dir in lesson_dirs]
+    if jobs == 1 or len(lesson_dirs) < 2:
+        titles = []
+        for lesson_dir, nav in zip(lesson_dirs, lesson_navs):
+            with profile_phase("lesson", lesson=lesson_dir.name):
+                titles.append(build_lesson(lesson_dir, nav, publish_mode, site_dir))
+        return titles
+
+    job = partial(
+        build_lesson_job,
+        publish_mode=publish_mode,
+        site_dir=site_dir,
+        profile=_profile_events is not None,
+    )
+    with ProcessPoolExecutor(max_workers=min(jobs, len(lesson_dirs))) as pool:
+        results = list(pool.map(job, lesson_dirs, lesson_navs))
+    if _profile_events is not None:
+        for _, events in results:
+            _profile_events.extend(events)
+    return [title for title, _ in results]
+
+
+def build_lesson_job(
+    lesson_dir: Path,
+    nav: LessonNav | None,
+    publish_mode: str,
+    site_dir: Path,
+    profile: bool,
+) -> tuple[str | None, list[ProfileEvent]]:
+    """Process-pool entry point: build one lesson, return its profile events."""
+    if profile:
+        start_profiling()
+    with profile_phase("lesson", lesson=lesson_dir.name):
+        title = build_lesson(lesson_dir, nav, publish_mode, site_dir)
+    return title, stop_profiling()
+
+
+def compressed_siblings(path: Path) -> list[tuple[Path, Callable[[bytes], bytes]]]:
+    siblings: list[tuple[Path, Callable[[bytes], bytes]]] = [
+        (
+            path.with_name(path.name + ".gz"),
+            lambda data: gzip.compress(data, compresslevel=9, mtime=0),
+        )
+    ]
+    if brotli is not None:
+        siblings.append((path.with_name(path.name + ".br"), brotli.compress))
+    return siblings
+
+
+def precompress_file(path: Path) -> int:
+    """Refresh the `.gz`/`.br` siblings of `path`; return bytes written."""
+    source_mtime = path.stat().st_mtime_ns
+    data: bytes | None = None
+    written = 0
+    siblings = compressed_siblings(path)
+    if brotli is None:
+        # A .br left by a build that had brotli would no longer be refreshed.
+        path.with_name(path.name + ".br").unlink(missing_ok=True)
+    for sibling, compress in siblings:
+        try:
+            if sibling.stat().st_mtime_ns >= source_mtime:
+                continue
+        except FileNotFoundError:
+            pass
+        if data is None:
+            data = path.read_bytes()
+        compressed = compress(data)
+        # Staged siblings may be hardlinks into the live site: never rewrite.
+        sibling.unlink(missing_ok=True)
+        if len(compressed) >= len(data):
+            # Not worth serving.
+            continue
+        sibling.write_bytes(compressed)
+        written += len(compressed)
+    return written
+
+
+def compressible_files(directory: Path) -> list[Path]:
+    return [
+        Path(dirpath) / name
+        for dirpath, _, filenames in os.walk(directory)
+        for name in filenames
+        if Path(name).suffix in COMPRESSIBLE_SUFFIXES
+    ]
+
+
+def precompress_files(paths: list[Path], jobs: int) -> None:
+    """Write compressed siblings for `paths` in parallel."""
+    # zlib and brotli release the GIL, so threads compress in parallel.
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        written = sum(pool.map(precompress_file, paths))
+    profile_bytes(written)
+
+
+def precompress_site(jobs: int, site_dir: Path = SITE_DIR) -> None:
+    """Write compressed siblings for every text file in `site/` in parallel."""
+    precompress_files(compressible_files(site_dir), jobs)
+
+
+def remove_compressed_siblings(site_dir: Path = SITE_DIR) -> None:
+    """Delete every `.gz`/`.br` sibling in `site/` (for `--no-compress`)."""
+    for dirpath, _, filenames in os.walk(site_dir):
+        for name in filenames:
+            stem, suffix = os.path.splitext(name)
+            if suffix in COMPRESSED_SUFFIXES and (
+                Path(stem).suffix in COMPRESSIBLE_SUFFIXES
+            ):
+                (Path(dirpath) / name).unlink()
+
+
+def scan_html_file(path: Path) -> tuple[str, set[str], list[str]]:
+    """Collect anchor ids and link targets of one generated HTML page.
+
+    Generated pages only use double-quoted attributes, and Markdown escapes
+    `<` inside code, so a tag regex is enough and much faster than HTMLParser.
+    """
+    ids: set[str] = set()
+    links: list[str] = []
+    for tag_match in HTML_TAG_RE.finditer(path.read_text(encoding="utf-8")):
+        tag = tag_match.group(1).lower()
+        for name, value in HTML_ATTR_RE.findall(tag_match.group(2) or ""):
+            name = name.lower()
+            if name == "id" or (tag == "a" and name == "name"):
+                ids.add(html.unescape(value))
+            elif name in LINK_ATTRS:
+                links.append(html.unescape(value))
+    return path.relative_to(SITE_DIR).as_posix(), ids, links
+
+
+def check_link(
+    page: str,
+    link: str,
+    files: set[str],
+    page_ids: dict[str, set[str]],
+) -> str | None:
+    """Return why `link` on `page` is broken, or None when it resolves."""
+    parts = urlsplit(link)
+    if parts.scheme or parts.netloc:
+        # External URLs are out of scope for an offline check.
+        return None
+    target = page
+    if parts.path:
+        target = posixpath.normpath(
+            posixpath.join(posixpath.dirname(page), unquote(parts.path))
+        )
+        if target.startswith("../") or target == "..":
+            return "points outside site/"
+        if parts.path.endswith("/") or target == ".":
+            target = posixpath.join(target, "index.html").removeprefix("./")
+        elif target not in files and f"{target}/index.html" in files:
+            target = f"{target}/index.html"
+        if target not in files:
+            return "missing file"
+    fragment = unquote(parts.fragment)
+    if fragment and target in page_ids and fragment not in page_ids[target]:
+        return f"missing anchor #{fragment}"
+    return None
+
+
+def check_site_links(jobs: int) -> list[tuple[str, str, str]]:
+    """Validate relative links and fragments in every generated HTML page."""
+    files: set[str] = set()
+    html_paths: list[Path] = []
+    for dirpath, _, filenames in os.walk(SITE_DIR):
+        for name in filenames:
+            path = Path(dirpath) / name
+            files.add(path.relative_to(SITE_DIR).as_posix())
+            if name.endswith(".html"):
+                html_paths.append(path)
+
+    if jobs == 1 or len(html_paths) < 2:
+        scans = [scan_html_file(path) for path in html_paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(html_paths) // (jobs * 4))
+            scans = list(pool.map(scan_html_file, html_paths, chunksize=chunksize))
+
+    page_ids = {page: ids for page, ids, _ in scans}
+    broken: list[tuple[str, str, str]] = []
+    for page, _, links in sorted(scans, key=lambda scan: scan[0]):
+        for link in links:
+            problem = check_link(page, link, files, page_ids)
+            if problem is not None:
+                broken.append((page, link, problem))
+    return broken
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def stage_site(incremental: bool) -> Path:
+    """Prepare an empty staging dir, seeded with the current site if incremental.
+
+    Seeding uses hardlinks, so it costs one directory entry per file; every
+    build step replaces files instead of rewriting them in place.
+    """
+    if not SITE_DIR.exists() and PREVIOUS_SITE_DIR.is_dir():
+        # Interrupted between the two renames of `swap_site`: put the last
+        # good site back before clearing anything.
+        PREVIOUS_SITE_DIR.rename(SITE_DIR)
+    for leftover in (STAGING_DIR, PREVIOUS_SITE_DIR):
+        if leftover.exists():
+            # Left behind by an interrupted build.
+            shutil.rmtree(leftover)
+    BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    if incremental and SITE_DIR.is_dir():
+        shutil.copytree(
+            SITE_DIR,
+            STAGING_DIR,
+            symlinks=True,
+            copy_function=link_or_copy,
+        )
+    (STAGING_DIR / "lessons").mkdir(parents=True, exist_ok=True)
+    return STAGING_DIR
+
+
+def swap_site(staging_dir: Path) -> None:
+    """Move the finished staging dir into place as `site/`.
+
+    Two renames: `site/` is missing for a moment in between. If the build
+    stops there, the next `stage_site` moves the previous site back first.
+    """
+    if SITE_DIR.exists():
+        SITE_DIR.rename(PREVIOUS_SITE_DIR)
+    staging_dir.rename(SITE_DIR)
+    if PREVIOUS_SITE_DIR.exists():
+        shutil.rmtree(PREVIOUS_SITE_DIR)
+
+
+def navigation_for(
+    lessons: list[Path],
+    titles: dict[str, str | None],
+    lesson_sources: dict[str, dict[str, str]],
+) -> dict[str, LessonNav]:
+    """Navigation of every publishable lesson (those with a title)."""
+    navigable = [
+        (lesson_dir, titles[lesson_dir.name], lesson_sources[lesson_dir.name])
+        for lesson_dir in lessons
+        if titles[lesson_dir.name] is not None
+    ]
+    return lesson_navigation(navigable)
+
+
+def stale_lessons(
+    lessons: list[Path],
+    navs: dict[str, LessonNav],
+    lesson_sources: dict[str, dict[str, str]],
+    previous_lessons: dict,
+    site_dir: Path,
+) -> list[Path]:
+    """Lessons whose sources, navigation or outputs differ from the manifest."""
+    pending = []
+    for lesson_dir in lessons:
+        nav = navs.get(lesson_dir.name)
+        previous = previous_lessons.get(lesson_dir.name)
+        if (
+            previous is None
+            or nav is None
+            or previous.get("sources") != lesson_sources[lesson_dir.name]
+            or previous.get("nav") != nav.as_json()
+            or not (site_dir / "lessons" / lesson_dir.name / "index.html").exists()
+            or not search_cache_path(lesson_dir.name).exists()
+        ):
+            pending.append(lesson_dir)
+    return pending
+
+
+def render_lessons(
+    lessons: list[Path],
+    pending: list[Path],
+    navs: dict[str, LessonNav],
+    lesson_sources: dict[str, dict[str, str]],
+    previous_lessons: dict,
+    *,
+    jobs: int,
+    publish_mode: str,
+    site_dir: Path,
+) -> dict[str, dict]:
+    """Render `pending` lessons; return manifest entries of all published ones."""
+    pending_names = {lesson_dir.name for lesson_dir in pending}
+    lesson_titles: dict[str, str | None] = {
+        lesson_dir.name: previous_lessons[lesson_dir.name]["title"]
+        for lesson_dir in lessons
+        if lesson_dir.name not in pending_names
+    }
+    pending_titles = build_lessons(pending, navs, jobs, publish_mode, site_dir)
+    for lesson_dir, lesson_title in zip(pending, pending_titles):
+        lesson_titles[lesson_dir.name] = lesson_title
+
+    lesson_entries: dict[str, dict] = {}
+    for lesson_dir in lessons:
+        lesson_title = lesson_titles[lesson_dir.name]
+        if lesson_title is None:
+            continue
+        lesson_entries[lesson_dir.name] = {
+            "title": lesson_title,
+            "sources": lesson_sources[lesson_dir.name],
+            "nav": navs[lesson_dir.name].as_json(),
+        }
+    return lesson_entries
+
+
+def write_site_level_files(
+    lesson_entries: dict[str, dict], site_dir: Path
+) -> list[tuple[str, str]]:
+    """Prune removed lessons, write the syllabus and search index; return rows."""
+    lesson_rows = [(slug, entry["title"]) for slug, entry in lesson_entries.items()]
+    with profile_phase("prune"):
+        prune_stale_lessons(set(lesson_entries), site_dir)
+    with profile_phase("site files"):
+        write_site_files(lesson_rows, site_dir)
+    with profile_phase("search index"):
+        write_search_index([slug for slug, _ in lesson_rows], site_dir)
+    return lesson_rows
+
+
+def build_site(
+    *,
+    full: bool,
+    jobs: int,
+    publish_mode: str = "reflink",
+    compress: bool = True,
+) -> None:
+    with profile_phase("discover"):
+        lessons = discover_lessons()
+        fingerprint = build_fingerprint()
+        manifest = {} if full else load_manifest()
+    if manifest.get("build") != fingerprint:
+        # Script, template or CSS changed: nothing cached can be trusted.
+        manifest = {}
+    with profile_phase("stage"):
+        site_dir = stage_site(incremental=bool(manifest))
+
+    lesson_sources: dict[str, dict[str, str]] = {}
+    for lesson_dir in lessons:
+        with profile_phase("hash sources", lesson=lesson_dir.name):
+            lesson_sources[lesson_dir.name] = lesson_source_hashes(lesson_dir)
+    with profile_phase("navigation"):
+        titles = {
+            lesson_dir.name: lesson_title_of(lesson_dir) for lesson_dir in lessons
+        }
+        navs = navigation_for(lessons, titles, lesson_sources)
+
+    previous_lessons: dict = manifest.get("lessons", {})
+    pending = stale_lessons(lessons, navs, lesson_sources, previous_lessons, site_dir)
+    lesson_entries = render_lessons(
+        lessons,
+        pending,
+        navs,
+        lesson_sources,
+        previous_lessons,
+        jobs=jobs,
+        publish_mode=publish_mode,
+        site_dir=site_dir,
+    )
+    rebuilt = sum(1 for lesson_dir in pending if lesson_dir.name in lesson_entries)
+    lesson_rows = write_site_level_files(lesson_entries, site_dir)
+    with profile_phase("compress"):
+        if compress:
+            precompress_site(jobs, site_dir)
+        else:
+            remove_compressed_siblings(site_dir)
+    with profile_phase("swap"):
+        swap_site(site_dir)
+    with profile_phase("manifest"):
+        save_manifest(
+            {
+                "version": MANIFEST_VERSION,
+                "build": fingerprint,
+                "lessons": lesson_entries,
+            }
+        )
+    print(
+        f"Generated site for {len(lesson_rows)} lessons at: {SITE_DIR} "
+        f"({rebuilt} rebuilt, {len(lesson_rows) - rebuilt} unchanged)"
+    )
+
+
+def update_site(changed: set[str], *, publish_mode: str, compress: bool) -> list[str]:
+    """Re-render the `changed` lessons straight into `site/`; return those rebuilt.
+
+    For watch mode, where the dev server owns `site/`: there is no staging copy
+    and no swap. Lessons outside `changed` keep their manifest sources and
+    titles, so only the changed lessons are hashed and read; neighbours are
+    re-rendered only when their navigation changed. Compressed siblings are
+    refreshed for the rewritten files only.
+    """
+    manifest = load_manifest()
+    if manifest.get("build") != build_fingerprint() or not SITE_DIR.is_dir():
+        build_site(full=False, jobs=1, publish_mode=publish_mode, compress=compress)
+        return []
+    previous_lessons: dict = manifest["lessons"]
+    lessons = discover_lessons()
+    lesson_sources: dict[str, dict[str, str]] = {}
+    titles: dict[str, str | None] = {}
+    for lesson_dir in lessons:
+        previous = previous_lessons.get(lesson_dir.name)
+        if lesson_dir.name in changed or previous is None:
+            lesson_sources[lesson_dir.name] = lesson_source_hashes(lesson_dir)
+            titles[lesson_dir.name] = lesson_title_of(lesson_dir)
+        else:
+            lesson_sources[lesson_dir.name] = previous["sources"]
+            titles[lesson_dir.name] = previous["title"]
+    navs = navigation_for(lessons, titles, lesson_sources)
+    pending = stale_lessons(lessons, navs, lesson_sources, previous_lessons, SITE_DIR)
+    lesson_entries = render_lessons(
+        lessons,
+        pending,
+        navs,
+        lesson_sources,
+        previous_lessons,
+        jobs=1,
+        publish_mode=publish_mode,
+        site_dir=SITE_DIR,
+    )
+    write_site_level_files(lesson_entries, SITE_DIR)
+    rebuilt = [
+        lesson_dir.name for lesson_dir in pending if lesson_dir.name in lesson_entries
+    ]
+    if compress:
+        # Pages rewritten without compression already lost their siblings.
+        paths = [
+            path
+            for path in SITE_DIR.iterdir()
+            if path.is_file() and path.suffix in COMPRESSIBLE_SUFFIXES
+        ]
+        for directory in [
+            SITE_DIR / "search",
+            *(SITE_DIR / "lessons" / name for name in rebuilt),
+        ]:
+            paths.extend(compressible_files(directory))
+        precompress_files(paths, jobs=1)
+    save_manifest(
+        {
+            "version": MANIFEST_VERSION,
+            "build": manifest["build"],
+            "lessons": lesson_entries,
+        }
+    )
+    return rebuilt
+
+
+def changed_lesson_names(paths: Iterable[str | Path]) -> set[str]:
+    """Names of the lesson directories under `lessons/` that `paths` touch."""
+    names = set()
+    for path in paths:
+        try:
+            parts = Path(os.fsdecode(path)).relative_to(LESSONS_DIR).parts
+        except ValueError:
+            continue
+        if parts:
+            names.add(parts[0])
+    return names
+
+
+def snapshot_lesson_sources() -> dict[Path, tuple[int, int]]:
+    snapshot: dict[Path, tuple[int, int]] = {}
+    for lesson_dir in discover_lessons():
+        for path in iter_lesson_source_files(lesson_dir):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+class LessonChangeHandler(FileSystemEventHandler):
+    def __init__(self, changed: threading.Event) -> None:
+        super().__init__()
+        self.changed = changed
+        self.lock = threading.Lock()
+        self.paths: set[str] = set()
+
+    def on_any_event(self, event) -> None:
+        if event.event_type in WATCH_EVENT_TYPES:
+            with self.lock:
+                self.paths.add(event.src_path)
+                if getattr(event, "dest_path", ""):
+                    self.paths.add(event.dest_path)
+            self.changed.set()
+
+    def take_paths(self) -> set[str]:
+        with self.lock:
+            paths, self.paths = self.paths, set()
+        return paths
 
-        lesson_rows.append((lesson_dir.name, lesson_title))
 
-    write_site_files(lesson_rows)
-    print(f"Generated site for {len(lesson_rows)} lessons at: {SITE_DIR}")
+def watch_lesson_changes() -> Iterator[set[str]]:
+    """Yield the names of the changed lessons once per batch of changes."""
+    if Observer is not None:
+        changed = threading.Event()
+        observer = Observer()
+        handler = LessonChangeHandler(changed)
+        observer.schedule(handler, str(LESSONS_DIR), recursive=True)
+        observer.daemon = True
+        observer.start()
+        try:
+            while True:
+                changed.wait()
+                # Let editors finish their save (temp file + rename) first.
+                time.sleep(WATCH_DEBOUNCE)
+                changed.clear()
+                yield changed_lesson_names(handler.take_paths())
+        finally:
+            observer.stop()
+
+    previous = snapshot_lesson_sources()
+    while True:
+        time.sleep(WATCH_POLL_INTERVAL)
+        current = snapshot_lesson_sources()
+        if current != previous:
+            touched = {
+                path
+                for path in previous.keys() | current.keys()
+                if previous.get(path) != current.get(path)
+            }
+            previous = current
+            yield changed_lesson_names(touched)
+
+
+class LiveReload:
+    """Build counter that live-reload clients wait on."""
+
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.generation = 0
+
+    def notify(self) -> None:
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation: int, timeout: float) -> int:
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+class SiteRequestHandler(SimpleHTTPRequestHandler):
+    """Serve `site/` and inject the live-reload snippet into HTML pages."""
+
+    live_reload: LiveReload
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path == LIVE_RELOAD_PATH:
+            self.stream_reload_events()
+            return
+        path = Path(self.translate_path(self.path))
+        if path.is_dir() and self.path.split("?", 1)[0].endswith("/"):
+            path = path / "index.html"
+        if path.suffix != ".html" or not path.is_file():
+            super().do_GET()
+            return
+
+        page = path.read_text(encoding="utf-8")
+        page = page.replace("</body>", LIVE_RELOAD_SNIPPET + "</body>", 1)
+        body = page.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_reload_events(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        generation = self.live_reload.generation
+        try:
+            while True:
+                current = self.live_reload.wait(generation, timeout=15.0)
+                if current != generation:
+                    generation = current
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    # Comment line keeps idle connections open.
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except OSError:
+            pass
+
+
+def start_server(port: int, live_reload: LiveReload) -> ThreadingHTTPServer:
+    handler = partial(SiteRequestHandler, directory=str(SITE_DIR))
+    SiteRequestHandler.live_reload = live_reload
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def watch(*, serve: bool, port: int, publish_mode: str, compress: bool) -> int:
+    live_reload = LiveReload()
+    server = start_server(port, live_reload) if serve else None
+    if server is not None:
+        print(f"Serving {SITE_DIR} at http://127.0.0.1:{server.server_address[1]}/")
+    mode = "watchdog" if Observer is not None else "polling"
+    print(f"Watching {LESSONS_DIR} for changes ({mode}); press Ctrl+C to stop.")
+
+    try:
+        for changed in watch_lesson_changes():
+            started = time.perf_counter()
+            try:
+                rebuilt = update_site(
+                    changed, publish_mode=publish_mode, compress=compress
+                )
+            except Exception as exc:  # keep watching after a bad edit
+                print(f"Rebuild failed: {exc}")
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            names = ", ".join(rebuilt) or "site pages"
+            print(f"Rebuilt {names} in {elapsed_ms:.0f} ms")
+            live_reload.notify()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.shutdown()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate the static learner site")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Delete site/ and re-render every lesson instead of only changed ones.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Render lessons in N worker processes (0 = one per CPU, default: 1).",
+    )
+    parser.add_argument(
+        "--publish-mode",
+        choices=PUBLISH_MODES,
+        default="reflink",
+        help=(
+            "How lesson sources are placed in site/: copy, reflink (copy-on-write "
+            "clone where supported) or link (reflink, else hardlink). "
+            "Default: reflink."
+        ),
+    )
+    parser.add_argument(
+        "--no-compress",
+        action="store_true",
+        help="Do not write pre-compressed .gz/.br siblings of text files "
+        "(and remove existing ones).",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="Fail when generated pages contain broken relative links or anchors.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-phase and per-lesson timing and bytes written.",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        type=Path,
+        metavar="PATH",
+        help="With profiling, also write a Chrome trace-event JSON file.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rebuild when lesson sources change.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Like --watch, and serve site/ on localhost with live reload.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="Port for --serve (default: 8000).",
+    )
+    args = parser.parse_args()
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive number")
+    jobs = args.jobs or os.cpu_count() or 1
+
+    if args.profile or args.profile_trace:
+        start_profiling()
+    with profile_phase("build"):
+        build_site(
+            full=args.full,
+            jobs=jobs,
+            publish_mode=args.publish_mode,
+            compress=not args.no_compress,
+        )
+        if args.check_links:
+            with profile_phase("check links"):
+                broken_links = check_site_links(jobs)
+    if args.profile or args.profile_trace:
+        events = stop_profiling()
+        print_profile(events)
+        if args.profile_trace:
+            write_profile_trace(events, args.profile_trace)
+            print(f"Wrote profile trace: {args.profile_trace}")
+
+    if args.check_links:
+        if broken_links:
+            print(f"Broken links: {len(broken_links)}")
+            for page, link, problem in broken_links:
+                print(f"- {page}: {link} ({problem})")
+            return 1
+        print("Link check passed.")
+
+    if args.watch or args.serve:
+        return watch(
+            serve=args.serve,
+            port=args.port,
+            publish_mode=args.publish_mode,
+            compress=not args.no_compress,
+        )
     return 0
 
 
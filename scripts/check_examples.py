@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""Run the Python examples under `lessons/*/code/` and check their output.
+
+Usage:
+  python3 scripts/check_examples.py
+  python3 scripts/check_examples.py lessons/L0A-python-crash
+  python3 scripts/check_examples.py --record lessons/L10-dma-ring-buffer
+  python3 scripts/check_examples.py --no-cache --jobs 1
+
+Every `.py` file in a lesson's `code/` tree is an example. Each runs in its
+own subprocess (in parallel, `--jobs`), from an empty temporary directory so
+stray output files never land in the tree, with a per-script time limit.
+An example passes when it exits with status 0 and its stdout matches the
+recorded output in `scripts/golden/<lesson>/<path>.out`. Scripts whose output
+varies from run to run (benchmarks, environment probes) are marked in
+`EXAMPLES` and only have to exit cleanly, with small arguments so they stay
+fast. A new script has no recorded output yet and fails until it is recorded
+with `--record`; review the recorded file before committing it.
+
+Library modules print nothing when run, so their entry names a `driver` in
+`scripts/example_drivers/`: a short script, run in their place with the
+module's directory on the import path, that exercises the module and prints
+the results. A `stdin` file from the same directory can feed a script's
+standard input (otherwise it reads an empty one).
+
+Board-side scripts (anything under a `micropython/` directory) are skipped,
+except those listed with `stub_time`: they run with `time.sleep` replaced by
+a fake clock that ends the script at that many sleeps, which turns a
+heartbeat loop into a finite run. Examples that need an optional package
+(e.g. pyserial) are skipped when it is not installed.
+
+Passes are cached in `.build-cache/examples.json`, keyed by a hash of the
+script, every other `.py` file in the same `code/` tree (the modules it
+imports), its driver and input files, its recorded output, its settings and
+the Python version, so an
+unchanged example is not run again. `--no-cache` runs everything.
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import difflib
+import hashlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+LESSONS_DIR = ROOT / "lessons"
+GOLDEN_DIR = ROOT / "scripts" / "golden"
+DRIVERS_DIR = ROOT / "scripts" / "example_drivers"
+CACHE_FILE = ROOT / ".build-cache" / "examples.json"
+CACHE_VERSION = 1
+DEFAULT_TIMEOUT = 60.0
+DEVICE_DIRS = {"micropython"}
+MAX_DIFF_LINES = 40
+MAX_STDERR_LINES = 20
+SUMMARY_LABELS = {
+    "PASS": "passed",
+    "CACHED": "cached",
+    "RECORDED": "recorded",
+    "SKIP": "skipped",
+    "FAIL": "failed",
+}
+
+
+@dataclass(frozen=True)
+class ExampleSpec:
+    args: tuple[str, ...] = ()
+    golden: bool = True  # compare stdout with the recorded output
+    timeout: float | None = None  # None: --timeout
+    requires: tuple[str, ...] = ()  # modules that must be importable
+    stub_time: int = 0  # board script: end it at this many time.sleep calls
+    skip: str = ""  # reason never to run it
+    driver: str = ""  # script in DRIVERS_DIR to run instead (imports this one)
+    stdin: str = ""  # file in DRIVERS_DIR fed to standard input
+
+
+# Keyed by path relative to lessons/. Scripts not listed run with no
+# arguments and are compared with their recorded output.
+EXAMPLES = {
+    "L00-vscode-env/code/fleet_summary.py": ExampleSpec(
+        args=("-",), stdin="fleet.ndjson"
+    ),
+    "L00-vscode-env/code/verify_env.py": ExampleSpec(
+        args=("--no-cache", "--timeout", "5"), golden=False
+    ),
+    "L00-vscode-env/code/serial_bench.py": ExampleSpec(
+        args=("--simulate", "--max-loss", "0"), golden=False, requires=("serial",)
+    ),
+    "L00-vscode-env/code/serial_capture.py": ExampleSpec(
+        args=("--simulate", "2000", "--duration", "1"),
+        golden=False,
+        requires=("serial",),
+    ),
+    "L00-vscode-env/code/micropython/hello_repl.py": ExampleSpec(stub_time=3),
+    "L00-vscode-env/code/micropython/serial_bench_device.py": ExampleSpec(
+        skip="answers serial_bench.py over a board's USB serial"
+    ),
+    "L0A-python-crash/code/streaming_stats.py": ExampleSpec(
+        driver="drive_streaming_stats.py"
+    ),
+    "L04A-nonvolatile-storage/code/bench_flash_kv.py": ExampleSpec(
+        args=("--updates", "2000", "--power-cuts", "50"), golden=False
+    ),
+    "L04A-nonvolatile-storage/code/flash_kv.py": ExampleSpec(
+        driver="drive_flash_kv.py"
+    ),
+    "L04A-nonvolatile-storage/code/sim_flash.py": ExampleSpec(
+        driver="drive_sim_flash.py"
+    ),
+    "L05B-button-matrix/code/bench_matrix_scan.py": ExampleSpec(
+        args=("--scans", "2000"), golden=False
+    ),
+    "L05B-button-matrix/code/matrix_scan.py": ExampleSpec(
+        driver="drive_matrix_scan.py"
+    ),
+    "L05B-button-matrix/code/sim_matrix.py": ExampleSpec(
+        driver="drive_sim_matrix.py"
+    ),
+    "L10-dma-ring-buffer/code/bench_ring_buffer.py": ExampleSpec(
+        args=("--megabytes", "1"), golden=False
+    ),
+    "L10-dma-ring-buffer/code/ring_buffer.py": ExampleSpec(
+        driver="drive_ring_buffer.py"
+    ),
+    "L11-dual-core-queues/code/bench_spsc_queue.py": ExampleSpec(
+        args=("--items", "20000"), golden=False
+    ),
+    "L11-dual-core-queues/code/spsc_queue.py": ExampleSpec(
+        driver="drive_spsc_queue.py"
+    ),
+}
+
+# Runs a board script on CPython with a fake clock: sleeping advances the
+# clock instantly, and the script ends (status 0) after the allowed sleeps.
+STUB_TIME_BOOTSTRAP = """\
+import os, runpy, sys, time
+
+sleeps_left = int(sys.argv.pop(1))
+clock_us = [0]
+
+def sleep_us(us):
+    global sleeps_left
+    sleeps_left -= 1
+    if sleeps_left <= 0:
+        raise SystemExit(0)
+    clock_us[0] += int(us)
+
+time.sleep = lambda seconds: sleep_us(seconds * 1000000)
+time.sleep_ms = lambda ms: sleep_us(ms * 1000)
+time.sleep_us = sleep_us
+time.ticks_us = lambda: clock_us[0]
+time.ticks_ms = lambda: clock_us[0] // 1000
+time.ticks_add = lambda ticks, delta: ticks + delta
+time.ticks_diff = lambda end, start: end - start
+sys.argv.pop(0)
+sys.path[0] = os.path.dirname(os.path.abspath(sys.argv[0]))
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+@dataclass(frozen=True)
+class Example:
+    path: Path
+    key: str  # path relative to lessons/
+    spec: ExampleSpec
+
+    @property
+    def golden_path(self) -> Path:
+        return GOLDEN_DIR / f"{self.key}.out"
+
+
+@dataclass
+class Outcome:
+    example: Example
+    status: str  # PASS, CACHED, SKIP, FAIL, RECORDED
+    seconds: float = 0.0
+    detail: str = ""
+    fingerprint: str = ""
+
+
+def discover_examples(filters: list[Path]) -> list[Example]:
+    examples = []
+    for path in sorted(LESSONS_DIR.glob("*/code/**/*.py")):
+        if "__pycache__" in path.parts:
+            continue
+        if filters and not any(path.is_relative_to(prefix) for prefix in filters):
+            continue
+        key = path.relative_to(LESSONS_DIR).as_posix()
+        spec = EXAMPLES.get(key)
+        if spec is None:
+            code_parts = path.relative_to(LESSONS_DIR).parts[2:-1]
+            if DEVICE_DIRS.intersection(code_parts):
+                spec = ExampleSpec(skip="board-side script")
+            else:
+                spec = ExampleSpec()
+        examples.append(Example(path=path, key=key, spec=spec))
+    return examples
+
+
+def code_root(example: Example) -> Path:
+    return LESSONS_DIR / example.key.split("/", 1)[0] / "code"
+
+
+def fingerprint(example: Example) -> str:
+    digest = hashlib.sha256()
+    digest.update(sys.version.encode())
+    digest.update(repr(example.spec).encode())
+    if example.spec.stub_time:
+        digest.update(STUB_TIME_BOOTSTRAP.encode())
+    for path in sorted(code_root(example).rglob("*.py")):
+        if "__pycache__" in path.parts:
+            continue
+        digest.update(path.relative_to(LESSONS_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    for name in (example.spec.driver, example.spec.stdin):
+        if name:
+            digest.update((DRIVERS_DIR / name).read_bytes())
+    if example.spec.golden and example.golden_path.exists():
+        digest.update(example.golden_path.read_bytes())
+    return digest.hexdigest()
+
+
+def missing_requirement(spec: ExampleSpec) -> str | None:
+    for module in spec.requires:
+        if importlib.util.find_spec(module) is None:
+            return module
+    return None
+
+
+def command_for(example: Example) -> list[str]:
+    if example.spec.stub_time:
+        return [
+            sys.executable,
+            "-c",
+            STUB_TIME_BOOTSTRAP,
+            str(example.spec.stub_time),
+            str(example.path),
+            *example.spec.args,
+        ]
+    if example.spec.driver:
+        script = DRIVERS_DIR / example.spec.driver
+        return [sys.executable, str(script), *example.spec.args]
+    return [sys.executable, str(example.path), *example.spec.args]
+
+
+def tail(text: str, lines: int) -> str:
+    return "\n".join(text.rstrip().splitlines()[-lines:])
+
+
+def run_example(example: Example, timeout: float, record: bool) -> Outcome:
+    spec = example.spec
+    env = dict(os.environ)
+    # Same hash order on every run, and no __pycache__ inside lessons/.
+    env.update(
+        PYTHONHASHSEED="0", PYTHONDONTWRITEBYTECODE="1", PYTHONIOENCODING="utf-8"
+    )
+    if spec.driver:
+        # The driver imports the example (and its neighbours) by name.
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, (str(example.path.parent), env.get("PYTHONPATH")))
+        )
+    stdin = ""
+    if spec.stdin:
+        stdin = (DRIVERS_DIR / spec.stdin).read_text(encoding="utf-8")
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="example-") as workdir:
+        try:
+            completed = subprocess.run(
+                command_for(example),
+                cwd=workdir,
+                env=env,
+                input=stdin,
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                timeout=spec.timeout or timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return Outcome(
+                example,
+                "FAIL",
+                time.perf_counter() - started,
+                f"timed out after {spec.timeout or timeout:g}s",
+            )
+    seconds = time.perf_counter() - started
+
+    if completed.returncode != 0:
+        detail = f"exit status {completed.returncode}"
+        if completed.stderr.strip():
+            detail += "\n" + tail(completed.stderr, MAX_STDERR_LINES)
+        return Outcome(example, "FAIL", seconds, detail)
+    if not spec.golden:
+        return Outcome(example, "PASS", seconds)
+    if record:
+        example.golden_path.parent.mkdir(parents=True, exist_ok=True)
+        example.golden_path.write_text(completed.stdout, encoding="utf-8")
+        return Outcome(example, "RECORDED", seconds)
+    if not example.golden_path.exists():
+        return Outcome(example, "FAIL", seconds, "no recorded output (use --record)")
+
+    expected = example.golden_path.read_text(encoding="utf-8")
+    if completed.stdout == expected:
+        return Outcome(example, "PASS", seconds)
+    diff = list(
+        difflib.unified_diff(
+            expected.splitlines(),
+            completed.stdout.splitlines(),
+            fromfile=f"golden/{example.key}.out",
+            tofile="stdout",
+            lineterm="",
+        )
+    )
+    if len(diff) > MAX_DIFF_LINES:
+        diff = diff[:MAX_DIFF_LINES] + [f"... ({len(diff) - MAX_DIFF_LINES} more)"]
+    return Outcome(example, "FAIL", seconds, "\n".join(diff))
+
+
+def load_cache() -> dict[str, str]:
+    try:
+        data = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    passed = data.get("passed")
+    return passed if isinstance(passed, dict) else {}
+
+
+def save_cache(passed: dict[str, str]) -> None:
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"version": CACHE_VERSION, "passed": dict(sorted(passed.items()))}
+    temp_path = CACHE_FILE.with_suffix(".tmp")
+    temp_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    temp_path.replace(CACHE_FILE)
+
+
+def check(example: Example, cache: dict[str, str], args: argparse.Namespace) -> Outcome:
+    spec = example.spec
+    if spec.skip:
+        return Outcome(example, "SKIP", detail=spec.skip)
+    module = missing_requirement(spec)
+    if module:
+        return Outcome(example, "SKIP", detail=f"needs the '{module}' module")
+    if args.record:
+        return run_example(example, args.timeout, record=True)
+    key = fingerprint(example)
+    if cache.get(example.key) == key:
+        return Outcome(example, "CACHED", fingerprint=key)
+    outcome = run_example(example, args.timeout, record=False)
+    outcome.fingerprint = key
+    return outcome
+
+
+def print_outcome(outcome: Outcome) -> None:
+    line = f"{outcome.status:<8} {outcome.example.key}"
+    if outcome.status in {"PASS", "FAIL", "RECORDED"}:
+        line += f" ({outcome.seconds:.2f}s)"
+    if outcome.status == "SKIP":
+        line += f": {outcome.detail}"
+    print(line, flush=True)
+    if outcome.status == "FAIL":
+        for detail_line in outcome.detail.splitlines():
+            print(f"    {detail_line}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run and check the lesson examples")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="Only check examples under these paths (default: all lessons).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Examples run at the same time (0 = one per CPU).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Time limit per example in seconds (default: {DEFAULT_TIMEOUT:g}).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Run every example, even unchanged ones that passed before.",
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Store the current output as the expected output.",
+    )
+    args = parser.parse_args()
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive number")
+    if args.timeout <= 0:
+        parser.error("--timeout must be positive")
+
+    filters = [path.resolve() for path in args.paths]
+    examples = discover_examples(filters)
+    if not examples:
+        print("No examples found.")
+        return 1 if args.paths else 0
+
+    cache = {} if args.no_cache or args.record else load_cache()
+    jobs = args.jobs or os.cpu_count() or 1
+    counts: dict[str, int] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        outcomes = pool.map(lambda example: check(example, cache, args), examples)
+        for outcome in outcomes:
+            print_outcome(outcome)
+            counts[outcome.status] = counts.get(outcome.status, 0) + 1
+            if outcome.status == "PASS":
+                cache[outcome.example.key] = outcome.fingerprint
+            elif outcome.status == "FAIL":
+                cache.pop(outcome.example.key, None)
+    if not args.no_cache and not args.record:
+        save_cache(cache)
+
+    print(
+        ", ".join(
+            f"{counts[status]} {label}"
+            for status, label in SUMMARY_LABELS.items()
+            if status in counts
+        )
+    )
+    return 1 if counts.get("FAIL") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
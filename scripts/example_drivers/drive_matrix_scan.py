@@ -0,0 +1,37 @@
+"""Golden driver for L05B matrix_scan.py: debounced events and ghost blocking."""
+
+from matrix_scan import MatrixScanner
+from sim_matrix import SimMatrix
+
+matrix = SimMatrix(4, 4, seed=3)
+scanner = MatrixScanner(4, 4, matrix.read_row)
+
+
+def run(scans):
+    for _ in range(scans):
+        scanner.scan()
+        matrix.advance()
+    event = scanner.pop()
+    while event is not None:
+        key, pressed, scan = event
+        print("  key %2d %-7s at scan %d" % (key, "down" if pressed else "up", scan))
+        event = scanner.pop()
+
+
+print("bouncing press of key 5:")
+matrix.press(1, 1, bounce=3)
+run(10)
+print("bouncing release:")
+matrix.release(1, 1, bounce=3)
+run(10)
+print("keys 0 and 1, then key 4: a rectangle, so key 4 (and ghost 5) wait")
+matrix.press(0, 0)
+matrix.press(0, 1)
+run(6)
+matrix.press(1, 0)
+run(6)
+print("  pressed:", scanner.pressed(), "ghost scans:", scanner.ghost_scans)
+print("release key 1: the rectangle is gone, key 4 goes down")
+matrix.release(0, 1)
+run(6)
+print("  pressed:", scanner.pressed(), "scans:", scanner.scans)
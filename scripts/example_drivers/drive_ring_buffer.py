@@ -0,0 +1,28 @@
+"""Golden driver for L10 ring_buffer.py: views, wrap-around and overruns."""
+
+from array import array
+
+from ring_buffer import RingBuffer
+
+ring = RingBuffer(array("H", [0] * 8))
+print("free:", ring.free())
+
+view = ring.write_view(5)
+for index in range(len(view)):
+    view[index] = 100 + index
+ring.commit(len(view))
+print("read view:", list(ring.read_view()))
+ring.consume(3)
+
+# 2 items left; writing 6 wraps around the end of the buffer.
+print("written:", ring.write(array("H", range(200, 206))))
+print("views:", list(ring.read_view()), "then", end=" ")
+ring.consume(len(ring.read_view()))
+print(list(ring.read_view()))
+
+free = ring.free()
+print("written with %d free:" % free, ring.write(array("H", range(300, 306))))
+block = array("H", [0] * 8)
+count = ring.readinto(block)
+print("readinto:", list(block[:count]))
+print("overrun items:", ring.overrun_items, "high water:", ring.high_water)
@@ -0,0 +1,44 @@
+"""Golden driver for L04A sim_flash.py: NOR flash rules and power cuts."""
+
+from sim_flash import PAGE_SIZE, FlashError, PowerCut, SimFlash
+
+flash = SimFlash(2, seed=1)
+print("erased byte:", hex(flash.read(0, 1)[0]))
+
+page = bytes(range(PAGE_SIZE))
+flash.program(0, page)
+print("programmed:", flash.read(0, 4).hex(), "pages", flash.page_programs)
+
+# 0xFF leaves bytes alone, so the rest of a page can be filled in later.
+flash.program(PAGE_SIZE, b"\x11" * 16 + b"\xff" * (PAGE_SIZE - 16))
+flash.program(PAGE_SIZE, b"\xff" * 16 + b"\x22" * (PAGE_SIZE - 16))
+print("filled in:", flash.read(PAGE_SIZE + 14, 4).hex())
+
+for address, data in ((0, page[::-1]), (10, page)):
+    try:
+        flash.program(address, data)
+    except FlashError as exc:
+        print("FlashError:", exc)
+try:
+    flash.read(flash.size, 1)
+except FlashError as exc:
+    print("FlashError:", exc)
+
+flash.erase(0)
+print("after erase:", flash.read(0, 4).hex(), "erases", flash.erase_counts)
+
+flash.cut_power_after(2)
+flash.program(0, page)
+try:
+    flash.program(PAGE_SIZE, page)
+except PowerCut as exc:
+    torn = flash.read(PAGE_SIZE, PAGE_SIZE)
+    print("PowerCut:", exc, "- bytes written:", PAGE_SIZE - torn.count(b"\xff"))
+
+flash.cut_power_after(1)
+try:
+    flash.erase(0)
+except PowerCut as exc:
+    erased = flash.read(0, PAGE_SIZE) == b"\xff" * PAGE_SIZE
+    print("PowerCut:", exc, "- first page erased:", erased)
+print("pages programmed:", flash.page_programs, "bytes read:", flash.bytes_read)
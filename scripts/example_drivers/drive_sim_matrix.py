@@ -0,0 +1,26 @@
+"""Golden driver for L05B sim_matrix.py: bounce and ghosting on row reads."""
+
+from sim_matrix import SimMatrix
+
+
+def show(matrix, title):
+    rows = " ".join(format(matrix.read_row(row), "04b") for row in range(matrix.rows))
+    print("%-28s %s" % (title, rows))
+
+
+for diodes in (False, True):
+    matrix = SimMatrix(4, 4, diodes=diodes)
+    print("diodes:", diodes)
+    show(matrix, "idle")
+    matrix.press(0, 0)
+    matrix.press(0, 1)
+    matrix.press(1, 0)
+    show(matrix, "3 corners pressed")
+    matrix.release(1, 0)
+    show(matrix, "corner released")
+
+matrix = SimMatrix(4, 4, seed=3)
+matrix.press(2, 3, bounce=4)
+for scan in range(6):
+    show(matrix, "bouncing press, scan %d" % scan)
+    matrix.advance()
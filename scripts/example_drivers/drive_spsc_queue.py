@@ -0,0 +1,19 @@
+"""Golden driver for L11 spsc_queue.py: single items, batches, full and empty."""
+
+from array import array
+
+from spsc_queue import SPSCQueue
+
+queue = SPSCQueue(4)
+print("push:", [queue.push(value) for value in range(5)], "len", len(queue))
+print("pop:", queue.pop(), queue.pop())
+
+# Two slots free, so only part of the batch fits.
+print("push_many:", queue.push_many(array("i", [10, 11, 12])))
+block = array("i", [0] * 8)
+count = queue.pop_many(block)
+print("pop_many:", list(block[:count]), "then", queue.pop())
+print(
+    "pushed %d, popped %d, full hits %d, empty hits %d"
+    % (queue.pushed, queue.popped, queue.full_hits, queue.empty_hits)
+)
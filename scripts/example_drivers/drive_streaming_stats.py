@@ -0,0 +1,14 @@
+"""Golden driver for L0A streaming_stats.py: running and moving statistics."""
+
+from streaming_stats import MovingAverage, RunningStats
+
+readings = [21.5, 21.7, 22.0, 21.9, 35.0, 22.1, 22.0, 21.8]
+stats = RunningStats()
+average = MovingAverage(3)
+for reading in readings:
+    stats.add(reading)
+    print("%5.1f  moving average %.3f" % (reading, average.add(reading)))
+print(
+    "count %d, mean %.3f, stdev %.3f, min %.1f, max %.1f"
+    % (stats.count, stats.mean, stats.stdev(), stats.minimum, stats.maximum)
+)
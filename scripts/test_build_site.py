@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Golden-output test for `preprocess_markdown` in `scripts/build_site.py`.
+
+Usage:
+  python3 -m unittest discover -s scripts -p "test_*.py"
+
+`preprocess_markdown` replaced a chain of three whole-text normalizers. The
+old chain is kept below, verbatim, as the reference: for every
+`lessons/*/*.md` file the single-pass preprocessor must produce exactly the
+same text, with and without doc-link rewriting.
+
+One difference is intended: the old link regex also matched a link whose
+target starts on the next line (`[text](` then `overview.md)`) and rewrote
+it; the line-oriented preprocessor leaves such a link pointing at the `.md`
+file. `test_multiline_link_is_not_rewritten` pins that down.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import re
+import sys
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+LESSONS_DIR = ROOT / "lessons"
+
+
+def load_build_site():
+    spec = importlib.util.spec_from_file_location(
+        "build_site", ROOT / "scripts" / "build_site.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses look the module up while the class body is processed.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+build_site = load_build_site()
+
+
+# Reference implementation: the chain `md_to_html` ran before the
+# single-pass preprocessor.
+
+
+def normalize_nested_list_indentation(markdown_text: str) -> str:
+    out: list[str] = []
+    in_fence = False
+    list_item_re = re.compile(r"^( +)([-*+] |\d+\. )")
+
+    for line in markdown_text.splitlines():
+        if line.startswith("```"):
+            in_fence = not in_fence
+            out.append(line)
+            continue
+
+        if not in_fence:
+            match = list_item_re.match(line)
+            if match:
+                leading_spaces = len(match.group(1))
+                if leading_spaces >= 2:
+                    line = (" " * (leading_spaces * 2)) + line[leading_spaces:]
+
+        out.append(line)
+
+    return "\n".join(out)
+
+
+def normalize_indented_fenced_code_blocks(markdown_text: str) -> str:
+    lines = markdown_text.splitlines()
+    out: list[str] = []
+    idx = 0
+    opening_re = re.compile(r"^( +)```([A-Za-z0-9_-]*)\s*$")
+
+    while idx < len(lines):
+        line = lines[idx]
+        open_match = opening_re.match(line)
+        if not open_match:
+            out.append(line)
+            idx += 1
+            continue
+
+        fence_indent = open_match.group(1)
+        close_re = re.compile(rf"^{re.escape(fence_indent)}```\s*$")
+
+        idx += 1
+        code_lines: list[str] = []
+        while idx < len(lines) and not close_re.match(lines[idx]):
+            code_line = lines[idx]
+            if code_line.startswith(fence_indent):
+                code_line = code_line[len(fence_indent) :]
+            code_lines.append(code_line)
+            idx += 1
+
+        if idx < len(lines):
+            idx += 1
+
+        code_indent = " " * (len(fence_indent) + 5)
+        if out and out[-1] != "":
+            out.append("")
+        for code_line in code_lines:
+            out.append(code_indent + code_line)
+        out.append("")
+
+    return "\n".join(out)
+
+
+def rewrite_published_markdown_links(markdown_text: str) -> str:
+    link_re = re.compile(r"\]\(([^)]+)\)")
+
+    def replace_link(match: re.Match[str]) -> str:
+        target = match.group(1).strip()
+        if not target:
+            return match.group(0)
+        if target.startswith(("#", "mailto:", "http://", "https://")):
+            return match.group(0)
+
+        path_part = target
+        fragment = ""
+        query = ""
+        if "#" in path_part:
+            path_part, frag_value = path_part.split("#", 1)
+            fragment = f"#{frag_value}"
+        if "?" in path_part:
+            path_part, query_value = path_part.split("?", 1)
+            query = f"?{query_value}"
+
+        if Path(path_part).name not in build_site.PUBLISHED_MD_HTML_BASENAMES:
+            return match.group(0)
+
+        html_path = path_part[:-3] + ".html"
+        return f"]({html_path}{query}{fragment})"
+
+    return link_re.sub(replace_link, markdown_text)
+
+
+def old_chain(markdown_text: str, *, rewrite_doc_links: bool) -> str:
+    normalized_md = normalize_nested_list_indentation(markdown_text)
+    normalized_md = normalize_indented_fenced_code_blocks(normalized_md)
+    if rewrite_doc_links:
+        normalized_md = rewrite_published_markdown_links(normalized_md)
+    return normalized_md
+
+
+class PreprocessMarkdownGoldenTest(unittest.TestCase):
+    def test_lessons_match_old_chain(self) -> None:
+        paths = sorted(LESSONS_DIR.glob("*/*.md"))
+        self.assertTrue(paths, "no lesson Markdown found")
+        for path in paths:
+            text = path.read_text(encoding="utf-8")
+            for rewrite_doc_links in (False, True):
+                with self.subTest(
+                    path=path.relative_to(ROOT).as_posix(),
+                    rewrite_doc_links=rewrite_doc_links,
+                ):
+                    self.assertEqual(
+                        build_site.preprocess_markdown(
+                            text, rewrite_doc_links=rewrite_doc_links
+                        ),
+                        old_chain(text, rewrite_doc_links=rewrite_doc_links),
+                    )
+
+    def test_multiline_link_is_not_rewritten(self) -> None:
+        text = "See [the overview](\noverview.md) first.\n"
+        self.assertEqual(
+            build_site.preprocess_markdown(text, rewrite_doc_links=True),
+            text.rstrip("\n"),
+        )
+        self.assertIn("overview.html", old_chain(text, rewrite_doc_links=True))
+
+
+if __name__ == "__main__":
+    unittest.main()